@@ -0,0 +1,422 @@
+"""Benchmarks headless du lecteur.
+
+Génère une bibliothèque synthétique, pilote le vrai MusicApp et core.actions,
+et écrit les latences (p50/p95) et le pic de mémoire en JSON.
+
+    python3 bench.py --tracks 20 --seconds 30 --output bench.json
+    python3 bench.py --baseline bench.json      # échoue si une p95 régresse
+"""
+import os
+import sys
+import json
+import time
+import wave
+import contextlib
+import random
+import shutil
+import argparse
+import resource
+import tempfile
+
+# Avant tout import Qt/pygame : pas d'écran ni de carte son
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("NYRVANA_IPC_NAME", f"nyrvana-bench-{os.getpid()}")
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmarks headless du lecteur')
+    parser.add_argument('--tracks', type=int, default=20, help='Nombre de pistes synthétiques')
+    parser.add_argument('--seconds', type=float, default=30.0, help='Durée de chaque piste (s)')
+    parser.add_argument('--iterations', type=int, default=100, help='Répétitions pour skips/seeks')
+    parser.add_argument('--scenarios', default='all', help='Liste séparée par des virgules')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', metavar='FICHIER', help='Écrit le rapport JSON dans un fichier')
+    parser.add_argument('--baseline', metavar='FICHIER', help='Rapport précédent à comparer')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Régression tolérée sur la p95 (ratio)')
+    return parser.parse_args()
+
+
+def generate_library(music_dir, tracks, seconds, seed, sample_rate=22050):
+    """Écrit des WAV mono (accords + bruit) pour obtenir des spectres variés"""
+    os.makedirs(music_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    for i in range(tracks):
+        freqs = rng.uniform(80, 2000, size=3)
+        signal = sum(np.sin(2 * np.pi * f * t) for f in freqs) / 3
+        signal *= 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(0.5, 3) * t)
+        signal += rng.normal(0, 0.05, size=t.size)
+        pcm = (np.clip(signal, -1, 1) * 32767 * 0.8).astype(np.int16)
+        with wave.open(os.path.join(music_dir, f"bench_{i:05d}.wav"), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(pcm.tobytes())
+
+
+def summarize(samples_ms):
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "n": int(values.size),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+class Context:
+    def __init__(self, args, app):
+        self.args = args
+        self.app = app
+        self.rng = random.Random(args.seed)
+        self._window = None
+
+    @property
+    def window(self):
+        if self._window is None:
+            self._window = self.new_window()
+        return self._window
+
+    def new_window(self):
+        from main import MusicApp
+        window = MusicApp()
+        self.app.processEvents()
+        return window
+
+    def close_window(self, window):
+        window.close()
+        window.deleteLater()
+        self.app.processEvents()
+
+
+@scenario("cold_start")
+def bench_cold_start(ctx):
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        window = ctx.new_window()
+        samples.append((time.perf_counter() - start) * 1000)
+        ctx.close_window(window)
+    return samples
+
+
+@scenario("skip")
+def bench_skip(ctx):
+    window = ctx.window
+    return [timed(window.on_skip) for _ in range(ctx.args.iterations)]
+
+
+@scenario("seek")
+def bench_seek(ctx):
+    from core.actions import seek_to_position, get_current_track_duration_ms
+    # La fenêtre charge la première piste : sans elle, seek_to_position ne fait rien
+    ctx.window
+    dur = get_current_track_duration_ms()
+    return [timed(seek_to_position, ctx.rng.randint(0, max(dur - 1, 0)))
+            for _ in range(ctx.args.iterations)]
+
+
+@scenario("reload")
+def bench_reload(ctx):
+    window = ctx.window
+    return [timed(window.reload_playlist) for _ in range(10)]
+
+
+@scenario("load_audio")
+def bench_load_audio(ctx):
+    from core.actions import playlist
+    visualizer = ctx.window.visualizer
+    return [timed(visualizer.load_audio, path) for path in playlist[:10]]
+
+
+def bench_paint(ctx, num_bars):
+    from core.actions import playlist
+    visualizer = ctx.window.visualizer
+    visualizer.configure({"visualizer": {"num_bars": num_bars}})
+    visualizer.load_audio(playlist[0])
+    frames = visualizer.spectrogramme.shape[1]
+    hop_ms = visualizer.hop_length / visualizer.sample_rate * 1000
+    samples = []
+    for i in range(min(ctx.args.iterations * 3, frames)):
+        visualizer.update_visualizer(int(i * hop_ms))
+        samples.append(timed(visualizer.repaint))
+    return samples
+
+
+for _bars in (20, 60, 100):
+    scenario(f"paint_{_bars}")(lambda ctx, bars=_bars: bench_paint(ctx, bars))
+
+
+@scenario("waveform")
+def bench_waveform(ctx):
+    """Rendu de la forme d'onde à des largeurs variées (redimensionnements en mode tiled)"""
+    from core import analysis
+    from core.actions import playlist
+    y, _sr = analysis.decode(playlist[0])
+    pyramid = analysis.compute_peaks(y)
+    return [timed(pyramid.columns, ctx.rng.randint(80, 2000)) for _ in range(ctx.args.iterations)]
+
+
+SEARCH_WORDS = ("love", "night", "dance", "remix", "live", "summer", "dream", "fire", "heart",
+                "official", "video", "feat", "radio", "edit", "blue", "city", "lights", "rain")
+
+
+@scenario("search_100k")
+def bench_search(ctx):
+    """Requêtes avec fautes de frappe sur un index de 100 000 noms synthétiques"""
+    from core.search import TrigramIndex
+    rng = ctx.rng
+    index = TrigramIndex()
+    names = [" ".join(rng.choice(SEARCH_WORDS) for _ in range(rng.randint(2, 5))) + f" {i}"
+             for i in range(100_000)]
+    for i, name in enumerate(names):
+        index.add(f"/bench/{i}.mp3", name)
+    index.search("warmup")
+
+    samples = []
+    for _ in range(ctx.args.iterations):
+        query = rng.choice(names).rsplit(" ", 1)[0]
+        # Une lettre remplacée : la recherche doit tolérer la faute
+        pos = rng.randrange(len(query))
+        query = query[:pos] + rng.choice("abcdefghijklmnopqrstuvwxyz") + query[pos + 1:]
+        samples.append(timed(index.search, query))
+    return samples
+
+
+@scenario("radio_50k")
+def bench_radio(ctx):
+    """Choix de la piste suivante en mode radio sur 50 000 vecteurs aléatoires"""
+    from core.analysis import FEATURE_BANDS
+    from core.similarity import SimilarityIndex
+    rng = np.random.default_rng(ctx.args.seed)
+    index = SimilarityIndex(tempfile.mkdtemp(prefix="nyrvana-radio-"))
+    for i, vector in enumerate(rng.normal(size=(50_000, 2 * FEATURE_BANDS + 3)).astype(np.float32)):
+        index.add(f"track_{i}.mp3", vector)
+    index.most_similar("track_0.mp3")
+    history = [f"track_{i}.mp3" for i in range(20)]
+    return [timed(index.most_similar, f"track_{ctx.rng.randrange(50_000)}.mp3", None, history)
+            for _ in range(ctx.args.iterations)]
+
+
+@scenario("shuffle_1m")
+def bench_shuffle(ctx):
+    """Tirage pondéré puis mise à jour du poids (cooldown) sur 1 000 000 de pistes synthétiques"""
+    from core.shuffle import FenwickTree
+    rng = ctx.rng
+    tree = FenwickTree(rng.uniform(0.05, 3.0) for _ in range(1_000_000))
+
+    def draw():
+        i = tree.sample(rng)
+        tree.set(i, 0.0)
+        tree.set(rng.randrange(len(tree)), rng.uniform(0.05, 3.0))
+
+    return [timed(draw) for _ in range(ctx.args.iterations)]
+
+
+@scenario("loudness")
+def bench_loudness(ctx):
+    """Mesure de sonie (filtre K, blocs de 400 ms) sur 3 minutes de signal synthétique"""
+    from core.analysis import SAMPLE_RATE
+    from core.loudness import integrated_loudness
+    rng = np.random.default_rng(ctx.args.seed)
+    y = (0.1 * rng.normal(size=SAMPLE_RATE * 180)).astype(np.float32)
+    return [timed(integrated_loudness, y, SAMPLE_RATE) for _ in range(ctx.args.iterations)]
+
+
+@scenario("equalizer")
+def bench_equalizer(ctx):
+    """Égaliseur 10 bandes sur des blocs stéréo 44,1 kHz : latence par bloc et facteur temps réel"""
+    from core.equalizer import Equalizer, EQ_FREQS
+    from core.pcm import BLOCK_FRAMES
+    sr = 44100
+    rng = np.random.default_rng(ctx.args.seed)
+    equalizer = Equalizer([rng.integers(-12, 13) for _ in EQ_FREQS], sr, 2)
+    pcm = (rng.normal(0, 3000, size=(sr * 30, 2))).astype(np.int16)
+    samples = []
+    for start in range(0, len(pcm) - BLOCK_FRAMES + 1, BLOCK_FRAMES):
+        block = pcm[start:start + BLOCK_FRAMES].astype(np.float32)
+        samples.append(timed(equalizer.process, block))
+    block_ms = BLOCK_FRAMES / sr * 1000
+    return samples, {"block_ms": round(block_ms, 2),
+                     "realtime_factor": round(block_ms / float(np.mean(samples)), 1)}
+
+
+@scenario("skip_eq")
+def bench_skip_eq(ctx):
+    """Changement de piste en lecture, égaliseur actif : latence côté interface et délai
+    jusqu'au premier bloc joué (décodage en arrière-plan compris)"""
+    from core.actions import set_equalizer, get_backend, stop_music
+    from core.equalizer import EQ_FREQS
+    window = ctx.window
+    set_equalizer(True, [3] + [0] * (len(EQ_FREQS) - 1))
+    window.is_playing = True
+    pcm = get_backend()._pcm
+    samples, audible = [], []
+    for _ in range(ctx.args.iterations):
+        start = time.perf_counter()
+        window.on_skip()
+        samples.append((time.perf_counter() - start) * 1000)
+        while getattr(pcm, "pending", False):
+            time.sleep(0.001)
+        audible.append((time.perf_counter() - start) * 1000)
+    window.is_playing = False
+    stop_music()
+    set_equalizer(False, [])
+    return samples, {"audible_p50_ms": summarize(audible)["p50_ms"],
+                     "audible_p95_ms": summarize(audible)["p95_ms"]}
+
+
+AUDIO_COMMANDS = ("load", "play", "seek", "position", "volume", "pause")
+
+
+def bench_commands(ctx, name):
+    """Latence des commandes de lecture à travers un backend audio"""
+    from core.audio import create_backend
+    from core.duplicates import library_tracks
+    tracks = library_tracks(os.path.join(os.getcwd(), "assets", "music"))
+    audio = create_backend(name)
+    per_command = {command: [] for command in AUDIO_COMMANDS}
+    for _ in range(ctx.args.iterations):
+        per_command["load"].append(timed(audio.load, ctx.rng.choice(tracks)))
+        per_command["play"].append(timed(audio.play))
+        per_command["seek"].append(timed(audio.seek, ctx.rng.randint(0, int(ctx.args.seconds * 1000) - 1)))
+        per_command["position"].append(timed(audio.position_ms))
+        per_command["volume"].append(timed(audio.set_volume, ctx.rng.random()))
+        per_command["pause"].append(timed(audio.pause))
+    audio.close()
+    samples = [value for values in per_command.values() for value in values]
+    return samples, {f"{command}_p50_ms": summarize(values)["p50_ms"] for command, values in per_command.items()}
+
+
+for _backend in ("null", "pygame"):
+    scenario(f"commands_{_backend}")(lambda ctx, name=_backend: bench_commands(ctx, name))
+
+
+@scenario("config_ui_open")
+def bench_config_ui_open(ctx):
+    """Ouverture de la fenêtre de configuration jusqu'au premier affichage"""
+    from config_ui import ConfigUI
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        window = ConfigUI()
+        window.show()
+        ctx.app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+        ctx.close_window(window)
+    return samples
+
+
+@scenario("config_ui_sections")
+def bench_config_ui_sections(ctx):
+    """Construction de chaque section au premier dépliage"""
+    from config_ui import ConfigUI
+    window = ConfigUI()
+    window.show()
+    samples = []
+    for section in window.sections.values():
+        start = time.perf_counter()
+        section.header.setChecked(True)
+        ctx.app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    ctx.close_window(window)
+    return samples
+
+
+def peak_rss_mb():
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def compare(report, baseline_path, threshold):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or not old.get("p95_ms"):
+            continue
+        ratio = result["p95_ms"] / old["p95_ms"]
+        result["p95_ratio"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']} → {result['p95_ms']} ms (x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    names = list(SCENARIOS) if args.scenarios == "all" else args.scenarios.split(",")
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"Scénarios inconnus : {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    # Le rapport est seul sur stdout : les messages de l'application (et de ses threads) vont sur stderr
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        workdir = tempfile.mkdtemp(prefix="nyrvana-bench-")
+        try:
+            generate_library(os.path.join(workdir, "assets", "music"), args.tracks, args.seconds, args.seed)
+            os.chdir(workdir)
+
+            from PyQt6.QtWidgets import QApplication
+            app = QApplication(sys.argv[:1])
+            ctx = Context(args, app)
+
+            report = {
+                "meta": {
+                    "tracks": args.tracks, "seconds": args.seconds,
+                    "iterations": args.iterations, "seed": args.seed,
+                    "python": sys.version.split()[0], "platform": sys.platform,
+                },
+                "scenarios": {},
+            }
+            for name in names:
+                print(f"⏱️  {name}...", file=sys.stderr)
+                samples = SCENARIOS[name](ctx)
+                # Un scénario peut ajouter ses propres mesures : (échantillons, {clé: valeur})
+                samples, extra = samples if isinstance(samples, tuple) else (samples, {})
+                report["scenarios"][name] = {**summarize(samples), **extra}
+            report["peak_rss_mb"] = peak_rss_mb()
+        finally:
+            os.chdir(REPO_DIR)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        regressions = compare(report, args.baseline, args.threshold) if args.baseline else []
+        output = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output)
+        out.write(output + "\n")
+        out.flush()
+
+        for line in regressions:
+            print(f"❌ Régression {line}", file=sys.stderr)
+        return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
+import time
+
+# Origine de la mesure du temps jusqu'à l'interactivité, avant les imports Qt
+_START = time.perf_counter()
+
 import json
-import numpy as np
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QColorDialog,
     QComboBox, QSpinBox, QFileDialog, QApplication, QHBoxLayout,
-    QSlider, QTabWidget, QScrollArea, QCheckBox, QGroupBox
+    QTabWidget, QScrollArea, QCheckBox, QGroupBox, QToolButton, QSizePolicy, QSlider
 )
 from PyQt6.QtGui import QColor, QFontDatabase
-from PyQt6.QtCore import Qt
-import pyqtgraph as pg
+from PyQt6.QtCore import Qt, QTimer
+from core.ipc import send_command
+from core import trace
+from core.equalizer import EQ_FREQS, MAX_GAIN_DB
 
 CONFIG_FILE = "config.json"
 
@@ -126,6 +132,45 @@ class ButtonConfigUI(QWidget):
         self.config[self.button_name]["border_width"] = self.border_width_spin.value()
         self.config[self.button_name]["opacity"] = self.opacity_spin.value() / 100.0
 
+class LazySection(QWidget):
+    """Section repliable dont le contenu est construit au premier dépliage"""
+
+    def __init__(self, key, title, builder):
+        super().__init__()
+        self.key = key
+        self.builder = builder
+        self.built = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.header = QToolButton()
+        self.header.setText(title)
+        self.header.setCheckable(True)
+        self.header.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.header.setArrowType(Qt.ArrowType.RightArrow)
+        self.header.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.header.toggled.connect(self.set_expanded)
+        layout.addWidget(self.header)
+
+        self.body = QGroupBox()
+        self.body.setVisible(False)
+        layout.addWidget(self.body)
+
+    def build(self):
+        if self.built:
+            return
+        self.built = True
+        with trace.span("config_ui.section", section=self.key):
+            body_layout = QVBoxLayout()
+            self.builder(body_layout)
+            self.body.setLayout(body_layout)
+
+    def set_expanded(self, expanded):
+        if expanded:
+            self.build()
+        self.header.setArrowType(Qt.ArrowType.DownArrow if expanded else Qt.ArrowType.RightArrow)
+        self.body.setVisible(expanded)
+
 class ConfigUI(QWidget):
     def __init__(self):
         super().__init__()
@@ -141,14 +186,26 @@ class ConfigUI(QWidget):
         self.scroll.setWidget(self.container)
         self.main_layout = QVBoxLayout(self.container)
 
-        self.add_window_config_ui()
-        self.add_animation_config_ui()
-        self.add_buttons_general_ui()
-        self.add_buttons_detailed_ui()
-        self.add_progress_bar_ui()
-        self.add_volume_bar_ui()
-        self.add_visualizer_ui()
-        self.add_overlay_config_ui()
+        # Sections repliées : chacune est construite à sa première ouverture
+        self.sections = {}
+        self.button_config_uis = {}
+        for key, title, builder in (
+            ("window", "🪟 Configuration de la fenêtre", self.add_window_config_ui),
+            ("animations", "⚡ Configuration des animations", self.add_animation_config_ui),
+            ("buttons", "🔘 Configuration générale des boutons", self.add_buttons_general_ui),
+            ("buttons_detailed", "🎛️ Configuration détaillée des boutons", self.add_buttons_detailed_ui),
+            ("progress_bar", "📊 Configuration de la barre de progression", self.add_progress_bar_ui),
+            ("volume_bar", "🔊 Configuration de la barre de volume", self.add_volume_bar_ui),
+            ("visualizer", "🎵 Configuration du visualiseur", self.add_visualizer_ui),
+            ("overlay", "🎨 Configuration de l'overlay", self.add_overlay_config_ui),
+            ("power", "🔋 Économie d'énergie", self.add_power_config_ui),
+            ("playback", "🔀 Lecture", self.add_playback_config_ui),
+            ("equalizer", "🎚️ Égaliseur", self.add_equalizer_config_ui),
+        ):
+            section = LazySection(key, title, builder)
+            self.sections[key] = section
+            self.main_layout.addWidget(section)
+        self.main_layout.addStretch()
 
         self.save_button = QPushButton("💾 Enregistrer la configuration")
         self.save_button.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px; font-weight: bold; border-radius: 5px;")
@@ -206,7 +263,9 @@ class ConfigUI(QWidget):
                 "height": 10,
                 "radius": 10,
                 "show_time": True,
-                "animated": True
+                "animated": True,
+                "waveform": False,
+                "waveform_height": 40
             },
             "visualizer": {
                 "enabled": True,
@@ -214,7 +273,8 @@ class ConfigUI(QWidget):
                 "color_start": "#FF0000",
                 "color_end": "#0000FF",
                 "intensity": 1.0,
-                "style": "bars"
+                "style": "bars",
+                "beat_pulse": 0.3
             },
             "volume_bar": {
                 "background_color": "#62a0ea",
@@ -227,13 +287,33 @@ class ConfigUI(QWidget):
                 "show_on_hover": False,
                 "opacity": 0.8,
                 "color": "#000000"
+            },
+            "power": {
+                "low_power": "auto",
+                "idle_interval": 500
+            },
+            "downloads": {
+                "profile": "audio",
+                "converter": "auto",
+                "ingest": True
+            },
+            "artwork": {
+                "size": 120,
+                "fps": 8
+            },
+            "playback": {
+                "mode": "sequential",
+                "normalize_loudness": True,
+                "target_lufs": -18.0,
+                "trim_silence": True
+            },
+            "equalizer": {
+                "enabled": False,
+                "gains": [0] * len(EQ_FREQS)
             }
         }
 
-    def add_animation_config_ui(self):
-        group = QGroupBox("⚡ Configuration des animations")
-        layout = QVBoxLayout()
-
+    def add_animation_config_ui(self, layout):
         self.anim_enabled_check = QCheckBox("Activer les animations")
         self.anim_enabled_check.setChecked(self.config.get("animations", {}).get("enabled", True))
         layout.addWidget(self.anim_enabled_check)
@@ -274,13 +354,7 @@ class ConfigUI(QWidget):
         click_scale_layout.addWidget(self.click_scale_spin)
         layout.addLayout(click_scale_layout)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
-
-    def add_overlay_config_ui(self):
-        group = QGroupBox("🎨 Configuration de l'overlay")
-        layout = QVBoxLayout()
-
+    def add_overlay_config_ui(self, layout):
         self.overlay_hover_check = QCheckBox("Afficher overlay au survol")
         self.overlay_hover_check.setChecked(self.config.get("overlay", {}).get("show_on_hover", False))
         layout.addWidget(self.overlay_hover_check)
@@ -299,8 +373,67 @@ class ConfigUI(QWidget):
         self.overlay_color_btn.clicked.connect(self.pick_overlay_color)
         layout.addWidget(self.overlay_color_btn)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
+    def add_power_config_ui(self, layout):
+        self.low_power_combo = QComboBox()
+        self.low_power_combo.addItems(["auto", "always", "never"])
+        self.low_power_combo.setCurrentText(self.config["power"].get("low_power", "auto"))
+        layout.addWidget(QLabel("Mode basse consommation (auto : fenêtre cachée ou pause)"))
+        layout.addWidget(self.low_power_combo)
+
+        interval_layout = QHBoxLayout()
+        self.idle_interval_spin = QSpinBox()
+        self.idle_interval_spin.setRange(100, 5000)
+        self.idle_interval_spin.setSingleStep(100)
+        self.idle_interval_spin.setValue(self.config["power"].get("idle_interval", 500))
+        interval_layout.addWidget(QLabel("Rafraîchissement réduit (ms)"))
+        interval_layout.addWidget(self.idle_interval_spin)
+        layout.addLayout(interval_layout)
+
+    def add_playback_config_ui(self, layout):
+        self.playback_mode_combo = QComboBox()
+        self.playback_mode_combo.addItems(["sequential", "radio", "shuffle"])
+        self.playback_mode_combo.setCurrentText(self.config["playback"].get("mode", "sequential"))
+        layout.addWidget(QLabel("Piste suivante (radio : la plus proche acoustiquement, "
+                                "shuffle : aléatoire pondéré par l'historique)"))
+        layout.addWidget(self.playback_mode_combo)
+
+        self.normalize_loudness_check = QCheckBox("Normaliser le volume entre les pistes")
+        self.normalize_loudness_check.setChecked(self.config["playback"].get("normalize_loudness", True))
+        layout.addWidget(self.normalize_loudness_check)
+
+        self.target_lufs_spin = QSpinBox()
+        self.target_lufs_spin.setRange(-30, -6)
+        self.target_lufs_spin.setValue(int(self.config["playback"].get("target_lufs", -18)))
+        layout.addWidget(QLabel("Niveau visé (LUFS)"))
+        layout.addWidget(self.target_lufs_spin)
+
+        self.trim_silence_check = QCheckBox("Couper les silences de début et de fin")
+        self.trim_silence_check.setChecked(self.config["playback"].get("trim_silence", True))
+        layout.addWidget(self.trim_silence_check)
+
+    def add_equalizer_config_ui(self, layout):
+        self.equalizer_enabled_check = QCheckBox("Activer l'égaliseur")
+        self.equalizer_enabled_check.setChecked(self.config["equalizer"].get("enabled", False))
+        layout.addWidget(self.equalizer_enabled_check)
+
+        gains = self.config["equalizer"].get("gains", [0] * len(EQ_FREQS))
+        bands_layout = QHBoxLayout()
+        self.equalizer_sliders = []
+        for freq, gain in zip(EQ_FREQS, gains):
+            band_layout = QVBoxLayout()
+            slider = QSlider(Qt.Orientation.Vertical)
+            slider.setRange(-MAX_GAIN_DB, MAX_GAIN_DB)
+            slider.setValue(int(gain))
+            value_label = QLabel(f"{int(gain):+d}")
+            slider.valueChanged.connect(lambda v, label=value_label: label.setText(f"{v:+d}"))
+            band_layout.addWidget(value_label, alignment=Qt.AlignmentFlag.AlignHCenter)
+            band_layout.addWidget(slider, alignment=Qt.AlignmentFlag.AlignHCenter)
+            band_layout.addWidget(QLabel(f"{freq // 1000}k" if freq >= 1000 else str(freq)),
+                                  alignment=Qt.AlignmentFlag.AlignHCenter)
+            bands_layout.addLayout(band_layout)
+            self.equalizer_sliders.append(slider)
+        layout.addWidget(QLabel("Gain par bande (dB)"))
+        layout.addLayout(bands_layout)
 
     def pick_overlay_color(self):
         current = QColor(self.config.get("overlay", {}).get("color", "#000000"))
@@ -311,10 +444,7 @@ class ConfigUI(QWidget):
             self.config["overlay"]["color"] = color.name()
             self.overlay_color_btn.setStyleSheet(f"background-color: {color.name()}")
 
-    def add_window_config_ui(self):
-        group = QGroupBox("🪟 Configuration de la fenêtre")
-        layout = QVBoxLayout()
-
+    def add_window_config_ui(self, layout):
         # Titre
         title_layout = QHBoxLayout()
         self.title_input = QLabel()
@@ -364,8 +494,6 @@ class ConfigUI(QWidget):
         opacity_layout.addWidget(self.window_opacity_spin)
         layout.addLayout(opacity_layout)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
         
     def merge_defaults(self, defaults, loaded):
         if not isinstance(loaded, dict):
@@ -381,10 +509,7 @@ class ConfigUI(QWidget):
                     result[k] = loaded[k]
         return result
 
-    def add_volume_bar_ui(self):
-        group = QGroupBox("🔊 Configuration de la barre de volume")
-        layout = QVBoxLayout()
-        
+    def add_volume_bar_ui(self, layout):
         self.volume_slider_color_btn = QPushButton()
         self.volume_slider_color_btn.setStyleSheet(f"background-color: {self.config['volume_bar']['slider_color']}")
         self.volume_slider_color_btn.clicked.connect(self.pick_volume_slider_color)
@@ -415,9 +540,6 @@ class ConfigUI(QWidget):
         layout.addWidget(QLabel("Forme du slider"))
         layout.addWidget(self.volume_slider_shape_combo)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
-
     def pick_volume_slider_color(self):
         current = QColor(self.config['volume_bar']['slider_color'])
         color = QColorDialog.getColor(current, self, "Choisir couleur du slider volume")
@@ -432,10 +554,7 @@ class ConfigUI(QWidget):
             self.config['volume_bar']['background_color'] = color.name()
             self.volume_bg_color_btn.setStyleSheet(f"background-color: {color.name()}")
 
-    def add_buttons_general_ui(self):
-        group = QGroupBox("🔘 Configuration générale des boutons")
-        layout = QVBoxLayout()
-        
+    def add_buttons_general_ui(self, layout):
         layout.addWidget(QLabel("Police de caractères :"))
 
         self.font_family_combo = QComboBox()
@@ -456,9 +575,6 @@ class ConfigUI(QWidget):
         self.text_color_btn.clicked.connect(self.pick_text_color)
         layout.addWidget(self.text_color_btn)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
-
     def pick_text_color(self):
         current = QColor(self.config['buttons']['text_color'])
         color = QColorDialog.getColor(current, self, "Choisir couleur du texte")
@@ -466,27 +582,32 @@ class ConfigUI(QWidget):
             self.config['buttons']['text_color'] = color.name()
             self.text_color_btn.setStyleSheet(f"background-color: {color.name()}")
 
-    def add_buttons_detailed_ui(self):
-        group = QGroupBox("🎛️ Configuration détaillée des boutons")
-        layout = QVBoxLayout()
-        
+    def add_buttons_detailed_ui(self, layout):
         self.buttons_tabs = QTabWidget()
-        self.button_config_uis = {}
+        # Un onglet vide par bouton : son formulaire n'est construit qu'à la première ouverture
         for btn_name in self.config["buttons"]:
             if btn_name in ("font_family", "font_size", "text_color", "font_path"):
                 continue
-            ui = ButtonConfigUI(btn_name, self.config["buttons"])
-            self.buttons_tabs.addTab(ui, btn_name.capitalize())
-            self.button_config_uis[btn_name] = ui
+            page = QWidget()
+            page.setProperty("button_name", btn_name)
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self.buttons_tabs.addTab(page, btn_name.capitalize())
+        self.buttons_tabs.currentChanged.connect(self.build_button_tab)
+        self.build_button_tab(self.buttons_tabs.currentIndex())
         layout.addWidget(self.buttons_tabs)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
-
-    def add_progress_bar_ui(self):
-        group = QGroupBox("📊 Configuration de la barre de progression")
-        layout = QVBoxLayout()
-        
+    def build_button_tab(self, index):
+        page = self.buttons_tabs.widget(index)
+        if page is None:
+            return
+        btn_name = page.property("button_name")
+        if btn_name in self.button_config_uis:
+            return
+        ui = ButtonConfigUI(btn_name, self.config["buttons"])
+        page.layout().addWidget(ui)
+        self.button_config_uis[btn_name] = ui
+
+    def add_progress_bar_ui(self, layout):
         self.progress_color_btn = QPushButton()
         self.progress_color_btn.setStyleSheet(f"background-color: {self.config['progress_bar']['color']}")
         self.progress_color_btn.clicked.connect(self.pick_progress_color)
@@ -515,8 +636,15 @@ class ConfigUI(QWidget):
         self.progress_animated_check.setChecked(self.config.get("progress_bar", {}).get("animated", True))
         layout.addWidget(self.progress_animated_check)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
+        self.progress_waveform_check = QCheckBox("Afficher la forme d'onde")
+        self.progress_waveform_check.setChecked(self.config["progress_bar"].get("waveform", False))
+        layout.addWidget(self.progress_waveform_check)
+
+        self.waveform_height_spin = QSpinBox()
+        self.waveform_height_spin.setRange(10, 200)
+        self.waveform_height_spin.setValue(self.config["progress_bar"].get("waveform_height", 40))
+        layout.addWidget(QLabel("Hauteur de la forme d'onde"))
+        layout.addWidget(self.waveform_height_spin)
 
     def pick_progress_color(self):
         current = QColor(self.config['progress_bar']['color'])
@@ -532,10 +660,7 @@ class ConfigUI(QWidget):
             self.config['progress_bar']['background_color'] = color.name()
             self.progress_bg_color_btn.setStyleSheet(f"background-color: {color.name()}")
 
-    def add_visualizer_ui(self):
-        group = QGroupBox("🎵 Configuration du visualiseur")
-        layout = QVBoxLayout()
-
+    def add_visualizer_ui(self, layout):
         self.visualizer_enabled_check = QCheckBox("Activer le visualiseur")
         self.visualizer_enabled_check.setChecked(self.config.get("visualizer", {}).get("enabled", True))
         layout.addWidget(self.visualizer_enabled_check)
@@ -570,8 +695,11 @@ class ConfigUI(QWidget):
         layout.addWidget(QLabel("Style"))
         layout.addWidget(self.visualizer_style_combo)
 
-        group.setLayout(layout)
-        self.main_layout.addWidget(group)
+        self.beat_pulse_spin = QSpinBox()
+        self.beat_pulse_spin.setRange(0, 100)
+        self.beat_pulse_spin.setValue(int(self.config["visualizer"].get("beat_pulse", 0.3) * 100))
+        layout.addWidget(QLabel("Pulsation sur les temps (%, 0 = désactivée)"))
+        layout.addWidget(self.beat_pulse_spin)
 
     def pick_visualizer_color_start(self):
         current = QColor(self.config['visualizer']['color_start'])
@@ -604,61 +732,102 @@ class ConfigUI(QWidget):
             self.bg_img_label.setText(path)
 
     def save_config(self):
+        # Une section jamais ouverte n'a pas pu être modifiée : sa configuration reste telle quelle
         # Window
-        self.config["window"]["width"] = self.width_spin.value()
-        self.config["window"]["height"] = self.height_spin.value()
-        self.config["window"]["title"] = self.title_line.text()
-        self.config["window"]["opacity"] = self.window_opacity_spin.value() / 100.0
+        if self.sections["window"].built:
+            self.config["window"]["width"] = self.width_spin.value()
+            self.config["window"]["height"] = self.height_spin.value()
+            self.config["window"]["title"] = self.title_line.text()
+            self.config["window"]["opacity"] = self.window_opacity_spin.value() / 100.0
 
         # Animations
-        if "animations" not in self.config:
-            self.config["animations"] = {}
-        self.config["animations"]["enabled"] = self.anim_enabled_check.isChecked()
-        self.config["animations"]["hover_enabled"] = self.hover_anim_check.isChecked()
-        self.config["animations"]["click_enabled"] = self.click_anim_check.isChecked()
-        self.config["animations"]["window_fade_in"] = self.fade_in_check.isChecked()
-        self.config["animations"]["duration"] = self.anim_duration_spin.value()
-        self.config["animations"]["hover_scale"] = self.hover_scale_spin.value() / 100.0
-        self.config["animations"]["click_scale"] = self.click_scale_spin.value() / 100.0
+        if self.sections["animations"].built:
+            if "animations" not in self.config:
+                self.config["animations"] = {}
+            self.config["animations"]["enabled"] = self.anim_enabled_check.isChecked()
+            self.config["animations"]["hover_enabled"] = self.hover_anim_check.isChecked()
+            self.config["animations"]["click_enabled"] = self.click_anim_check.isChecked()
+            self.config["animations"]["window_fade_in"] = self.fade_in_check.isChecked()
+            self.config["animations"]["duration"] = self.anim_duration_spin.value()
+            self.config["animations"]["hover_scale"] = self.hover_scale_spin.value() / 100.0
+            self.config["animations"]["click_scale"] = self.click_scale_spin.value() / 100.0
 
         # Overlay
-        if "overlay" not in self.config:
-            self.config["overlay"] = {}
-        self.config["overlay"]["show_on_hover"] = self.overlay_hover_check.isChecked()
-        self.config["overlay"]["opacity"] = self.overlay_opacity_spin.value() / 100.0
+        if self.sections["overlay"].built:
+            if "overlay" not in self.config:
+                self.config["overlay"] = {}
+            self.config["overlay"]["show_on_hover"] = self.overlay_hover_check.isChecked()
+            self.config["overlay"]["opacity"] = self.overlay_opacity_spin.value() / 100.0
+
+        # Power
+        if self.sections["power"].built:
+            self.config["power"]["low_power"] = self.low_power_combo.currentText()
+            self.config["power"]["idle_interval"] = self.idle_interval_spin.value()
+
+        # Playback
+        if self.sections["playback"].built:
+            self.config["playback"]["mode"] = self.playback_mode_combo.currentText()
+            self.config["playback"]["normalize_loudness"] = self.normalize_loudness_check.isChecked()
+            self.config["playback"]["target_lufs"] = float(self.target_lufs_spin.value())
+            self.config["playback"]["trim_silence"] = self.trim_silence_check.isChecked()
+
+        # Equalizer
+        if self.sections["equalizer"].built:
+            self.config["equalizer"]["enabled"] = self.equalizer_enabled_check.isChecked()
+            self.config["equalizer"]["gains"] = [slider.value() for slider in self.equalizer_sliders]
 
         # Buttons general
-        self.config["buttons"]["font_family"] = self.font_family_combo.currentText()
-        self.config["buttons"]["font_size"] = self.font_size_spin.value()
+        if self.sections["buttons"].built:
+            self.config["buttons"]["font_family"] = self.font_family_combo.currentText()
+            self.config["buttons"]["font_size"] = self.font_size_spin.value()
 
         # Buttons detailed
         for btn_name, ui in self.button_config_uis.items():
             ui.update_config()
 
         # Progress bar
-        self.config["progress_bar"]["height"] = self.progress_height_spin.value()
-        self.config["progress_bar"]["radius"] = self.progress_radius_spin.value()
-        self.config["progress_bar"]["animated"] = self.progress_animated_check.isChecked()
+        if self.sections["progress_bar"].built:
+            self.config["progress_bar"]["height"] = self.progress_height_spin.value()
+            self.config["progress_bar"]["radius"] = self.progress_radius_spin.value()
+            self.config["progress_bar"]["animated"] = self.progress_animated_check.isChecked()
+            self.config["progress_bar"]["waveform"] = self.progress_waveform_check.isChecked()
+            self.config["progress_bar"]["waveform_height"] = self.waveform_height_spin.value()
 
         # Visualizer
-        self.config["visualizer"]["enabled"] = self.visualizer_enabled_check.isChecked()
-        self.config["visualizer"]["num_bars"] = self.num_bars_spin.value()
-        self.config["visualizer"]["intensity"] = self.intensity_spin.value() / 10.0
-        self.config["visualizer"]["style"] = self.visualizer_style_combo.currentText()
+        if self.sections["visualizer"].built:
+            self.config["visualizer"]["enabled"] = self.visualizer_enabled_check.isChecked()
+            self.config["visualizer"]["num_bars"] = self.num_bars_spin.value()
+            self.config["visualizer"]["intensity"] = self.intensity_spin.value() / 10.0
+            self.config["visualizer"]["style"] = self.visualizer_style_combo.currentText()
+            self.config["visualizer"]["beat_pulse"] = self.beat_pulse_spin.value() / 100.0
 
         # Volume bar
-        self.config["volume_bar"]["height"] = self.volume_height_spin.value()
-        self.config["volume_bar"]["radius"] = self.volume_radius_spin.value()
-        self.config["volume_bar"]["slider_shape"] = self.volume_slider_shape_combo.currentText()
+        if self.sections["volume_bar"].built:
+            self.config["volume_bar"]["height"] = self.volume_height_spin.value()
+            self.config["volume_bar"]["radius"] = self.volume_radius_spin.value()
+            self.config["volume_bar"]["slider_shape"] = self.volume_slider_shape_combo.currentText()
 
         with open(CONFIG_FILE, "w") as f:
             json.dump(self.config, f, indent=4)
 
         print("✅ Configuration enregistrée avec succès!")
 
+        # Le lecteur ouvert applique la configuration sans redémarrer
+        if send_command("apply_config"):
+            print("🔄 Configuration appliquée au lecteur")
+
+def report_interactive(start=_START):
+    """Temps entre le lancement du module et le premier tour de boucle d'événements après show()"""
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    trace.sample("config_ui.time_to_interactive", elapsed_ms)
+    print(f"⏱️ Configuration interactive en {elapsed_ms:.0f} ms")
+    return elapsed_ms
+
 if __name__ == "__main__":
     import sys
     app = QApplication(sys.argv)
     win = ConfigUI()
     win.show()
+    # Exécuté une fois la fenêtre affichée et les événements en attente traités
+    QTimer.singleShot(0, report_interactive)
     sys.exit(app.exec())
\ No newline at end of file
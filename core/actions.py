@@ -1,72 +1,105 @@
 import os
-import time
-import pygame
-from mutagen.mp3 import MP3
+import mutagen
+from core.trace import traced
+from core.analysis import load_meta, update_meta
+from core.duplicates import load_hidden
+from core.loudness import gain_for, TARGET_LUFS
+from core.audio import create_backend
 
-pygame.mixer.init()
 playlist = []
 current_index = -1
 
-# Temps en ms où la lecture a été mise en pause (ou position de départ)
-last_seek_position = 0
+# Sortie audio (core.audio), créée à la première commande : l'import n'ouvre pas la carte son
+_backend = None
 
-# Timestamp (en secondes) du moment où la musique a été lancée/reprise
-play_start_time = None
+# Durées (ms) lues par mutagen, une seule fois par chargement de piste
+_duration_cache = {}
+
+# Volume du curseur et gain de normalisation de la piste courante (sonie mesurée à l'ingestion)
+_user_volume = 1.0
+_track_gain = 1.0
+normalize_loudness = True
+target_lufs = TARGET_LUFS
+
+# Silences de début/fin coupés (analyse "silence" en cache), désactivable aussi par piste
+trim_silence = True
+_bounds_cache = {}
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+def set_backend(backend):
+    """Remplace la sortie audio (tests, benchmarks) ; la piste courante n'est pas rechargée"""
+    global _backend
+    if _backend is not None:
+        _backend.close()
+    _backend = backend
+
+def is_partial(filename):
+    """Fichier intermédiaire de yt-dlp/ffmpeg (x.mp3.part, x.temp.mp3, fragments...)"""
+    name = filename.lower()
+    return name.endswith((".part", ".ytdl", ".tmp")) or ".part-frag" in name or ".temp." in name
 
 def load_playlist_from_folder(folder_path):
     global playlist, current_index
     playlist.clear()
     current_index = -1
+    # Doublons masqués par python3 -m core.duplicates --hide
+    hidden = load_hidden(folder_path)
     for filename in os.listdir(folder_path):
+        # Les dossiers/fichiers cachés sont des conversions ou téléchargements en cours
+        if filename.startswith(".") or is_partial(filename) or filename in hidden:
+            continue
         if filename.lower().endswith(('.mp3', '.wav', '.ogg')):
             playlist.append(os.path.join(folder_path, filename))
 
+def add_to_playlist(path):
+    """Ajoute une piste à la playlist sans la recharger, retourne son index"""
+    path = os.path.abspath(path)
+    if path in playlist:
+        return playlist.index(path)
+    playlist.append(path)
+    return len(playlist) - 1
+
 def get_current_index():
     global current_index
     return current_index
 
 def set_current_index(index):
-    global current_index, last_seek_position, play_start_time
+    global current_index
     if 0 <= index < len(playlist):
         current_index = index
-        last_seek_position = 0
-        play_start_time = None
+        get_backend().stop()
 
+@traced("load_track_by_index")
 def load_track_by_index(index):
-    global current_index, last_seek_position, play_start_time
+    global current_index
     if 0 <= index < len(playlist):
         current_index = index
-        last_seek_position = 0
-        play_start_time = None
-        pygame.mixer.music.load(playlist[index])
+        _duration_cache.pop(playlist[index], None)
+        _bounds_cache.pop(playlist[index], None)
+        # La lecture commence après le silence de début
+        get_backend().load(playlist[index], start_ms=get_track_bounds_ms()[0])
+        _apply_track_gain(playlist[index])
 
 def play_music():
-    global play_start_time
     if current_index == -1 and len(playlist) > 0:
         load_track_by_index(0)
-    pygame.mixer.music.play(start=last_seek_position / 1000)
-    play_start_time = time.time()
+    get_backend().play()
 
 def pause_music():
-    global last_seek_position, play_start_time
-    if play_start_time is not None:
-        elapsed_ms = int((time.time() - play_start_time) * 1000)
-        last_seek_position += elapsed_ms
-        play_start_time = None
-    pygame.mixer.music.pause()
+    get_backend().pause()
 
 def loop_music():
-    global play_start_time
     if current_index == -1 and len(playlist) > 0:
         load_track_by_index(0)
-    pygame.mixer.music.play(loops=-1, start=last_seek_position / 1000)
-    play_start_time = time.time()
+    get_backend().play(loops=-1)
 
 def stop_music():
-    global last_seek_position, play_start_time
-    pygame.mixer.music.stop()
-    last_seek_position = 0
-    play_start_time = None
+    get_backend().stop()
 
 def skip_track():
     global current_index
@@ -78,38 +111,84 @@ def skip_track():
     play_music()
 
 def rewind_track():
-    global last_seek_position, play_start_time
-    last_seek_position = 0
-    play_start_time = time.time()
-    pygame.mixer.music.play(start=0)
+    get_backend().play(start_ms=get_track_bounds_ms()[0])
 
 def set_volume(vol):
-    pygame.mixer.music.set_volume(vol)
+    global _user_volume
+    _user_volume = vol
+    _apply_volume()
+
+def set_loudness_normalization(enabled, target=TARGET_LUFS):
+    global normalize_loudness, target_lufs
+    normalize_loudness = enabled
+    target_lufs = target
+    if 0 <= current_index < len(playlist):
+        _apply_track_gain(playlist[current_index])
+
+def _apply_track_gain(path):
+    global _track_gain
+    _track_gain = gain_for(load_meta(path).get("loudness_lufs"), target_lufs) if normalize_loudness else 1.0
+    _apply_volume()
+
+def _apply_volume():
+    get_backend().set_volume(min(_user_volume * _track_gain, 1.0))
+
+def set_equalizer(enabled, gains_db):
+    """Active/règle l'égaliseur ; la piste courante continue à la même position"""
+    get_backend().set_equalizer(list(gains_db) if enabled else None)
 
 def get_current_position_ms():
-    global last_seek_position, play_start_time
-    if play_start_time is None:
-        return last_seek_position
-    elapsed_ms = int((time.time() - play_start_time) * 1000)
-    return last_seek_position + elapsed_ms
+    return get_backend().position_ms()
 
-def get_current_track_duration_ms():
-    if current_index == -1 or not playlist:
-        return 0
+def track_ended():
+    """Fin de piste signalée par la sortie audio (lecture lancée, plus rien à jouer)"""
+    return get_backend().ended()
+
+def probe_duration_ms(path):
     try:
-        audio = MP3(playlist[current_index])
-        return int(audio.info.length * 1000)
+        audio = mutagen.File(path)
+        return int(audio.info.length * 1000) if audio is not None else 0
     except Exception:
         return 0
 
-def seek_to_position(ms):
-    global last_seek_position, play_start_time
+def get_current_track_duration_ms():
+    if current_index == -1 or not playlist:
+        return 0
+    # Appelée à chaque tick du timer : on ne relit pas le fichier à chaque fois
+    path = playlist[current_index]
+    if path not in _duration_cache:
+        # Durée pré-calculée à l'ingestion, sinon lecture des en-têtes
+        _duration_cache[path] = load_meta(path).get("duration_ms") or probe_duration_ms(path)
+    return _duration_cache[path]
+
+def get_track_bounds_ms():
+    """(début, fin) de la partie jouée de la piste courante ; la piste entière sans découpe"""
+    dur = get_current_track_duration_ms()
+    if current_index == -1 or not playlist:
+        return 0, dur
+    path = playlist[current_index]
+    if path not in _bounds_cache:
+        meta = load_meta(path)
+        if trim_silence and meta.get("trim_silence", True) and "audio_end_ms" in meta:
+            _bounds_cache[path] = (meta["audio_start_ms"], min(meta["audio_end_ms"], dur or meta["audio_end_ms"]))
+        else:
+            _bounds_cache[path] = (0, dur)
+    return _bounds_cache[path]
+
+def set_silence_trimming(enabled):
+    global trim_silence
+    trim_silence = enabled
+    _bounds_cache.clear()
+
+def set_track_trimming(path, enabled):
+    """Découpe des silences pour une seule piste, enregistrée dans ses métadonnées"""
+    update_meta(path, trim_silence=enabled)
+    _bounds_cache.pop(path, None)
+
+def seek_to_position(ms, loops=0):
     if current_index == -1:
         return
-    last_seek_position = ms
-    play_start_time = time.time()
-    pygame.mixer.music.load(playlist[current_index])
-    pygame.mixer.music.play(start=ms / 1000)
+    get_backend().seek(ms, loops)
 
 def get_current_track_name():
     if 0 <= current_index < len(playlist):
@@ -0,0 +1,493 @@
+import os
+import json
+import math
+import threading
+import numpy as np
+import mutagen
+from core.loudness import integrated_loudness
+
+# Analyses par piste, rangées à côté de la bibliothèque : assets/music/.cache/<piste>.*
+# Un fichier de cache n'est valable que s'il est plus récent que la piste.
+CACHE_DIR = ".cache"
+
+# Paramètres d'analyse partagés avec AudioVisualizer
+SAMPLE_RATE = 22050
+N_FFT = 2048
+HOP_LENGTH = 512
+DEFAULT_BANDS = 60
+
+# Pyramide de pics de la forme d'onde : ~12 ms par pic au niveau 0
+PEAK_BLOCK = 256
+PEAK_MIN_LENGTH = 16
+
+# Vecteur de caractéristiques pour le mode radio (2 x FEATURE_BANDS + 3 valeurs)
+FEATURE_BANDS = 32
+
+# Empreinte binaire pour la détection de doublons : FP_SEGMENTS x (FP_BANDS - 1) bits
+FP_BANDS = 17
+FP_SEGMENTS = 16
+
+# Silences de début/fin : trames RMS à plus de SILENCE_DB sous la trame la plus forte
+SILENCE_DB = -45.0
+SILENCE_MARGIN_MS = 150
+
+# Pulsation sur les temps : décroissance après chaque beat
+BEAT_DECAY_MS = 150
+
+TAG_KEYS = ("title", "artist", "album", "date", "genre")
+
+_meta_lock = threading.Lock()
+
+ANALYZERS = {}
+
+
+def analyzer(name):
+    """Enregistre une analyse calculée à l'ingestion à partir du signal décodé.
+
+    La fonction reçoit (path, y, sr, options) et retourne un dict fusionné
+    dans les métadonnées de la piste.
+    """
+    def decorator(func):
+        ANALYZERS[name] = func
+        return func
+    return decorator
+
+
+def cache_file(track_path, suffix):
+    base = os.path.splitext(os.path.basename(track_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(track_path)), CACHE_DIR, base + suffix)
+
+
+def is_fresh(cache_path, track_path):
+    try:
+        return os.path.getmtime(cache_path) >= os.path.getmtime(track_path)
+    except OSError:
+        return False
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def load_meta(track_path):
+    """Métadonnées en cache (durée, tags, analyses), {} si absentes ou périmées"""
+    path = cache_file(track_path, ".json")
+    if not is_fresh(path, track_path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_meta(track_path, **fields):
+    with _meta_lock:
+        meta = load_meta(track_path)
+        meta.update(fields)
+        data = json.dumps(meta, indent=1, ensure_ascii=False).encode("utf-8")
+        _write_atomic(cache_file(track_path, ".json"), lambda f: f.write(data))
+    return meta
+
+
+def read_tags(track_path):
+    try:
+        audio = mutagen.File(track_path, easy=True)
+    except Exception:
+        return {}
+    if not audio or not audio.tags:
+        return {}
+    return {key: audio.tags[key][0] for key in TAG_KEYS if audio.tags.get(key)}
+
+
+def decode(track_path):
+    # librosa est long à importer : seulement quand il faut vraiment décoder
+    import librosa
+    y, sr = librosa.load(track_path, sr=SAMPLE_RATE, mono=True)
+    return y, sr
+
+
+class TrackWorker:
+    """Un seul thread pour les analyses de la piste courante (temps, forme d'onde).
+
+    Une tâche en attente par clé : une nouvelle demande remplace la précédente,
+    les pistes dépassées ne sont jamais décodées. Le dernier signal décodé est
+    partagé entre les tâches d'une même piste, puis libéré quand la file est vide.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}
+        self._current = {}
+        self._signal = (None, None)
+        self._thread = None
+
+    def submit(self, key, path, job, y=None):
+        """job(path, signal) tourne dans le worker ; signal() rend le signal décodé de la piste"""
+        with self._lock:
+            self._current[key] = path
+            self._pending[key] = (path, job)
+            if y is not None:
+                self._signal = (path, y)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="track-worker", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def is_current(self, key, path):
+        """Faux si une piste plus récente a été demandée pour cette clé depuis"""
+        with self._lock:
+            return self._current.get(key) == path
+
+    def _decoded(self, path):
+        with self._lock:
+            cached_path, y = self._signal
+        if cached_path != path:
+            y, _sr = decode(path)
+            with self._lock:
+                # Ne remplace pas un signal fourni entre-temps par submit(y=...)
+                if self._signal[0] == cached_path:
+                    self._signal = (path, y)
+        return y
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._pending:
+                    self._wake.clear()
+                    self._signal = (None, None)
+                    continue
+                key, (path, job) = next(iter(self._pending.items()))
+                del self._pending[key]
+            try:
+                job(path, lambda: self._decoded(path))
+            except Exception as e:
+                print(f"⚠️ Analyse en arrière-plan impossible : {e}")
+
+
+track_worker = TrackWorker()
+
+
+def magnitude_stft(y, options=None):
+    """|STFT| du signal ; avec options (ingestion), calculée une seule fois pour toutes les analyses"""
+    if options is not None and "_stft" in options:
+        return options["_stft"]
+    import librosa
+    stft = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    if options is not None:
+        options["_stft"] = stft
+    return stft
+
+
+def mel_spectrogram(y, sr, bands, stft=None):
+    """Spectrogramme mel normalisé entre 0 et 1 (bandes x trames), comme le visualiseur"""
+    import librosa
+    stft = magnitude_stft(y) if stft is None else stft
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=bands)
+    spectrogram = librosa.amplitude_to_db(np.dot(mel_basis, stft), ref=np.max)
+    return ((spectrogram + 80) / 80).astype(np.float32)
+
+
+def load_spectrogram(track_path, bands):
+    path = cache_file(track_path, f".mel{bands}.npy")
+    if not is_fresh(path, track_path):
+        return None
+    try:
+        return np.load(path).astype(np.float32)
+    except (OSError, ValueError):
+        return None
+
+
+def save_spectrogram(track_path, bands, spectrogram):
+    # float16 : précision largement suffisante pour des hauteurs de barres
+    _write_atomic(cache_file(track_path, f".mel{bands}.npy"),
+                  lambda f: np.save(f, spectrogram.astype(np.float16)))
+
+
+def artwork_path(track_path):
+    """Pochette réduite si elle est à jour, sinon le GIF d'origine (ou None)"""
+    gif = os.path.splitext(track_path)[0] + ".gif"
+    if not os.path.isfile(gif):
+        return None
+    thumb = cache_file(track_path, ".thumb.gif")
+    return thumb if is_fresh(thumb, gif) else gif
+
+
+def make_artwork_thumb(track_path, size=None, fps=None, task=None):
+    """Pochette optimisée (réduite, décimée, palette commune) dans le cache ; None sans GIF ni ffmpeg"""
+    from core import artwork
+    gif = os.path.splitext(track_path)[0] + ".gif"
+    if not os.path.isfile(gif):
+        return None
+    thumb = cache_file(track_path, ".thumb.gif")
+    if not artwork.optimize_gif(gif, thumb, size or artwork.DEFAULT_SIZE, fps or artwork.DEFAULT_FPS, task=task):
+        return None
+    return thumb
+
+
+class PeakPyramid:
+    """Pics min/max du signal, du niveau 0 (PEAK_BLOCK échantillons par pic) au plus grossier.
+
+    Chaque niveau divise le précédent par deux ; les valeurs sont quantifiées en int8.
+    """
+
+    def __init__(self, mins, maxs, offsets, block=None):
+        self.mins = mins
+        self.maxs = maxs
+        self.offsets = offsets
+        self.block = block or PEAK_BLOCK
+
+    @property
+    def levels(self):
+        return len(self.offsets) - 1
+
+    def level(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.mins[start:end], self.maxs[start:end]
+
+    def columns(self, width):
+        """(mins, maxs) entre -1 et 1 pour width colonnes, sans relire le signal"""
+        # Le niveau le plus grossier qui a encore au moins un pic par colonne
+        chosen = 0
+        for i in range(self.levels):
+            if self.offsets[i + 1] - self.offsets[i] >= width:
+                chosen = i
+        mins, maxs = self.level(chosen)
+        if width <= 0 or len(mins) == 0:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+        edges = (np.arange(width) * len(mins)) // width
+        return (np.minimum.reduceat(mins, edges).astype(np.float32) / 127,
+                np.maximum.reduceat(maxs, edges).astype(np.float32) / 127)
+
+
+def compute_peaks(y, block=PEAK_BLOCK, min_length=PEAK_MIN_LENGTH):
+    count = max(1, -(-len(y) // block))
+    padded = np.zeros(count * block, dtype=np.float32)
+    padded[:len(y)] = y
+    frames = padded.reshape(count, block)
+    mins = np.round(np.clip(frames.min(axis=1), -1, 1) * 127).astype(np.int8)
+    maxs = np.round(np.clip(frames.max(axis=1), -1, 1) * 127).astype(np.int8)
+
+    all_mins, all_maxs, offsets = [mins], [maxs], [0, len(mins)]
+    while len(mins) > min_length:
+        if len(mins) % 2:
+            mins, maxs = np.append(mins, mins[-1]), np.append(maxs, maxs[-1])
+        mins = np.minimum(mins[0::2], mins[1::2])
+        maxs = np.maximum(maxs[0::2], maxs[1::2])
+        all_mins.append(mins)
+        all_maxs.append(maxs)
+        offsets.append(offsets[-1] + len(mins))
+    return PeakPyramid(np.concatenate(all_mins), np.concatenate(all_maxs),
+                       np.asarray(offsets, dtype=np.int64), block)
+
+
+def load_peaks(track_path):
+    path = cache_file(track_path, ".peaks.npz")
+    if not is_fresh(path, track_path):
+        return None
+    try:
+        with np.load(path) as data:
+            return PeakPyramid(data["mins"], data["maxs"], data["offsets"], int(data["block"]))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_peaks(track_path, pyramid):
+    _write_atomic(cache_file(track_path, ".peaks.npz"), lambda f: np.savez(
+        f, mins=pyramid.mins, maxs=pyramid.maxs, offsets=pyramid.offsets, block=pyramid.block))
+
+
+@analyzer("spectrogram")
+def analyze_spectrogram(path, y, sr, options):
+    bands = options.get("bands", DEFAULT_BANDS)
+    save_spectrogram(path, bands, mel_spectrogram(y, sr, bands, magnitude_stft(y, options)))
+    return {"bands": bands}
+
+
+def onset_envelope(stft, sr):
+    import librosa
+    return librosa.onset.onset_strength(S=librosa.amplitude_to_db(stft, ref=np.max), sr=sr)
+
+
+def shared_onset_envelope(y, sr, options):
+    """Enveloppe d'onsets de l'ingestion, calculée une seule fois comme la STFT"""
+    if "_onset" not in options:
+        options["_onset"] = onset_envelope(magnitude_stft(y, options), sr)
+    return options["_onset"]
+
+
+class BeatGrid:
+    """Temps d'une piste : tempo, instants des beats (ms) et force de chacun (0 à 1)"""
+
+    def __init__(self, tempo, times_ms, strengths):
+        self.tempo = float(tempo)
+        self.times_ms = np.asarray(times_ms, dtype=np.int32)
+        self.strengths = np.asarray(strengths, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.times_ms)
+
+    def pulse(self, ms, decay_ms=BEAT_DECAY_MS):
+        """Intensité à la position ms : force du dernier beat, qui décroît ensuite"""
+        i = int(np.searchsorted(self.times_ms, ms, side="right")) - 1
+        if i < 0:
+            return 0.0
+        return float(self.strengths[i]) * math.exp(-(ms - int(self.times_ms[i])) / decay_ms)
+
+
+def compute_beats(y, sr, stft=None, onset_env=None):
+    import librosa
+    if onset_env is None:
+        onset_env = onset_envelope(magnitude_stft(y) if stft is None else stft, sr)
+    tempo, frames = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)
+    frames = np.asarray(frames, dtype=np.int64)
+    times = np.round(librosa.frames_to_time(frames, sr=sr, hop_length=HOP_LENGTH) * 1000)
+    strengths = onset_env[frames] if len(frames) else np.zeros(0, dtype=np.float32)
+    if len(strengths):
+        # Normalisé sur les beats forts de la piste : quelques pics isolés n'écrasent pas le reste
+        strengths = np.clip(strengths / (np.percentile(strengths, 95) + 1e-6), 0, 1)
+    return BeatGrid(np.atleast_1d(tempo)[0], times, strengths)
+
+
+def load_beats(track_path):
+    path = cache_file(track_path, ".beats.npz")
+    if not is_fresh(path, track_path):
+        return None
+    try:
+        with np.load(path) as data:
+            return BeatGrid(float(data["tempo"]), data["times_ms"], data["strengths"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_beats(track_path, beats):
+    _write_atomic(cache_file(track_path, ".beats.npz"), lambda f: np.savez(
+        f, tempo=beats.tempo, times_ms=beats.times_ms, strengths=beats.strengths.astype(np.float16)))
+
+
+@analyzer("beats")
+def analyze_beats(path, y, sr, options):
+    beats = compute_beats(y, sr, onset_env=shared_onset_envelope(y, sr, options))
+    save_beats(path, beats)
+    return {"tempo": round(beats.tempo, 1)}
+
+
+def feature_vector(y, sr, stft=None, onset_env=None):
+    """Empreinte de timbre et de rythme : moyenne/variance des bandes mel,
+    centroïde spectral (moyenne, écart type) et tempo"""
+    import librosa
+    stft = magnitude_stft(y) if stft is None else stft
+    mel = mel_spectrogram(y, sr, FEATURE_BANDS, stft)
+    centroid = librosa.feature.spectral_centroid(S=stft, sr=sr)[0] / (sr / 2)
+    if onset_env is None:
+        onset_env = onset_envelope(stft, sr)
+    tempo = float(np.atleast_1d(librosa.beat.tempo(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH))[0])
+    return np.concatenate([
+        mel.mean(axis=1), mel.var(axis=1),
+        [centroid.mean(), centroid.std(), tempo / 200.0],
+    ]).astype(np.float32)
+
+
+@analyzer("features")
+def analyze_features(path, y, sr, options):
+    vector = feature_vector(y, sr, magnitude_stft(y, options), shared_onset_envelope(y, sr, options))
+    return {"features": [round(float(v), 5) for v in vector]}
+
+
+def fingerprint(y, sr, stft=None):
+    """Empreinte binaire compacte (32 octets) tirée des énergies de bandes.
+
+    La piste est découpée en FP_SEGMENTS segments ; pour chacun, un bit par paire de
+    bandes voisines dit laquelle dépasse sa moyenne sur la piste de plus. Insensible au
+    volume et au réencodage, elle se compare par distance de Hamming.
+    """
+    mel = mel_spectrogram(y, sr, FP_BANDS, stft)
+    frames = max(mel.shape[1] // FP_SEGMENTS, 1)
+    if mel.shape[1] < FP_SEGMENTS:
+        mel = np.pad(mel, ((0, 0), (0, FP_SEGMENTS - mel.shape[1])), mode="edge")
+    energies = mel[:, :frames * FP_SEGMENTS].reshape(FP_BANDS, FP_SEGMENTS, frames).mean(axis=2)
+    centered = energies - energies.mean(axis=1, keepdims=True)
+    bits = centered[:-1] > centered[1:]
+    return np.packbits(bits.T.ravel())
+
+
+@analyzer("fingerprint")
+def analyze_fingerprint(path, y, sr, options):
+    return {"fingerprint": fingerprint(y, sr, magnitude_stft(y, options)).tobytes().hex()}
+
+
+@analyzer("loudness")
+def analyze_loudness(path, y, sr, options):
+    return {"loudness_lufs": integrated_loudness(y, sr)}
+
+
+def audible_bounds(y, sr, threshold_db=SILENCE_DB, margin_ms=SILENCE_MARGIN_MS):
+    """(début, fin) en ms de la partie audible, d'après l'enveloppe RMS par trames de HOP_LENGTH"""
+    duration_ms = int(len(y) / sr * 1000)
+    frames = len(y) // HOP_LENGTH
+    if not frames:
+        return 0, duration_ms
+    blocks = np.asarray(y[:frames * HOP_LENGTH], dtype=np.float64).reshape(frames, HOP_LENGTH)
+    rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+    if rms.max() <= 0:
+        return 0, duration_ms
+    audible = np.flatnonzero(20 * np.log10(np.maximum(rms, 1e-10) / rms.max()) > threshold_db)
+    frame_ms = HOP_LENGTH / sr * 1000
+    return (max(0, int(audible[0] * frame_ms - margin_ms)),
+            min(duration_ms, int((audible[-1] + 1) * frame_ms + margin_ms)))
+
+
+def bounds_meta(y, sr):
+    start, end = audible_bounds(y, sr)
+    return {"audio_start_ms": start, "audio_end_ms": end}
+
+
+@analyzer("silence")
+def analyze_silence(path, y, sr, options):
+    return bounds_meta(y, sr)
+
+
+@analyzer("peaks")
+def analyze_peaks(path, y, sr, options):
+    save_peaks(path, compute_peaks(y))
+    return {}
+
+
+def ingest(track_path, bands=DEFAULT_BANDS, artwork=True, artwork_size=None, artwork_fps=None, task=None):
+    """Pré-analyse une piste : durée, tags, analyses audio et pochette réduite.
+
+    Le fichier n'est décodé qu'une fois ; chaque analyse enregistrée part du même signal.
+    """
+    options = {"bands": bands}
+    meta = {"tags": read_tags(track_path)}
+    try:
+        meta["duration_ms"] = int(mutagen.File(track_path).info.length * 1000)
+    except Exception:
+        pass
+
+    y, sr = decode(track_path)
+    meta.setdefault("duration_ms", int(len(y) / sr * 1000))
+    for name, func in ANALYZERS.items():
+        if task is not None:
+            task.check_cancelled()
+        meta.update(func(track_path, y, sr, options))
+
+    if artwork:
+        try:
+            thumb = make_artwork_thumb(track_path, artwork_size, artwork_fps, task=task)
+            if thumb:
+                meta["artwork"] = os.path.basename(thumb)
+                meta["artwork_bytes"] = [os.path.getsize(os.path.splitext(track_path)[0] + ".gif"),
+                                         os.path.getsize(thumb)]
+        except Exception as e:
+            # Une annulation n'est pas un échec de la pochette : elle remonte à la tâche
+            if task is not None:
+                task.check_cancelled()
+            print(f"⚠️ Pochette réduite impossible : {e}")
+    return update_meta(track_path, **meta)
@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from core.converter import FFmpegBackend, run_process
+
+# Pochettes affichées dans un label de ~120 px : inutile de garder 250 px à 10 images/s
+DEFAULT_SIZE = 120
+DEFAULT_FPS = 8
+DEFAULT_COLORS = 128
+
+
+def optimize_command(ffmpeg, src, dst, size=DEFAULT_SIZE, fps=DEFAULT_FPS, colors=DEFAULT_COLORS):
+    """Réduction, décimation des images identiques et palette unique pour tout le GIF.
+
+    paletteuse en diff_mode=rectangle ne réencode que la zone qui change d'une image
+    à l'autre, ce qui réduit à la fois le fichier et le travail de QMovie.
+    """
+    crop = f"scale={size}:{size}:force_original_aspect_ratio=increase:flags=lanczos,crop={size}:{size}"
+    graph = (f"fps={fps},{crop},mpdecimate,split[a][b];"
+             f"[a]palettegen=max_colors={colors}:stats_mode=full[p];"
+             f"[b][p]paletteuse=dither=bayer:bayer_scale=3:diff_mode=rectangle")
+    return [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostats",
+            "-i", src, "-lavfi", graph, "-f", "gif", dst, "-y"]
+
+
+def optimize_gif(src, dst, size=DEFAULT_SIZE, fps=DEFAULT_FPS, colors=DEFAULT_COLORS, task=None):
+    """Écrit la version optimisée de src dans dst (atomique) ; retourne False sans ffmpeg"""
+    backend = FFmpegBackend()
+    if not backend.available():
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        run_process(optimize_command(backend.ffmpeg, src, tmp, size, fps, colors), task)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
+
+
+def decode_time_ms(path, repeat=3):
+    """Temps de décodage de toutes les images, comme QMovie le fait en boucle (meilleur de repeat)"""
+    from PyQt6.QtGui import QImageReader
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reader = QImageReader(path)
+        while reader.canRead():
+            if reader.read().isNull():
+                break
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best or 0.0
+
+
+def library_gifs(library_dir):
+    for name in sorted(os.listdir(library_dir)):
+        if name.lower().endswith(".gif") and not name.startswith("."):
+            track = os.path.join(library_dir, os.path.splitext(name)[0] + ".mp3")
+            yield os.path.join(library_dir, name), track
+
+
+def optimize_library(library_dir, size=DEFAULT_SIZE, fps=DEFAULT_FPS, colors=DEFAULT_COLORS,
+                     replace=False, jobs=None, measure=True):
+    """Optimise toutes les pochettes de la bibliothèque.
+
+    Par défaut, la version réduite va dans le cache du lecteur (.cache/<piste>.thumb.gif) ;
+    avec replace=True elle remplace le GIF d'origine quand elle est plus petite.
+    Retourne une ligne de rapport par pochette ; un GIF illisible n'arrête pas le lot,
+    son message d'erreur est dans "error" (None si tout s'est bien passé).
+    """
+    from core.analysis import cache_file
+
+    def optimize_one(item):
+        gif, track = item
+        dst = gif + ".opt.tmp" if replace else cache_file(track, ".thumb.gif")
+        result = {"gif": gif, "output": None, "bytes_before": 0, "bytes_after": 0, "error": None}
+        try:
+            result["bytes_before"] = result["bytes_after"] = os.path.getsize(gif)
+            if not optimize_gif(gif, dst, size, fps, colors):
+                raise FileNotFoundError("ffmpeg introuvable")
+            result["output"] = dst
+            result["bytes_after"] = os.path.getsize(dst)
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        return result
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        results = list(pool.map(optimize_one, library_gifs(library_dir)))
+
+    # Mesures séquentielles : les conversions parallèles fausseraient les temps
+    for result in results:
+        if result["error"]:
+            continue
+        if measure:
+            result["decode_ms_before"] = round(decode_time_ms(result["gif"]), 2)
+            result["decode_ms_after"] = round(decode_time_ms(result["output"]), 2)
+        if replace:
+            if result["bytes_after"] < result["bytes_before"]:
+                os.replace(result["output"], result["gif"])
+                result["output"] = result["gif"]
+            else:
+                os.remove(result["output"])
+                result["output"] = None
+                result["bytes_after"] = result["bytes_before"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Optimisation des pochettes GIF de la bibliothèque')
+    parser.add_argument('--library', default='assets/music')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help='Côté en pixels')
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help='Images par seconde')
+    parser.add_argument('--colors', type=int, default=DEFAULT_COLORS, help='Taille de la palette commune')
+    parser.add_argument('--replace', action='store_true',
+                        help="Remplace les GIF d'origine (sinon : copies réduites dans .cache/)")
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--no-measure', action='store_true', help='Ne mesure pas les temps de décodage')
+    args = parser.parse_args()
+
+    results = optimize_library(args.library, args.size, args.fps, args.colors,
+                               args.replace, args.jobs, measure=not args.no_measure)
+    failed = [r for r in results if r["error"]]
+    results = [r for r in results if not r["error"]]
+    total_before = sum(r["bytes_before"] for r in results)
+    total_after = sum(r["bytes_after"] for r in results)
+    for r in results:
+        line = f"{os.path.basename(r['gif'])} : {r['bytes_before'] / 1024:.0f} → {r['bytes_after'] / 1024:.0f} Ko"
+        if "decode_ms_before" in r:
+            line += f", décodage {r['decode_ms_before']:.1f} → {r['decode_ms_after']:.1f} ms"
+        print(line)
+    if results:
+        print(f"✅ {len(results)} pochettes, {(total_before - total_after) / 1e6:.2f} Mo économisés "
+              f"({100 * (1 - total_after / max(total_before, 1)):.0f} %)")
+        if not args.no_measure:
+            before = sum(r["decode_ms_before"] for r in results)
+            after = sum(r["decode_ms_after"] for r in results)
+            print(f"⏱️  Décodage total : {before:.0f} → {after:.0f} ms (x{before / max(after, 1e-3):.1f})")
+    for r in failed:
+        print(f"❌ {os.path.basename(r['gif'])} : {r['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+import os
+import time
+import wave
+import numpy as np
+
+# Sorties audio de core.actions. Chaque backend a les mêmes commandes (load, play, pause,
+# stop, seek, position, fin de piste, volume) ; la position vient d'une horloge partagée
+# par la classe de base, le backend ne fait que piloter sa sortie.
+BACKENDS = {}
+
+
+def backend(name):
+    def decorator(cls):
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def create_backend(name=None, **options):
+    """Backend par nom ; par défaut NYRVANA_AUDIO, sinon pygame"""
+    name = name or os.environ.get("NYRVANA_AUDIO", "pygame")
+    if name not in BACKENDS:
+        raise ValueError(f"Sortie audio inconnue : {name} ({', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
+
+
+class AudioBackend:
+    name = None
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.path = None
+        self.volume = 1.0
+        self.loops = 0
+        self._offset_ms = 0
+        # Instant (horloge) du dernier play ; None à l'arrêt ou en pause
+        self._started = None
+
+    @property
+    def playing(self):
+        return self._started is not None
+
+    def position_ms(self):
+        if self._started is None:
+            return self._offset_ms
+        return self._offset_ms + int((self.clock() - self._started) * 1000)
+
+    def load(self, path, start_ms=0):
+        """Charge une piste sans la jouer ; la lecture partira de start_ms"""
+        self.stop()
+        self.path = path
+        self._open(path)
+        self._offset_ms = int(start_ms)
+
+    def play(self, start_ms=None, loops=0):
+        """Lecture depuis start_ms (par défaut : la position courante)"""
+        if self.path is None:
+            return
+        offset = self.position_ms() if start_ms is None else int(start_ms)
+        self.loops = loops
+        self._start(offset, loops)
+        self._offset_ms = offset
+        self._started = self.clock()
+
+    def pause(self):
+        position = self.position_ms()
+        self._pause()
+        self._offset_ms = position
+        self._started = None
+
+    def stop(self):
+        self._stop()
+        self._offset_ms = 0
+        self._started = None
+
+    def seek(self, ms, loops=0):
+        """Saut à ms, lecture lancée (loops=-1 : en boucle)"""
+        self.play(ms, loops)
+
+    def ended(self):
+        """Vrai quand la sortie a fini la piste alors que la lecture était lancée"""
+        return self.playing and self.loops != -1 and self._finished()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self._set_volume(volume)
+
+    def set_equalizer(self, gains_db):
+        """Gains de l'égaliseur en dB (None ou tout à 0 : pas de filtrage)"""
+
+    def close(self):
+        self.stop()
+
+    # Commandes propres à chaque sortie
+    def _open(self, path):
+        pass
+
+    def _start(self, start_ms, loops):
+        pass
+
+    def _pause(self):
+        pass
+
+    def _stop(self):
+        pass
+
+    def _finished(self):
+        return False
+
+    def _set_volume(self, volume):
+        pass
+
+
+@backend("pygame")
+class PygameBackend(AudioBackend):
+    """pygame.mixer.music, ou lecture par blocs PCM (core.pcm) quand l'égaliseur filtre"""
+
+    def __init__(self, clock=time.monotonic):
+        super().__init__(clock)
+        self._pygame = None
+        self._pcm = None
+
+    def _mixer(self):
+        # Initialisé à la première commande : importer core.actions n'ouvre pas la carte son
+        if self._pygame is None:
+            import pygame
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self._pygame = pygame
+        return self._pygame
+
+    def _output(self):
+        return self._pcm if self._pcm is not None else self._mixer().mixer.music
+
+    def position_ms(self):
+        # Lecture PCM en attente du décodage : la position n'avance pas encore
+        if self._pcm is not None and self._pcm.pending:
+            return self._offset_ms
+        return super().position_ms()
+
+    def _audio_started(self):
+        # Premier bloc PCM joué (thread d'alimentation) : l'horloge part de là
+        if self._started is not None:
+            self._started = self.clock()
+
+    def _open(self, path):
+        self._mixer()
+        self._output().load(path)
+        self._set_volume(self.volume)
+
+    def seek(self, ms, loops=0):
+        # pygame ignore parfois start= sur un flux déjà lu : on recharge avant de sauter
+        if self.path is not None:
+            self._output().load(self.path)
+        super().seek(ms, loops)
+
+    def _start(self, start_ms, loops):
+        self._output().play(loops=loops, start=start_ms / 1000)
+
+    def _pause(self):
+        if self._pygame is not None:
+            self._output().pause()
+
+    def _stop(self):
+        if self._pygame is not None:
+            self._output().stop()
+
+    def _finished(self):
+        return not self._output().get_busy()
+
+    def _set_volume(self, volume):
+        if self._pygame is not None:
+            self._output().set_volume(volume)
+
+    def set_equalizer(self, gains_db):
+        active = bool(gains_db) and any(gains_db)
+        if active and self._pcm is not None:
+            self._pcm.set_gains(gains_db)
+            return
+        if active == (self._pcm is not None):
+            return
+        from core.pcm import PcmStream
+        playing, position = self.playing, self.position_ms()
+        self._stop()
+        self._pcm = PcmStream(gains_db) if active else None
+        if self._pcm is not None:
+            self._pcm.on_start = self._audio_started
+        if self.path is not None:
+            self._open(self.path)
+            if playing:
+                self.play(position, self.loops)
+            else:
+                self._offset_ms = position
+
+
+def _probe_duration_ms(path):
+    import mutagen
+    try:
+        audio = mutagen.File(path)
+        return int(audio.info.length * 1000) if audio is not None else 0
+    except Exception:
+        return 0
+
+
+class VirtualClock:
+    """Horloge (en secondes) qui n'avance que par advance() : tests et benchmarks"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+
+@backend("null")
+class NullBackend(AudioBackend):
+    """Sortie sans carte son. Avec wav_path, ce qui aurait été entendu est écrit dans un WAV.
+
+    Par défaut l'horloge est virtuelle (advance(ms) fait passer le temps) ;
+    realtime=True suit le temps réel, pour faire tourner le lecteur sans audio.
+    """
+
+    def __init__(self, wav_path=None, realtime=None, clock=None):
+        if realtime is None:
+            realtime = os.environ.get("NYRVANA_AUDIO_REALTIME", "") == "1"
+        super().__init__(clock or (time.monotonic if realtime else VirtualClock()))
+        self.wav_path = wav_path or os.environ.get("NYRVANA_AUDIO_WAV") or None
+        self.duration_ms = 0
+        self.equalizer = None
+        self._gains = None
+        self._pcm = None
+        self._sr = None
+        self._written_ms = 0
+        self._wav = None
+
+    def advance(self, ms):
+        self.clock.advance(ms)
+        self._flush()
+
+    def _open(self, path):
+        from core.analysis import load_meta, decode
+        self._pcm = None
+        self.duration_ms = load_meta(path).get("duration_ms") or _probe_duration_ms(path)
+        if self.wav_path:
+            # Décodage seulement pour écrire le WAV : sans fichier, la durée suffit
+            self._pcm, self._sr = decode(path)
+            self.duration_ms = int(len(self._pcm) / self._sr * 1000)
+        self.set_equalizer(self._gains)
+
+    def _start(self, start_ms, loops):
+        # Ce qui a été joué avant le saut est écrit, la suite repart de start_ms
+        self._flush()
+        self._written_ms = start_ms
+        if self.equalizer is not None:
+            self.equalizer.reset()
+
+    def _pause(self):
+        self._flush()
+
+    def _stop(self):
+        self._flush()
+
+    def _finished(self):
+        return self.position_ms() >= self.duration_ms
+
+    def set_equalizer(self, gains_db):
+        from core.equalizer import Equalizer
+        self._gains = gains_db
+        self.equalizer = None
+        if gains_db and any(gains_db) and self._sr:
+            self.equalizer = Equalizer(gains_db, self._sr, 1)
+
+    def _flush(self):
+        """Écrit dans le WAV le signal joué depuis la dernière écriture"""
+        if self._pcm is None or not self.wav_path or self._started is None:
+            return
+        end_ms = min(self.position_ms(), self.duration_ms)
+        first, last = (int(ms * self._sr / 1000) for ms in (self._written_ms, end_ms))
+        self._written_ms = max(self._written_ms, end_ms)
+        if last <= first:
+            return
+        block = self._pcm[first:last, None].astype(np.float32) * self.volume
+        if self.equalizer is not None:
+            block = self.equalizer.process(block)
+        if self._wav is None:
+            self._wav = wave.open(self.wav_path, "wb")
+            self._wav.setnchannels(1)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(self._sr)
+        self._wav.writeframes((np.clip(block[:, 0], -1, 1) * 32767).astype(np.int16).tobytes())
+
+    def close(self):
+        super().close()
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from core.downloader import (
+    DownloadQueue, DONE, ERROR, CANCELLED, FINAL_STATES, is_playlist_url, expand_playlist,
+)
+
+# Import en masse sans interface :
+#     python3 research.py --batch requetes.txt --jobs 4
+# Une ligne JSON par événement sur stdout, le reste (yt-dlp, ffmpeg) part sur stderr.
+
+
+def read_queries(source):
+    """Requêtes d'un fichier texte (une par ligne, # pour commenter) ou d'une URL.
+
+    Les URLs de playlist sont remplacées par les vidéos qu'elles contiennent.
+    """
+    if source.startswith(("http://", "https://")):
+        lines = [source]
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+    queries = []
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        if is_playlist_url(line):
+            queries.extend(expand_playlist(line))
+        else:
+            queries.append(line)
+    # Doublons retirés, ordre conservé
+    return list(dict.fromkeys(queries))
+
+
+def default_state_path(source, output_dir):
+    if source.startswith(("http://", "https://")):
+        return os.path.join(output_dir, ".cache", "batch-state.json")
+    return f"{source}.state.json"
+
+
+class BatchState:
+    """Résultat de chaque requête, réécrit à chaque fin de tâche pour pouvoir reprendre"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.items = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.items = json.load(f).get("items", {})
+        except (OSError, ValueError):
+            pass
+
+    def is_done(self, query):
+        return self.items.get(query, {}).get("state") == DONE
+
+    def record(self, job):
+        with self._lock:
+            self.items[job.query] = {
+                "state": job.state,
+                "message": job.message,
+                "files": [os.path.basename(f) for f in job.files],
+            }
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"items": self.items}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def run_batch(source, jobs=2, state_path=None, output_dir="assets/music", out=None, **queue_options):
+    """Télécharge toutes les requêtes de source ; retourne le code de sortie (1 si un échec)"""
+    out = out or sys.stdout
+    write_lock = threading.Lock()
+
+    def emit(event, **fields):
+        with write_lock:
+            out.write(json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n")
+            out.flush()
+
+    # Tout ce qui écrit sur stdout (yt-dlp, messages du pipeline) est renvoyé sur stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        queries = read_queries(source)
+        state = BatchState(state_path or default_state_path(source, output_dir))
+        pending = [q for q in queries if not state.is_done(q)]
+        emit("start", total=len(queries), skipped=len(queries) - len(pending), pending=len(pending))
+
+        remaining = {"count": len(pending)}
+        finished = threading.Event()
+        if not pending:
+            finished.set()
+        last_sent = {}
+
+        def on_update(job):
+            # Une ligne par changement d'état/message ou par point de pourcentage
+            key = (job.state, job.message, int(job.progress * 100))
+            if last_sent.get(job.id) == key:
+                return
+            last_sent[job.id] = key
+            emit("job", id=job.id, query=job.query, state=job.state,
+                 progress=round(job.progress, 3), message=job.message,
+                 files=[os.path.basename(f) for f in job.files])
+            if job.state in FINAL_STATES:
+                state.record(job)
+                with write_lock:
+                    remaining["count"] -= 1
+                    if remaining["count"] <= 0:
+                        finished.set()
+
+        started = time.monotonic()
+        queue = DownloadQueue(output_dir=output_dir, fetch_workers=jobs, on_update=on_update, **queue_options)
+        submitted = [queue.submit(query) for query in pending]
+        try:
+            # Attente par tranches : Ctrl+C reste possible et annule proprement
+            while not finished.wait(0.5):
+                pass
+            queue.shutdown(wait=True)
+        except KeyboardInterrupt:
+            queue.shutdown(wait=True, cancel=True)
+
+        failed = [job for job in submitted if job.state in (ERROR, CANCELLED) or not job.finished]
+        emit("summary", total=len(queries), done=len(submitted) - len(failed),
+             skipped=len(queries) - len(pending), failed=len(failed),
+             wall_time=round(time.monotonic() - started, 2))
+
+    for job in failed:
+        print(f"❌ {job.query} : {job.message}", file=sys.stderr)
+    print(f"✅ {len(submitted) - len(failed)}/{len(submitted)} téléchargements réussis "
+          f"({len(queries) - len(pending)} déjà faits)", file=sys.stderr)
+    return 1 if failed else 0
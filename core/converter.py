@@ -0,0 +1,247 @@
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+CONVERT_PATH = "./core/convert"
+
+# Pochette : les 10 premières secondes, 250x250, 10 images/s (comme core/convert.c)
+ARTWORK_SECONDS = 10
+ARTWORK_SIZE = 250
+ARTWORK_FPS = 10
+
+
+class ConversionCancelled(Exception):
+    pass
+
+
+class ConversionTask:
+    """Conversion annulable ; DownloadJob expose la même interface (_process, check_cancelled)"""
+
+    def __init__(self):
+        self._process = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise ConversionCancelled()
+
+
+class ConversionBackend:
+    """Transforme des sources téléchargées en <base>.mp3 + <base>.gif dans out_dir.
+
+    sources : {"video": mp4} ou {"audio": fichier, "visual": extrait/miniature}
+    on_progress(ratio) reçoit une valeur entre 0 et 1.
+    """
+    name = ""
+
+    def available(self):
+        return False
+
+    def supports(self, sources):
+        return True
+
+    def convert(self, sources, out_dir, base_name, task=None, on_progress=None):
+        raise NotImplementedError
+
+
+class CBinaryBackend(ConversionBackend):
+    """Binaire historique core/convert : une vidéo par appel, sans progression"""
+    name = "c"
+
+    def __init__(self, convert_path=CONVERT_PATH):
+        self.convert_path = os.path.abspath(convert_path)
+
+    def available(self):
+        return os.access(self.convert_path, os.X_OK)
+
+    def supports(self, sources):
+        return "video" in sources
+
+    def convert(self, sources, out_dir, base_name, task=None, on_progress=None):
+        if not self.available():
+            raise FileNotFoundError(f"Programme introuvable : {self.convert_path}")
+        # Le binaire écrit dans ./core relatif au dossier courant : un dossier par appel,
+        # des conversions parallèles vers le même out_dir ne se marchent pas dessus
+        work_dir = tempfile.mkdtemp(prefix=".c-backend-", dir=out_dir)
+        os.makedirs(os.path.join(work_dir, "core"))
+        try:
+            run_process([self.convert_path, os.path.abspath(sources["video"])], task, cwd=work_dir)
+            for ext in ('.mp3', '.gif'):
+                produced = os.path.join(work_dir, "core", f"{base_name}{ext}")
+                if os.path.exists(produced):
+                    os.replace(produced, os.path.join(out_dir, f"{base_name}{ext}"))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if on_progress:
+            on_progress(1.0)
+
+
+class FFmpegBackend(ConversionBackend):
+    """Pipeline ffmpeg en sous-processus, progression lue sur -progress pipe:1"""
+    name = "ffmpeg"
+
+    def __init__(self, ffmpeg="ffmpeg", ffprobe="ffprobe"):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+
+    def available(self):
+        return shutil.which(self.ffmpeg) is not None
+
+    def convert(self, sources, out_dir, base_name, task=None, on_progress=None):
+        audio_src = sources.get("audio") or sources["video"]
+        visual_src = sources.get("visual") or sources.get("video")
+        out_mp3 = os.path.join(out_dir, f"{base_name}.mp3")
+        out_gif = os.path.join(out_dir, f"{base_name}.gif")
+
+        # Le MP3 représente l'essentiel du travail, le GIF ne porte que sur 10 s
+        steps = [(0.0, 0.85 if visual_src else 1.0, self.mp3_command(audio_src, out_mp3), self.probe_duration(audio_src))]
+        if visual_src:
+            gif_duration = min(self.probe_duration(visual_src) or ARTWORK_SECONDS, ARTWORK_SECONDS)
+            steps.append((0.85, 1.0, self.gif_command(visual_src, out_gif), gif_duration))
+
+        for start, end, command, duration in steps:
+            def report(seconds, start=start, end=end, duration=duration):
+                if on_progress and duration:
+                    on_progress(start + (end - start) * min(seconds / duration, 1.0))
+            run_process(command, task, on_time=report)
+        if on_progress:
+            on_progress(1.0)
+
+    def mp3_command(self, src, dst):
+        return [self.ffmpeg, "-hide_banner", "-loglevel", "error", "-nostats", "-progress", "pipe:1",
+                "-i", src, "-vn", "-acodec", "libmp3lame", "-q:a", "2", dst, "-y"]
+
+    def gif_command(self, src, dst, size=ARTWORK_SIZE, fps=ARTWORK_FPS, seconds=ARTWORK_SECONDS):
+        crop = f"scale={size}:{size}:force_original_aspect_ratio=increase,crop={size}:{size}"
+        return [self.ffmpeg, "-hide_banner", "-loglevel", "error", "-nostats", "-progress", "pipe:1",
+                "-i", src, "-t", str(seconds),
+                "-lavfi", f"fps={fps},{crop},split[a][b];[a]palettegen[p];[b][p]paletteuse",
+                dst, "-y"]
+
+    def probe_duration(self, path):
+        try:
+            out = subprocess.run(
+                [self.ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                capture_output=True, text=True, timeout=30,
+            ).stdout.strip()
+            return float(out)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return 0.0
+
+
+BACKENDS = {"c": CBinaryBackend, "ffmpeg": FFmpegBackend}
+
+
+def select_backend(preferred="auto", sources=None):
+    """Backend demandé s'il est utilisable, sinon le premier disponible"""
+    candidates = [preferred] if preferred in BACKENDS else []
+    candidates += [name for name in ("c", "ffmpeg") if name not in candidates]
+    for name in candidates:
+        backend = BACKENDS[name]()
+        if backend.available() and (sources is None or backend.supports(sources)):
+            return backend
+    raise FileNotFoundError("Aucun convertisseur disponible (core/convert ou ffmpeg)")
+
+
+def run_process(command, task=None, cwd=None, on_time=None):
+    """Lance une commande annulable ; on_time(secondes) suit les lignes out_time_us de ffmpeg"""
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, cwd=cwd)
+    if task is not None:
+        task._process = process
+    # stderr est lu en parallèle pour que le tube ne se remplisse jamais
+    stderr_lines = []
+    reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+    reader.start()
+    for line in process.stdout:
+        if on_time and line.startswith("out_time_us="):
+            try:
+                on_time(int(line.split("=", 1)[1]) / 1e6)
+            except ValueError:
+                pass
+    process.wait()
+    reader.join()
+    if task is not None:
+        task._process = None
+        task.check_cancelled()
+    if process.returncode != 0:
+        raise RuntimeError("".join(stderr_lines).strip()[-500:] or f"Code de sortie {process.returncode}")
+
+
+def publish_pair(src_dir, base_name, output_dir):
+    """Publie <base>.gif puis <base>.mp3 par os.replace (atomique).
+
+    Le lecteur ne liste que les .mp3 : quand le MP3 apparaît, son GIF est déjà là,
+    et aucun des deux n'est jamais visible à moitié écrit.
+    """
+    published = []
+    for ext in ['.gif', '.mp3']:
+        src = os.path.join(src_dir, f"{base_name}{ext}")
+        if os.path.exists(src):
+            dst = os.path.join(output_dir, f"{base_name}{ext}")
+            os.replace(src, dst)
+            published.append(os.path.abspath(dst))
+    return published
+
+
+def convert_many(videos, out_dir, jobs=None, backend="ffmpeg", on_progress=None):
+    """Convertit plusieurs vidéos locales en parallèle (un processus ffmpeg par tâche).
+
+    Chaque tâche travaille dans son propre dossier caché de out_dir, puis publie
+    par renommage atomique. Retourne {vidéo: None ou message d'erreur}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    results = {}
+
+    def convert_one(video):
+        base_name = os.path.splitext(os.path.basename(video))[0]
+        impl = select_backend(backend, {"video": video})
+        work_dir = tempfile.mkdtemp(prefix=".convert-", dir=out_dir)
+        try:
+            impl.convert({"video": video}, work_dir, base_name,
+                         on_progress=lambda ratio: on_progress and on_progress(video, ratio))
+            if not publish_pair(work_dir, base_name, out_dir):
+                raise RuntimeError("Aucun fichier généré")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(convert_one, video): video for video in videos}
+        for future in as_completed(futures):
+            error = future.exception()
+            results[futures[future]] = str(error) if error else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conversion MP4 → MP3 + GIF')
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--out', default='assets/music')
+    parser.add_argument('--jobs', type=int, default=None, help='Conversions simultanées (défaut : nombre de cœurs)')
+    parser.add_argument('--backend', choices=['auto', *BACKENDS], default='ffmpeg')
+    args = parser.parse_args()
+
+    def progress(video, ratio):
+        print(f"{int(ratio * 100):3d}% {os.path.basename(video)}", flush=True)
+
+    results = convert_many(args.videos, args.out, args.jobs, args.backend, progress)
+    failed = {video: error for video, error in results.items() if error}
+    for video, error in failed.items():
+        print(f"❌ {video} : {error}", file=sys.stderr)
+    print(f"✅ {len(results) - len(failed)}/{len(results)} conversions réussies")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
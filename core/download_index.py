@@ -0,0 +1,88 @@
+import os
+import re
+import json
+import threading
+import unicodedata
+
+# Index persistant des téléchargements : requête normalisée → ID vidéo → fichiers
+INDEX_NAME = os.path.join(".cache", "downloads.json")
+
+_YOUTUBE_ID = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/)([A-Za-z0-9_-]{11})")
+
+
+def normalize_query(query):
+    """Minuscules, sans accents ni ponctuation, espaces réduits.
+
+    Seuls les signes diacritiques sont retirés : les écritures non latines
+    (cyrillique, CJK, hangul…) sont conservées telles quelles.
+    """
+    text = unicodedata.normalize("NFKD", query.casefold())
+    # NFC recompose ce qui reste (syllabes hangul décomposées par NFKD)
+    text = unicodedata.normalize("NFC", "".join(c for c in text if not unicodedata.combining(c)))
+    text = re.sub(r"[\W_]+", " ", text)
+    return " ".join(text.split())
+
+
+def video_id_from_url(query):
+    """ID YouTube contenu dans une URL, sans aller sur le réseau"""
+    if not query.startswith(("http://", "https://")):
+        return None
+    match = _YOUTUBE_ID.search(query)
+    return match.group(1) if match else None
+
+
+class DownloadIndex:
+    def __init__(self, library_dir):
+        self.library_dir = library_dir
+        self.path = os.path.join(library_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self.data = {"queries": {}, "videos": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            self.data["queries"].update(loaded.get("queries", {}))
+            self.data["videos"].update(loaded.get("videos", {}))
+        except (OSError, ValueError):
+            pass
+
+    def _entry(self, video_id):
+        """Entrée d'une vidéo dont le MP3 est encore dans la bibliothèque"""
+        entry = self.data["videos"].get(video_id)
+        if not entry:
+            return None
+        files = [os.path.join(self.library_dir, name) for name in entry.get("files", [])]
+        if not any(f.endswith(".mp3") and os.path.isfile(f) for f in files):
+            return None
+        return {"video_id": video_id, "title": entry.get("title", ""), "files": [f for f in files if os.path.isfile(f)]}
+
+    def lookup_query(self, query):
+        key = normalize_query(query)
+        with self._lock:
+            # Une requête réduite à rien (ponctuation seule) ne désigne aucune vidéo
+            video_id = video_id_from_url(query) or (self.data["queries"].get(key) if key else None)
+            return self._entry(video_id) if video_id else None
+
+    def lookup_video(self, video_id):
+        with self._lock:
+            return self._entry(video_id)
+
+    def record(self, query, video_id, title, files):
+        if not video_id:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            if key:
+                self.data["queries"][key] = video_id
+            if files:
+                self.data["videos"][video_id] = {
+                    "title": title,
+                    "files": [os.path.basename(f) for f in files],
+                }
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -0,0 +1,494 @@
+import os
+import re
+import time
+import shutil
+import tempfile
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core import trace, analysis
+from core.converter import select_backend, publish_pair, ARTWORK_SECONDS
+from core.download_index import DownloadIndex
+from core.analysis import DEFAULT_BANDS
+
+# Options yt-dlp communes à tous les téléchargements
+YDL_OPTS = {
+    'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+    'quiet': False,
+    'noplaylist': True,
+    'nocheckcertificate': True,
+    # Un .part existant est repris par requête HTTP Range au lieu de repartir de zéro
+    'continuedl': True,
+    'retries': 10,
+    'fragment_retries': 10,
+    'retry_sleep_functions': {
+        'http': lambda n: min(2 ** n, 30),
+        'fragment': lambda n: min(2 ** n, 30),
+    },
+    'extractor_args': {'youtube': {'skip': ['dash', 'hls']}},
+    'http_headers': {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-us,en;q=0.5',
+        'Sec-Fetch-Mode': 'navigate'
+    }
+}
+
+# Profil "audio" : seul le flux audio est téléchargé, plus un court extrait
+# vidéo basse résolution (ou la miniature) pour la pochette GIF
+PROFILES = ("audio", "full")
+AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio'
+CLIP_FORMAT = 'worstvideo[height>=144][ext=mp4]/worstvideo[height>=144]/worstvideo'
+
+# Téléchargements en cours (.part) rangés à part : dossier caché, jamais listé par le lecteur.
+# Un sous-dossier par vidéo : deux titres identiques ne partagent jamais un .part, et une
+# vidéo interrompue est reprise au même endroit à la session suivante
+STAGING_DIR = ".partial"
+PARTIAL_MAX_AGE = 3 * 24 * 3600
+
+# Nouvelles tentatives d'une tâche après une coupure : 2, 4, 8, 16 s...
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+
+QUEUED = "queued"
+DOWNLOADING = "downloading"
+CONVERTING = "converting"
+DONE = "done"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+FINAL_STATES = (DONE, ERROR, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def default_extractor(opts):
+    import yt_dlp
+    return yt_dlp.YoutubeDL(opts)
+
+
+def downloaded_path(ydl, info):
+    """Chemin du fichier réellement écrit (le format choisi peut changer l'extension)"""
+    downloads = info.get('requested_downloads') or []
+    if downloads and downloads[0].get('filepath'):
+        return downloads[0]['filepath']
+    return ydl.prepare_filename(info)
+
+
+def search_target(query):
+    """Une URL est téléchargée telle quelle, sinon on prend le premier résultat YouTube"""
+    if query.startswith(("http://", "https://")):
+        return query
+    return f"ytsearch1:{query}"
+
+
+def gc_partials(staging_dir, max_age=PARTIAL_MAX_AGE):
+    """Supprime les fichiers partiels abandonnés depuis plus de max_age secondes"""
+    removed = 0
+    if not os.path.isdir(staging_dir):
+        return removed
+    now = time.time()
+    for root, _dirs, files in os.walk(staging_dir, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        try:
+            # Sous-dossier de vidéo vide et ancien (os.rmdir refuse un dossier non vide)
+            if root != staging_dir and now - os.path.getmtime(root) > max_age:
+                os.rmdir(root)
+        except OSError:
+            pass
+    return removed
+
+
+def is_playlist_url(query):
+    if not query.startswith(("http://", "https://")):
+        return False
+    # Une vidéo ouverte depuis une playlist (watch?v=...&list=...) reste une vidéo
+    return "/playlist" in query or ("list=" in query and "v=" not in query)
+
+
+def expand_playlist(url, extractor=default_extractor):
+    """URLs des vidéos d'une playlist, sans rien télécharger"""
+    opts = dict(YDL_OPTS, noplaylist=False, extract_flat='in_playlist', quiet=True)
+    with extractor(opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return [entry.get('url') or f"https://www.youtube.com/watch?v={entry['id']}"
+            for entry in info.get('entries') or [] if entry]
+
+
+class DownloadJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, query):
+        self.id = next(self._ids)
+        self.query = query
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.files = []
+        self.bytes_downloaded = 0
+        self.started_at = None
+        self.wall_time = None
+        self.video_id = None
+        self.title = ""
+        self.cache_hit = None
+        # Dernière taille vue par fichier : seuls les octets reçus depuis sont comptés
+        self._received = {}
+        self._cancel = threading.Event()
+        self._process = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.state in FINAL_STATES
+
+    def cancel(self):
+        self._cancel.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+
+class DownloadQueue:
+    """File de téléchargements : un pool réseau borné, un pool de conversion par cœur.
+
+    Le réseau d'une piste tourne pendant que la précédente est convertie.
+    on_update(job) est appelé (depuis un thread de travail) à chaque changement.
+    """
+
+    def __init__(self, output_dir='assets/music', fetch_workers=2, convert_workers=None,
+                 on_update=None, extractor=default_extractor, converter="auto",
+                 profile="audio", ingest=True, bands=DEFAULT_BANDS, artwork_size=None, artwork_fps=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Profil inconnu : {profile}")
+        self.output_dir = output_dir
+        self.profile = profile
+        self.on_update = on_update
+        self.extractor = extractor
+        self.converter = converter
+        # Pré-analyse des pistes publiées, au nombre de barres du visualiseur
+        self.ingest = ingest
+        self.bands = bands
+        self.artwork_size = artwork_size
+        self.artwork_fps = artwork_fps
+        self.index = DownloadIndex(output_dir)
+        self.staging_dir = os.path.join(output_dir, STAGING_DIR)
+        self.max_retries = MAX_RETRIES
+        gc_partials(self.staging_dir)
+        self.jobs = []
+        self._lock = threading.Lock()
+        # Vidéos en cours (ID → (tâche, Event)) : une seule tâche télécharge une vidéo donnée
+        self._videos = {}
+        self.fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="fetch")
+        self.convert_pool = ThreadPoolExecutor(max_workers=convert_workers or os.cpu_count() or 1,
+                                               thread_name_prefix="convert")
+
+    def submit(self, query):
+        job = DownloadJob(query)
+        with self._lock:
+            self.jobs.append(job)
+        self._update(job)
+        self.fetch_pool.submit(self._fetch, job)
+        return job
+
+    def cancel(self, job_id):
+        for job in self.jobs:
+            if job.id == job_id and not job.finished:
+                job.cancel()
+                return True
+        return False
+
+    def active_jobs(self):
+        with self._lock:
+            return [job for job in self.jobs if not job.finished]
+
+    def shutdown(self, wait=True, cancel=False):
+        if cancel:
+            for job in self.active_jobs():
+                job.cancel()
+        self.fetch_pool.shutdown(wait=wait)
+        self.convert_pool.shutdown(wait=wait)
+
+    def _update(self, job, state=None, message=None, progress=None):
+        if state is not None:
+            job.state = state
+        if message is not None:
+            job.message = message
+        if progress is not None:
+            job.progress = progress
+        if self.on_update:
+            self.on_update(job)
+
+    def _fail(self, job, exc):
+        if job.cancelled or isinstance(exc, JobCancelled):
+            self._update(job, CANCELLED, "Annulé")
+        else:
+            self._update(job, ERROR, f"Erreur : {exc}")
+
+    def _fetch(self, job):
+        try:
+            job.check_cancelled()
+            job.started_at = time.monotonic()
+            self._update(job, DOWNLOADING, "Recherche...", 0.0)
+
+            def hook(d):
+                job.check_cancelled()
+                downloaded = d.get('downloaded_bytes')
+                if d.get('status') in ('downloading', 'finished') and downloaded is not None:
+                    # Octets réellement reçus : downloaded_bytes inclut la partie reprise d'un .part
+                    filename = d.get('filename')
+                    job.bytes_downloaded += max(downloaded - job._received.get(filename, 0), 0)
+                    job._received[filename] = downloaded
+                if d.get('status') == 'downloading':
+                    total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                    if total:
+                        self._update(job, progress=min(d.get('downloaded_bytes', 0) / total, 1.0),
+                                     message="Téléchargement")
+
+            # Requête déjà servie (ou URL d'une vidéo connue) : aucun accès réseau
+            entry = self.index.lookup_query(job.query)
+            if entry:
+                self._cache_hit(job, entry, "requête")
+                return
+
+            with trace.span("download.fetch", query=job.query, profile=self.profile):
+                video_info = self._resolve(job, hook)
+                job.video_id = video_info.get('id')
+                job.title = video_info.get('title', '')
+                self._claim_video(job)
+
+                # Même vidéo sous une autre requête : on ne retélécharge pas
+                entry = self.index.lookup_video(job.video_id)
+                if entry:
+                    self.index.record(job.query, job.video_id, job.title, None)
+                    self._release_video(job)
+                    self._cache_hit(job, entry, "vidéo")
+                    return
+
+                if self.profile == "audio":
+                    sources = self._fetch_audio(job, hook, video_info)
+                else:
+                    sources = self._fetch_full(job, hook, video_info)
+            job.check_cancelled()
+        except Exception as e:
+            self._release_video(job)
+            self._fail(job, e)
+            return
+
+        # Le slot réseau est libéré : la conversion part dans son propre pool
+        self._update(job, CONVERTING, "En attente de conversion", 0.0)
+        self.convert_pool.submit(self._convert, job, sources)
+
+    def _stage_dir(self, job):
+        """Dossier des fichiers partiels d'une vidéo"""
+        name = re.sub(r'[^\w-]', '_', job.video_id) if job.video_id else f"job-{job.id}"
+        return os.path.join(self.staging_dir, name)
+
+    def _claim_video(self, job):
+        """Réserve la vidéo pour cette tâche ; attend si une autre tâche la télécharge déjà.
+
+        Après l'attente, la vidéo est en général publiée : lookup_video la trouve.
+        """
+        if not job.video_id:
+            return
+        while True:
+            with self._lock:
+                owner = self._videos.get(job.video_id)
+                if owner is None:
+                    self._videos[job.video_id] = (job, threading.Event())
+                    return
+            self._update(job, message="Même vidéo déjà en cours")
+            while not owner[1].wait(0.1):
+                job.check_cancelled()
+
+    def _release_video(self, job):
+        with self._lock:
+            owner = self._videos.get(job.video_id)
+            if owner is None or owner[0] is not job:
+                return
+            del self._videos[job.video_id]
+        owner[1].set()
+
+    def _ydl_opts(self, hook, stage=None, **extra):
+        opts = dict(YDL_OPTS)
+        opts['outtmpl'] = os.path.join(stage or self.staging_dir, '%(title)s.%(ext)s')
+        opts['progress_hooks'] = [hook]
+        opts.update(extra)
+        return opts
+
+    def _cache_hit(self, job, entry, kind):
+        job.files = entry["files"]
+        job.cache_hit = kind
+        job.video_id = entry["video_id"]
+        job.wall_time = time.monotonic() - job.started_at
+        self._update(job, DONE, f"Déjà dans la bibliothèque (cache {kind})", 1.0)
+        print(f"♻️ {job.query} → {entry['title'] or entry['video_id']} (cache {kind})")
+
+    def _resolve(self, job, hook):
+        """Recherche / métadonnées seulement, sans rien télécharger"""
+        with self.extractor(self._ydl_opts(hook)) as ydl:
+            info = ydl.extract_info(search_target(job.query), download=False)
+        if 'entries' in info:
+            entries = list(info['entries'])
+            if not entries:
+                raise FileNotFoundError("Aucun résultat")
+            return entries[0]
+        return info
+
+    def _download(self, job, opts, video_info, retries=None):
+        """Télécharge un format ; après une coupure, reprend le .part avec un délai croissant"""
+        retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            # Point de reprise de chaque fichier : ce qui est déjà sur le disque n'est pas reçu
+            stage = os.path.dirname(opts['outtmpl'])
+            job._received = {os.path.join(stage, name[:-len('.part')]): os.path.getsize(os.path.join(stage, name))
+                             for name in os.listdir(stage) if name.endswith('.part')}
+            try:
+                with self.extractor(opts) as ydl:
+                    return downloaded_path(ydl, ydl.process_ie_result(dict(video_info), download=True))
+            except JobCancelled:
+                raise
+            except Exception as e:
+                job.check_cancelled()
+                if attempt >= retries:
+                    raise
+                delay = min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+                attempt += 1
+                print(f"⚠️ {job.query} : {e} — reprise dans {delay:.0f} s ({attempt}/{retries})")
+                self._update(job, message=f"Reprise dans {delay:.0f} s ({attempt}/{retries})")
+                # Attente interrompue immédiatement par une annulation
+                if job._cancel.wait(delay):
+                    raise JobCancelled()
+
+    def _fetch_full(self, job, hook, video_info):
+        """Profil historique : vidéo complète + audio, fusionnés en MP4"""
+        stage = self._stage_dir(job)
+        os.makedirs(stage, exist_ok=True)
+        path_mp4 = self._download(job, self._ydl_opts(hook, stage), video_info)
+        if not os.path.exists(path_mp4):
+            raise FileNotFoundError("Fichier introuvable")
+        return {"video": path_mp4}
+
+    def _fetch_audio(self, job, hook, video_info):
+        """Profil audio : flux audio seul + quelques secondes de vidéo basse résolution"""
+        stage = self._stage_dir(job)
+        os.makedirs(stage, exist_ok=True)
+        path_audio = self._download(job, self._ydl_opts(hook, stage, format=AUDIO_FORMAT), video_info)
+        if not os.path.exists(path_audio):
+            raise FileNotFoundError("Fichier audio introuvable")
+        sources = {"audio": path_audio}
+
+        job.check_cancelled()
+        self._update(job, message="Extrait vidéo", progress=0.0)
+        try:
+            import yt_dlp
+            clip_opts = self._ydl_opts(
+                hook, format=CLIP_FORMAT,
+                outtmpl=os.path.join(stage, '%(title)s.clip.%(ext)s'),
+                download_ranges=yt_dlp.utils.download_range_func(None, [(0, ARTWORK_SECONDS)]),
+            )
+            path_clip = self._download(job, clip_opts, video_info, retries=1)
+            if os.path.exists(path_clip):
+                sources["visual"] = path_clip
+                return sources
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️ Extrait vidéo indisponible, miniature utilisée : {e}")
+
+        # Repli : la miniature seule suffit pour une pochette fixe
+        thumb_opts = self._ydl_opts(
+            hook, skip_download=True, writethumbnail=True,
+            outtmpl=os.path.join(stage, '%(title)s.thumb.%(ext)s'),
+        )
+        with self.extractor(thumb_opts) as ydl:
+            result = ydl.process_ie_result(dict(video_info), download=True)
+            thumb_base = os.path.splitext(ydl.prepare_filename(result))[0]
+        for ext in ('.jpg', '.webp', '.png'):
+            if os.path.exists(thumb_base + ext):
+                sources["visual"] = thumb_base + ext
+                break
+        return sources
+
+    def _convert(self, job, sources):
+        # Dossier de travail dans la bibliothèque : même système de fichiers,
+        # donc publication par simple renommage atomique
+        work_dir = tempfile.mkdtemp(prefix=".convert-", dir=self.output_dir)
+        error = None
+        try:
+            job.check_cancelled()
+            self._update(job, message="Conversion")
+
+            base_name = os.path.splitext(os.path.basename(sources.get("video") or sources["audio"]))[0]
+            backend = select_backend(self.converter, sources)
+            with trace.span("download.convert", query=job.query, backend=backend.name):
+                backend.convert(sources, work_dir, base_name, task=job,
+                                on_progress=lambda ratio: self._update(job, progress=ratio))
+
+            job.check_cancelled()
+            with trace.span("download.publish"):
+                job.files = publish_pair(work_dir, base_name, self.output_dir)
+                self.index.record(job.query, job.video_id, job.title, job.files)
+
+            if not job.files:
+                raise RuntimeError("Aucun fichier généré")
+            if self.ingest:
+                self._ingest(job)
+            job.wall_time = time.monotonic() - job.started_at
+        except Exception as e:
+            error = e
+        finally:
+            job._process = None
+            shutil.rmtree(work_dir, ignore_errors=True)
+            for path in sources.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            try:
+                os.rmdir(self._stage_dir(job))
+            except OSError:
+                pass
+            self._release_video(job)
+
+        # État final seulement une fois les sources et le dossier partiel supprimés
+        if error is not None:
+            self._fail(job, error)
+            return
+        self._update(job, DONE, f"Terminé ({job.bytes_downloaded / 1e6:.1f} Mo, {job.wall_time:.1f} s)")
+        print(f"📦 {job.query} : {job.bytes_downloaded} octets, {job.wall_time:.2f} s (profil {self.profile})")
+
+    def _ingest(self, job):
+        """Remplit les caches du lecteur pour que la première lecture démarre tout de suite"""
+        mp3_files = [f for f in job.files if f.endswith(".mp3")]
+        if not mp3_files:
+            return
+        self._update(job, message="Analyse", progress=0.0)
+        try:
+            with trace.span("download.ingest", query=job.query):
+                meta = analysis.ingest(mp3_files[0], bands=self.bands, artwork_size=self.artwork_size,
+                                       artwork_fps=self.artwork_fps, task=job)
+            if meta.get("artwork_bytes"):
+                before, after = meta["artwork_bytes"]
+                print(f"🖼️ {job.query} : pochette {before / 1024:.0f} → {after / 1024:.0f} Ko")
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # La piste est déjà publiée : le lecteur analysera à la première lecture
+            print(f"⚠️ Pré-analyse impossible pour {job.query} : {e}")
+
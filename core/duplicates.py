@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from core import analysis
+
+# Doublons : empreintes à moins de MAX_DISTANCE bits (sur 256) et durées proches
+MAX_DISTANCE = 24
+DURATION_TOLERANCE = 0.1
+
+# Recherche par seaux (LSH) : deux pistes ne sont comparées que si l'une des tranches
+# de 16 bits de leurs empreintes est identique, au lieu de comparer toutes les paires
+LSH_BAND_BYTES = 2
+
+# Pistes masquées de la playlist : assets/music/.cache/duplicates.json
+HIDDEN_NAME = os.path.join(analysis.CACHE_DIR, "duplicates.json")
+
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def hamming(fingerprint, matrix):
+    """Distances de Hamming entre une empreinte et chaque ligne d'une matrice d'empreintes"""
+    return _POPCOUNT[np.bitwise_xor(matrix, fingerprint)].sum(axis=1)
+
+
+def library_tracks(library_dir):
+    return sorted(os.path.join(library_dir, name) for name in os.listdir(library_dir)
+                  if not name.startswith(".") and name.lower().endswith((".mp3", ".wav", ".ogg")))
+
+
+def load_fingerprints(paths, analyze=True, jobs=None):
+    """(chemins, matrice uint8 N x 32, durées en ms) ; les empreintes manquantes sont calculées"""
+
+    def fingerprint_one(path):
+        meta = analysis.load_meta(path)
+        if "fingerprint" not in meta and analyze:
+            try:
+                y, sr = analysis.decode(path)
+                meta = analysis.update_meta(path, fingerprint=analysis.fingerprint(y, sr).tobytes().hex(),
+                                            duration_ms=meta.get("duration_ms", int(len(y) / sr * 1000)))
+            except Exception as e:
+                print(f"⚠️ Empreinte impossible pour {os.path.basename(path)} : {e}", file=sys.stderr)
+        return path, meta.get("fingerprint"), meta.get("duration_ms", 0)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        results = [r for r in pool.map(fingerprint_one, paths) if r[1]]
+    if not results:
+        return [], np.zeros((0, 0), dtype=np.uint8), np.zeros(0)
+    found, hexes, durations = zip(*results)
+    matrix = np.stack([np.frombuffer(bytes.fromhex(h), dtype=np.uint8) for h in hexes])
+    return list(found), matrix, np.asarray(durations, dtype=np.float64)
+
+
+def find_duplicates(matrix, durations=None, max_distance=MAX_DISTANCE, tolerance=DURATION_TOLERANCE):
+    """Groupes de lignes en double (listes d'index, au moins deux par groupe)"""
+    n = len(matrix)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start in range(0, matrix.shape[1] if n else 0, LSH_BAND_BYTES):
+        keys = matrix[:, start:start + LSH_BAND_BYTES].astype(np.int64)
+        keys = (keys * (256 ** np.arange(keys.shape[1]))).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        # Seaux = suites de clés identiques dans l'ordre trié
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        for bucket in np.split(order, bounds):
+            for i in range(len(bucket) - 1):
+                row, others = bucket[i], bucket[i + 1:]
+                close = hamming(matrix[row], matrix[others]) <= max_distance
+                if durations is not None:
+                    close &= np.abs(durations[others] - durations[row]) <= tolerance * max(durations[row], 1)
+                for other in others[close]:
+                    parent[find(int(other))] = find(int(row))
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+def load_hidden(library_dir):
+    """Noms de fichiers masqués de la playlist par --hide"""
+    try:
+        with open(os.path.join(library_dir, HIDDEN_NAME), "r", encoding="utf-8") as f:
+            return set(json.load(f).get("hidden", []))
+    except (OSError, ValueError):
+        return set()
+
+
+def save_hidden(library_dir, names):
+    data = json.dumps({"hidden": sorted(names)}, indent=1, ensure_ascii=False).encode("utf-8")
+    analysis._write_atomic(os.path.join(library_dir, HIDDEN_NAME), lambda f: f.write(data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Détection des pistes en double dans la bibliothèque')
+    parser.add_argument('--library', default='assets/music')
+    parser.add_argument('--max-distance', type=int, default=MAX_DISTANCE,
+                        help='Distance de Hamming maximale entre empreintes (sur 256 bits)')
+    parser.add_argument('--hide', action='store_true',
+                        help='Masque les doublons de la playlist (garde la piste la plus ancienne)')
+    parser.add_argument('--unhide', action='store_true', help='Réaffiche toutes les pistes masquées')
+    parser.add_argument('--no-analyze', action='store_true',
+                        help="N'analyse pas les pistes sans empreinte (elles sont ignorées)")
+    parser.add_argument('--jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.unhide:
+        save_hidden(args.library, ())
+        print("✅ Toutes les pistes sont de nouveau visibles")
+        return 0
+
+    paths, matrix, durations = load_fingerprints(library_tracks(args.library),
+                                                 analyze=not args.no_analyze, jobs=args.jobs)
+    clusters = find_duplicates(matrix, durations, args.max_distance)
+    hidden = load_hidden(args.library)
+    for number, cluster in enumerate(clusters, 1):
+        # La piste gardée est la première téléchargée
+        cluster = sorted(cluster, key=lambda i: os.path.getmtime(paths[i]))
+        print(f"🔁 Groupe {number} ({len(cluster)} pistes) :")
+        for rank, i in enumerate(cluster):
+            distance = int(hamming(matrix[cluster[0]], matrix[i:i + 1])[0])
+            name = os.path.basename(paths[i])
+            if rank and args.hide:
+                hidden.add(name)
+            marker = "✅" if rank == 0 else ("🙈" if name in hidden else "  ")
+            print(f"   {marker} {name} (distance {distance})")
+    if args.hide:
+        save_hidden(args.library, hidden)
+    print(f"✅ {len(paths)} pistes comparées, {len(clusters)} groupes de doublons"
+          + (f", {len(hidden)} pistes masquées" if hidden else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
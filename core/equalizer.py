@@ -0,0 +1,53 @@
+import math
+
+# Égaliseur graphique 10 bandes (fréquences centrales en Hz, une octave d'écart)
+EQ_FREQS = (31, 62, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+EQ_Q = 1.41
+MAX_GAIN_DB = 12
+
+
+def peaking_sos(freq, gain_db, sr, q=EQ_Q):
+    """Biquad en cloche (RBJ) sous forme de section SOS : [b0, b1, b2, 1, a1, a2]"""
+    a = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * freq / sr
+    alpha, cos = math.sin(w0) / (2 * q), math.cos(w0)
+    a0 = 1 + alpha / a
+    return [(1 + alpha * a) / a0, -2 * cos / a0, (1 - alpha * a) / a0,
+            1.0, -2 * cos / a0, (1 - alpha / a) / a0]
+
+
+class Equalizer:
+    """Cascade de biquads appliquée bloc par bloc à du PCM (trames x canaux).
+
+    L'état des filtres (zi) passe d'un bloc au suivant : découper le signal ne crée
+    aucune discontinuité. Les bandes à 0 dB sont simplement omises.
+    """
+
+    def __init__(self, gains_db, sr, channels, freqs=EQ_FREQS):
+        # numpy/scipy importés ici : config_ui n'a besoin que des constantes du module.
+        # Importer sosfilt dès la construction évite ce coût au premier bloc joué
+        import numpy as np
+        from scipy.signal import sosfilt
+        self._sosfilt = sosfilt
+        bands = [(f, max(-MAX_GAIN_DB, min(MAX_GAIN_DB, g))) for f, g in zip(freqs, gains_db)
+                 if g and f < sr / 2]
+        self.sos = np.array([peaking_sos(f, g, sr) for f, g in bands]).reshape(-1, 6)
+        self.channels = channels
+        # Gain le plus fort retranché avant filtrage : les bandes relevées ne saturent pas
+        self.preamp = 10 ** (-max([g for _f, g in bands if g > 0], default=0) / 20)
+        self.reset()
+
+    @property
+    def active(self):
+        return len(self.sos) > 0
+
+    def reset(self):
+        """Après un seek : l'état du bloc précédent ne correspond plus au signal"""
+        import numpy as np
+        self.zi = np.zeros((len(self.sos), 2, self.channels))
+
+    def process(self, block):
+        if not self.active:
+            return block
+        out, self.zi = self._sosfilt(self.sos, block * self.preamp, axis=0, zi=self.zi)
+        return out
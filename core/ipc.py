@@ -0,0 +1,104 @@
+import os
+import json
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+# Nom du socket local partagé par main.py, research.py et config_ui.py
+# (NYRVANA_IPC_NAME permet d'isoler une instance, ex. pour les benchmarks)
+SERVER_NAME = os.environ.get("NYRVANA_IPC_NAME", "nyrvana-player")
+
+# Protocole : un objet JSON par ligne, ex. {"cmd": "seek", "ms": 42000}
+# Réponse : un objet JSON par ligne, toujours avec une clé "ok"
+COMMANDS = (
+    "add_track", "apply_config", "play", "pause", "toggle",
+    "next", "prev", "seek", "state", "show", "mode", "trim"
+)
+
+
+class ControlServer(QObject):
+    """Serveur de contrôle du lecteur (une seule instance par session)"""
+
+    def __init__(self, handler, name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.name = name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+
+    def listen(self):
+        if self.server.listen(self.name):
+            return True
+        # Un autre lecteur écoute déjà (peut-être encore en train de démarrer) : son socket reste à lui
+        if server_alive(self.name):
+            return False
+        # Socket orphelin laissé par un crash : personne ne répond, on le supprime et on réessaie
+        QLocalServer.removeServer(self.name)
+        return self.server.listen(self.name)
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._buffers[sock] = b""
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock):
+        self._buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock):
+        self._buffers[sock] = self._buffers.get(sock, b"") + bytes(sock.readAll())
+        while b"\n" in self._buffers[sock]:
+            line, self._buffers[sock] = self._buffers[sock].split(b"\n", 1)
+            if not line.strip():
+                continue
+            try:
+                msg = json.loads(line)
+                if msg.get("cmd") not in COMMANDS:
+                    reply = {"ok": False, "error": f"Commande inconnue : {msg.get('cmd')}"}
+                else:
+                    reply = self.handler(msg) or {"ok": True}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            sock.write((json.dumps(reply) + "\n").encode("utf-8"))
+            sock.flush()
+
+
+def server_alive(name=SERVER_NAME, timeout=200):
+    """Vrai si un serveur accepte la connexion, même s'il ne traite pas encore les commandes"""
+    sock = QLocalSocket()
+    sock.connectToServer(name)
+    alive = sock.waitForConnected(timeout)
+    sock.abort()
+    return alive
+
+
+def send_command(cmd, timeout=1000, name=SERVER_NAME, **params):
+    """Envoie une commande au lecteur déjà ouvert.
+
+    Retourne la réponse (dict) ou None si aucun lecteur n'écoute.
+    """
+    sock = QLocalSocket()
+    sock.connectToServer(name)
+    if not sock.waitForConnected(timeout):
+        return None
+
+    sock.write((json.dumps({"cmd": cmd, **params}) + "\n").encode("utf-8"))
+    sock.flush()
+    sock.waitForBytesWritten(timeout)
+
+    data = b""
+    while b"\n" not in data:
+        if not sock.waitForReadyRead(timeout):
+            break
+        data += bytes(sock.readAll())
+    sock.disconnectFromServer()
+
+    try:
+        return json.loads(data.split(b"\n", 1)[0])
+    except ValueError:
+        return None
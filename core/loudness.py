@@ -0,0 +1,107 @@
+import os
+import sys
+import math
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Sonie intégrée façon ITU-R BS.1770 : filtre K, blocs de 400 ms (recouvrement 75 %),
+# portes absolue (-70 LUFS) et relative (-10 LU). Mesurée sur le signal mono décodé :
+# le décalage par rapport à la stéréo est le même pour toutes les pistes.
+BLOCK_MS = 400
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# Niveau visé par la normalisation et gain maximal (le mixer ne dépasse jamais 1.0)
+TARGET_LUFS = -18.0
+MAX_GAIN_DB = 6.0
+
+
+def k_weighting(sr):
+    """Coefficients (b, a) des deux biquads du filtre K pour une fréquence d'échantillonnage"""
+    # Étage 1 : plateau haut (+4 dB au-dessus de ~1,7 kHz)
+    gain, q, fc = 4.0, 0.7071752369554193, 1681.974450955533
+    a_ = 10 ** (gain / 40)
+    w0 = 2 * math.pi * fc / sr
+    alpha, cos = math.sin(w0) / (2 * q), math.cos(w0)
+    root = 2 * math.sqrt(a_) * alpha
+    shelf = ([a_ * ((a_ + 1) + (a_ - 1) * cos + root),
+              -2 * a_ * ((a_ - 1) + (a_ + 1) * cos),
+              a_ * ((a_ + 1) + (a_ - 1) * cos - root)],
+             [(a_ + 1) - (a_ - 1) * cos + root,
+              2 * ((a_ - 1) - (a_ + 1) * cos),
+              (a_ + 1) - (a_ - 1) * cos - root])
+
+    # Étage 2 : passe-haut (~38 Hz)
+    q, fc = 0.5003270373253953, 38.13547087613982
+    w0 = 2 * math.pi * fc / sr
+    alpha, cos = math.sin(w0) / (2 * q), math.cos(w0)
+    highpass = ([(1 + cos) / 2, -(1 + cos), (1 + cos) / 2],
+                [1 + alpha, -2 * cos, 1 - alpha])
+
+    return [(np.asarray(b) / a[0], np.asarray(a) / a[0]) for b, a in (shelf, highpass)]
+
+
+def integrated_loudness(y, sr):
+    """Sonie intégrée en LUFS, None pour un signal trop court ou silencieux.
+
+    Les énergies de tous les blocs sortent d'une seule somme cumulée.
+    """
+    from scipy.signal import lfilter
+    x = np.asarray(y, dtype=np.float64)
+    for b, a in k_weighting(sr):
+        x = lfilter(b, a, x)
+
+    block = int(sr * BLOCK_MS / 1000)
+    if len(x) < block:
+        return None
+    energy = np.concatenate([[0.0], np.cumsum(x * x)])
+    starts = np.arange(0, len(x) - block + 1, block // 4)
+    power = (energy[starts + block] - energy[starts]) / block
+    loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-12))
+
+    gated = power[loudness > ABSOLUTE_GATE]
+    if not gated.size:
+        return None
+    relative = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = power[(loudness > ABSOLUTE_GATE) & (loudness > relative)]
+    return round(-0.691 + 10 * math.log10(gated.mean()), 2)
+
+
+def gain_for(lufs, target=TARGET_LUFS):
+    """Gain linéaire qui amène une piste au niveau visé (1.0 si la sonie est inconnue)"""
+    if lufs is None:
+        return 1.0
+    return 10 ** (min(target - lufs, MAX_GAIN_DB) / 20)
+
+
+def main():
+    from core import analysis
+    from core.duplicates import library_tracks
+
+    parser = argparse.ArgumentParser(description='Mesure de la sonie (LUFS) de toute la bibliothèque')
+    parser.add_argument('--library', default='assets/music')
+    parser.add_argument('--force', action='store_true', help='Remesure aussi les pistes déjà analysées')
+    parser.add_argument('--jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    def measure(path):
+        meta = analysis.load_meta(path)
+        if not args.force and "loudness_lufs" in meta:
+            return path, meta["loudness_lufs"], False
+        y, sr = analysis.decode(path)
+        lufs = integrated_loudness(y, sr)
+        analysis.update_meta(path, loudness_lufs=lufs)
+        return path, lufs, True
+
+    with ThreadPoolExecutor(max_workers=args.jobs or os.cpu_count() or 1) as pool:
+        results = list(pool.map(measure, library_tracks(args.library)))
+    for path, lufs, fresh in results:
+        level = f"{lufs:.1f} LUFS, gain {20 * math.log10(gain_for(lufs)):+.1f} dB" if lufs is not None else "silence"
+        print(f"{'🔊' if fresh else '  '} {os.path.basename(path)} : {level}")
+    print(f"✅ {len(results)} pistes, {sum(1 for r in results if r[2])} mesurées")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import os
+import time
+import threading
+from collections import deque
+import numpy as np
+import pygame
+from core.equalizer import Equalizer
+
+# Blocs de ~93 ms à 44,1 kHz : un bloc joue pendant que le suivant est en file
+BLOCK_FRAMES = 4096
+
+
+class PcmStream:
+    """Lecture par blocs de PCM décodé, avec égaliseur, sur un canal pygame réservé.
+
+    Mêmes appels que pygame.mixer.music (load, play, pause, stop, set_volume), pour
+    que le backend pygame (core.audio) passe de l'un à l'autre. Le fichier est décodé une seule fois,
+    dans un thread lancé par load() : un changement de piste ne bloque pas l'interface. play()
+    n'attend pas non plus, le premier bloc part dès la fin du décodage (pending reste vrai jusque-là,
+    puis on_start est appelé). Chaque bloc est filtré juste avant d'être mis en file.
+    """
+
+    def __init__(self, gains_db, block_frames=BLOCK_FRAMES):
+        self.gains_db = list(gains_db)
+        self.block_frames = block_frames
+        self.path = None
+        self.pcm = None
+        self.frame = 0
+        self.loops = 0
+        self.volume = 1.0
+        self.equalizer = None
+        # Lecture demandée, premier bloc pas encore joué (décodage en cours)
+        self.pending = False
+        self.on_start = None
+        # Temps de traitement des derniers blocs et des décodages (ms), lus par bench.py
+        self.block_ms = deque(maxlen=1000)
+        self.decode_ms = deque(maxlen=100)
+        self._channel = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._worker = None
+
+    def _mixer_format(self):
+        freq, _size, channels = pygame.mixer.get_init()
+        return freq, channels
+
+    def set_gains(self, gains_db):
+        self.gains_db = list(gains_db)
+        if self.pcm is not None:
+            sr, channels = self._mixer_format()
+            self.equalizer = Equalizer(self.gains_db, sr, channels)
+
+    def load(self, path):
+        self.stop()
+        if path == self.path:
+            # seek_to_position recharge la piste : le PCM décodé (ou en cours de décodage) est réutilisé
+            return
+        self.path = path
+        self.pcm = None
+        self.equalizer = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._decode, args=(path, self._ready), daemon=True).start()
+
+    def _decode(self, path, ready):
+        # Décodage unique, déjà au format du mixer (fréquence, canaux)
+        start = time.perf_counter()
+        pcm = equalizer = None
+        gains = self.gains_db
+        try:
+            pcm = pygame.sndarray.array(pygame.mixer.Sound(path))
+            pcm = pcm.reshape(len(pcm), -1)
+            sr, channels = self._mixer_format()
+            equalizer = Equalizer(gains, sr, channels)
+        except Exception as e:
+            print(f"⚠️ Décodage impossible pour {os.path.basename(path)} : {e}")
+            pcm = None
+        with self._lock:
+            # Une autre piste a pu être chargée pendant le décodage : résultat ignoré
+            if path == self.path:
+                self.pcm, self.equalizer = pcm, equalizer
+                if pcm is None:
+                    self.path = None
+                else:
+                    if gains is not self.gains_db:
+                        # Gains modifiés pendant le décodage
+                        self.set_gains(self.gains_db)
+                    self.decode_ms.append((time.perf_counter() - start) * 1000)
+        ready.set()
+
+    def play(self, loops=0, start=0.0):
+        self.stop()
+        if self.path is None:
+            return
+        self.loops = loops
+        if self._channel is None:
+            pygame.mixer.set_reserved(1)
+            self._channel = pygame.mixer.Channel(0)
+        self._channel.set_volume(self.volume)
+        self._stop = threading.Event()
+        self.pending = True
+        self._worker = threading.Thread(target=self._feed, args=(start, self._ready, self._stop), daemon=True)
+        self._worker.start()
+
+    def _next_block(self):
+        if self.frame >= len(self.pcm):
+            if self.loops != -1:
+                return None
+            self.frame = 0
+        block = self.pcm[self.frame:self.frame + self.block_frames]
+        self.frame += len(block)
+        start = time.perf_counter()
+        out = self.equalizer.process(block.astype(np.float32))
+        # sosfilt rend un tableau non contigu en mémoire, que make_sound refuse
+        out = np.ascontiguousarray(np.clip(out, -32768, 32767), dtype=np.int16)
+        self.block_ms.append((time.perf_counter() - start) * 1000)
+        return pygame.sndarray.make_sound(out if out.shape[1] > 1 else np.ascontiguousarray(out[:, 0]))
+
+    def _feed(self, start, ready, stop):
+        while not ready.wait(0.01):
+            if stop.is_set():
+                return
+        with self._lock:
+            try:
+                # stop() pendant l'attente, ou décodage impossible : rien n'est joué
+                if stop.is_set() or self.pcm is None:
+                    return
+                self.frame = min(int(start * self._mixer_format()[0]), len(self.pcm))
+                self.equalizer.reset()
+                sound = self._next_block()
+                if sound is None:
+                    return
+                self._channel.play(sound)
+                if self.on_start:
+                    self.on_start()
+            finally:
+                self.pending = False
+        interval = self.block_frames / self._mixer_format()[0] / 4
+        while not stop.is_set():
+            if self._channel.get_queue() is None:
+                sound = self._next_block()
+                if sound is None:
+                    return
+                self._channel.queue(sound)
+            stop.wait(interval)
+
+    def pause(self):
+        self.stop()
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            # En attente du décodage, le thread n'a encore rien joué : il s'arrête seul
+            waiting = self.pending
+            self.pending = False
+        if not waiting and self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join()
+        self._worker = None
+        if self._channel is not None:
+            self._channel.stop()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self._channel is not None:
+            self._channel.set_volume(volume)
+
+    def get_busy(self):
+        # Le dernier bloc peut encore jouer après la fin du thread d'alimentation
+        feeding = self._worker is not None and self._worker.is_alive()
+        return feeding or (self._channel is not None and self._channel.get_busy())
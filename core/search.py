@@ -0,0 +1,110 @@
+import os
+import numpy as np
+from core.download_index import normalize_query
+
+# Recherche approximative dans la bibliothèque : index inversé de trigrammes.
+# Les listes de documents par trigramme sont des tableaux numpy, le score d'une
+# requête se résume à un np.bincount sur leur concaténation.
+
+MIN_SCORE = 0.2
+
+
+def trigrams(text):
+    """Trigrammes d'un texte normalisé, mots bordés d'espaces ("abc" → " ab", "abc", "bc ")"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def track_text(path, tags=None):
+    """Texte indexé pour une piste : nom de fichier et tags connus"""
+    parts = [os.path.splitext(os.path.basename(path))[0]]
+    if tags:
+        parts += [tags.get(key, "") for key in ("title", "artist", "album")]
+    return normalize_query(" ".join(parts))
+
+
+class TrigramIndex:
+    def __init__(self):
+        self.paths = []
+        self.ids = {}
+        self._doc_grams = []
+        self._postings = {}
+        # Listes converties en tableaux numpy à la première requête qui les utilise
+        self._arrays = {}
+        # Capacité doublée au besoin : un ajout ne recopie pas tout l'index
+        self._doc_len = np.zeros(1024, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, path, text=None):
+        if path in self.ids:
+            self.remove(path)
+        doc_id = len(self.paths)
+        grams = trigrams(text if text is not None else track_text(path))
+        self.paths.append(path)
+        self.ids[path] = doc_id
+        self._doc_grams.append(grams)
+        if doc_id >= len(self._alive):
+            self._doc_len = np.concatenate([self._doc_len, np.zeros_like(self._doc_len)])
+            self._alive = np.concatenate([self._alive, np.zeros_like(self._alive)])
+        self._doc_len[doc_id] = len(grams)
+        self._alive[doc_id] = True
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(doc_id)
+            self._arrays.pop(gram, None)
+        return doc_id
+
+    def remove(self, path):
+        """Retire une piste ; son identifiant reste réservé, il est simplement ignoré"""
+        doc_id = self.ids.pop(path, None)
+        if doc_id is None:
+            return False
+        for gram in self._doc_grams[doc_id]:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.remove(doc_id)
+                self._arrays.pop(gram, None)
+        self._doc_grams[doc_id] = set()
+        self._alive[doc_id] = False
+        return True
+
+    def sync(self, paths, text_for=None):
+        """Met l'index à jour par différence avec une liste de pistes (ajouts et suppressions seulement)"""
+        wanted = set(paths)
+        for path in [p for p in self.ids if p not in wanted]:
+            self.remove(path)
+        for path in paths:
+            if path not in self.ids:
+                self.add(path, text_for(path) if text_for else None)
+
+    def _posting(self, gram):
+        array = self._arrays.get(gram)
+        if array is None:
+            array = np.asarray(self._postings.get(gram, ()), dtype=np.int32)
+            self._arrays[gram] = array
+        return array
+
+    def search(self, query, limit=20, min_score=MIN_SCORE):
+        """[(chemin, score)] par score décroissant ; score de Dice sur les trigrammes (0 à 1)"""
+        grams = trigrams(normalize_query(query))
+        if not grams or not self.ids:
+            return []
+        hits = [self._posting(gram) for gram in grams if gram in self._postings]
+        if not hits:
+            return []
+        n = len(self.paths)
+        counts = np.bincount(np.concatenate(hits), minlength=n)
+        scores = 2.0 * counts / (len(grams) + self._doc_len[:n])
+        scores[~self._alive[:n]] = 0.0
+
+        k = min(limit, int(np.count_nonzero(scores >= min_score)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.paths[i], float(scores[i])) for i in top]
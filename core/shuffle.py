@@ -0,0 +1,147 @@
+import os
+import json
+import math
+import time
+import random
+from collections import deque
+from core.analysis import CACHE_DIR, _write_atomic
+
+# Historique d'écoute : nom de fichier → [lectures complètes, skips, dernière écoute (timestamp)]
+HISTORY_NAME = os.path.join(CACHE_DIR, "history.json")
+
+# Une piste écoutée récemment remonte à son poids normal en quelques jours
+RECENCY_TAU = 2 * 24 * 3600
+# Pistes tout juste jouées : exclues des N tirages suivants
+COOLDOWN = 30
+# Nombre de changements avant d'écrire l'historique sur le disque
+SAVE_EVERY = 10
+
+
+class FenwickTree:
+    """Arbre de Fenwick sur des poids : mise à jour et tirage pondéré en O(log n)"""
+
+    def __init__(self, weights=()):
+        self.weights = [float(w) for w in weights]
+        n = len(self.weights)
+        self.tree = [0.0] + self.weights
+        # Construction en O(n) : chaque nœud propage sa somme à son parent
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self._top_bit = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self):
+        return len(self.weights)
+
+    def set(self, index, weight):
+        delta = float(weight) - self.weights[index]
+        self.weights[index] = float(weight)
+        i = index + 1
+        n = len(self.weights)
+        while i <= n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        total, i = 0.0, len(self.weights)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, value):
+        """Plus petit index dont la somme cumulée des poids dépasse value"""
+        pos, bit, n = 0, self._top_bit, len(self.weights)
+        while bit:
+            nxt = pos + bit
+            if nxt <= n and self.tree[nxt] <= value:
+                value -= self.tree[nxt]
+                pos = nxt
+            bit >>= 1
+        return min(pos, n - 1)
+
+    def sample(self, rng=random):
+        total = self.total()
+        if total <= 0:
+            return None
+        return self.find(rng.random() * total)
+
+
+def track_weight(stats, now):
+    """Plus une piste est écoutée jusqu'au bout, plus elle revient ; les skips et
+    une écoute récente la font reculer"""
+    plays, skips, last = stats if stats else (0, 0, 0)
+    weight = math.sqrt(1 + plays) / (1 + skips)
+    if last:
+        weight *= 1 - 0.9 * math.exp(-(now - last) / RECENCY_TAU)
+    return max(weight, 1e-3)
+
+
+class SmartShuffle:
+    """Lecture aléatoire pondérée sur les positions de la playlist, historique persistant"""
+
+    def __init__(self, library_dir):
+        self.path = os.path.join(library_dir, HISTORY_NAME)
+        self.stats = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self.names = []
+        self.positions = {}
+        self.tree = FenwickTree()
+        self.cooldown = deque()
+        self._changes = 0
+
+    def sync(self, paths):
+        """Reconstruit l'arbre pour une nouvelle playlist (O(n), seulement quand elle change)"""
+        now = time.time()
+        self.names = [os.path.basename(p) for p in paths]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.tree = FenwickTree(track_weight(self.stats.get(name), now) for name in self.names)
+        cooled = [name for name in self.cooldown if name in self.positions]
+        self.cooldown = deque()
+        for name in cooled:
+            self._cool(name)
+
+    def _cool(self, name):
+        """Met la piste de côté pour les prochains tirages, puis rend son poids à la plus ancienne"""
+        if name in self.cooldown:
+            self.cooldown.remove(name)
+        self.cooldown.append(name)
+        if name in self.positions:
+            self.tree.set(self.positions[name], 0.0)
+        limit = min(COOLDOWN, max(len(self.names) // 2, 1))
+        while len(self.cooldown) > limit:
+            restored = self.cooldown.popleft()
+            if restored in self.positions:
+                self.tree.set(self.positions[restored], track_weight(self.stats.get(restored), time.time()))
+
+    def pick(self, rng=random):
+        """Index de la prochaine piste dans la playlist, ou None si elle est vide"""
+        return self.tree.sample(rng) if len(self.tree) else None
+
+    def started(self, path):
+        self._cool(os.path.basename(path))
+
+    def record(self, path, skipped):
+        name = os.path.basename(path)
+        plays, skips, _last = self.stats.get(name, (0, 0, 0))
+        if skipped:
+            skips += 1
+        else:
+            plays += 1
+        self.stats[name] = [plays, skips, int(time.time())]
+        # Le poids réel sera appliqué à la sortie du cooldown
+        self._changes += 1
+        if self._changes >= SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        if not self._changes and os.path.exists(self.path):
+            return
+        data = json.dumps(self.stats, ensure_ascii=False).encode("utf-8")
+        _write_atomic(self.path, lambda f: f.write(data))
+        self._changes = 0
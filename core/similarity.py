@@ -0,0 +1,127 @@
+import os
+import random
+import threading
+import numpy as np
+from core import analysis
+
+# Matrice des caractéristiques de toute la bibliothèque (une ligne float32 par piste)
+FEATURES_NAME = os.path.join(analysis.CACHE_DIR, "features.npz")
+
+
+class SimilarityIndex:
+    """Mode radio : la piste suivante est la plus proche acoustiquement de la piste courante.
+
+    Les vecteurs viennent de l'ingestion (métadonnées de chaque piste) ou sont calculés
+    en arrière-plan ; la recherche est un seul produit matrice-vecteur (similarité cosinus).
+    """
+
+    def __init__(self, library_dir):
+        self.path = os.path.join(library_dir, FEATURES_NAME)
+        self._lock = threading.Lock()
+        self.ids = {}
+        self.vectors = []
+        # (matrice normalisée, nom → ligne, noms) : reconstruit après chaque add()
+        self._snapshot = None
+        self._worker = None
+        try:
+            with np.load(self.path) as data:
+                for name, vector in zip(data["names"].tolist(), data["matrix"]):
+                    self.ids[name] = len(self.vectors)
+                    self.vectors.append(vector)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def __contains__(self, path):
+        return os.path.basename(path) in self.ids
+
+    def add(self, path, vector):
+        name = os.path.basename(path)
+        with self._lock:
+            if name in self.ids:
+                self.vectors[self.ids[name]] = np.asarray(vector, dtype=np.float32)
+            else:
+                self.ids[name] = len(self.vectors)
+                self.vectors.append(np.asarray(vector, dtype=np.float32))
+            self._snapshot = None
+
+    def save(self):
+        with self._lock:
+            if not self.vectors:
+                return
+            names = np.array(sorted(self.ids, key=self.ids.get))
+            matrix = np.stack(self.vectors)
+        analysis._write_atomic(self.path, lambda f: np.savez(f, names=names, matrix=matrix))
+
+    def snapshot(self):
+        """(matrice, nom → ligne, noms) cohérents entre eux, ou None si l'index est vide.
+
+        Caractéristiques centrées-réduites sur la bibliothèque, lignes de norme 1. Tout est
+        copié sous le verrou : un add() du thread d'analyse ne touche pas une recherche en cours.
+        """
+        with self._lock:
+            if self._snapshot is None and self.vectors:
+                matrix = np.stack(self.vectors)
+                matrix = (matrix - matrix.mean(axis=0)) / (matrix.std(axis=0) + 1e-6)
+                ids = dict(self.ids)
+                self._snapshot = (matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-6),
+                                  ids, sorted(ids, key=ids.get))
+            return self._snapshot
+
+    def most_similar(self, path, is_candidate=None, exclude=(), top=3, rng=random):
+        """Nom de fichier d'une des top pistes les plus proches, ou None.
+
+        is_candidate(nom) filtre les pistes absentes de la playlist ; il n'est appelé
+        que sur les meilleures lignes, le reste du travail est vectoriel.
+        """
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        normed, ids, names = snapshot
+        row = ids.get(os.path.basename(path))
+        if row is None:
+            return None
+        scores = normed @ normed[row]
+        scores[row] = -np.inf
+        for name in exclude:
+            excluded = ids.get(os.path.basename(name))
+            if excluded is not None:
+                scores[excluded] = -np.inf
+
+        # Les meilleures lignes d'abord ; on n'élargit que si elles sont toutes filtrées
+        width = min(len(scores), 32)
+        while width:
+            best = np.argpartition(-scores, width - 1)[:width]
+            best = best[np.argsort(-scores[best])]
+            chosen = [names[i] for i in best if np.isfinite(scores[i])
+                      and (is_candidate is None or is_candidate(names[i]))][:top]
+            if chosen or width == len(scores):
+                return rng.choice(chosen) if chosen else None
+            width = min(len(scores), width * 8)
+        return None
+
+    def names(self):
+        snapshot = self.snapshot()
+        return snapshot[2] if snapshot else []
+
+    def analyze_missing(self, paths):
+        """Complète la matrice en arrière-plan : métadonnées d'ingestion, sinon analyse complète"""
+        missing = [p for p in paths if p not in self]
+        if not missing or (self._worker and self._worker.is_alive()):
+            return
+
+        def run():
+            for path in missing:
+                vector = analysis.load_meta(path).get("features")
+                if vector is None:
+                    try:
+                        y, sr = analysis.decode(path)
+                        vector = analysis.feature_vector(y, sr).tolist()
+                        analysis.update_meta(path, features=vector)
+                    except Exception as e:
+                        print(f"⚠️ Analyse impossible pour {os.path.basename(path)} : {e}")
+                        continue
+                self.add(path, vector)
+            self.save()
+
+        self._worker = threading.Thread(target=run, daemon=True)
+        self._worker.start()
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+# Boutons de la barre de titre : fond blanc, texte noir par défaut
+TITLE_BUTTONS = ("config", "search", "reload", "minimize", "close")
+
+# Sections de config.json suivies par le rechargement à chaud
+SECTIONS = ("window", "progress_bar", "volume_bar", "visualizer", "power", "playback", "equalizer")
+
+
+# Les feuilles de style sont générées une seule fois par jeu de paramètres
+@lru_cache(maxsize=256)
+def button_style(color, text_color, border_radius, image_path=""):
+    if image_path:
+        return f"background-color: {color}; border-radius: {border_radius}px; background-image: url({image_path}); background-repeat: no-repeat; background-position: center; border: none;"
+    return f"background-color: {color}; color: {text_color}; border-radius: {border_radius}px;"
+
+
+@lru_cache(maxsize=32)
+def window_style(bg_color):
+    return f"background-color: {bg_color};"
+
+
+@lru_cache(maxsize=32)
+def gif_label_style(border_color):
+    return f"""
+            border: 3px solid {border_color};
+            background-color: rgba(0, 0, 0, 0.3);
+        """
+
+
+@lru_cache(maxsize=32)
+def list_style(selected_color):
+    return f"""
+            QListWidget::item:selected {{
+                background: {selected_color};
+                color: white;
+            }}
+            QListWidget::item:selected:!active {{
+                background: {selected_color};
+                color: white;
+            }}
+        """
+
+
+@lru_cache(maxsize=32)
+def progress_style(bg_color, chunk_color, radius):
+    return f"QProgressBar {{background-color: {bg_color}; border-radius: {radius}px;}} QProgressBar::chunk {{background-color: {chunk_color}; border-radius: {radius}px;}}"
+
+
+@lru_cache(maxsize=32)
+def volume_style(bg_color, slider_color, height, border_radius):
+    return f"""
+            QSlider::groove:horizontal {{
+                border-radius: {border_radius}px;
+                background: {bg_color};
+                height: {height}px;
+            }}
+            QSlider::handle:horizontal {{
+                background: {slider_color};
+                border-radius: {border_radius}px;
+                width: {int(height * 1.5)}px;
+                margin: -{height // 2}px 0;
+            }}
+        """
+
+
+def diff_config(old, new):
+    """Retourne les sections modifiées entre deux configurations.
+
+    "buttons" désigne les réglages communs (police, couleur du texte),
+    "buttons.<nom>" un bouton particulier.
+    """
+    changed = set()
+    for section in SECTIONS:
+        if old.get(section) != new.get(section):
+            changed.add(section)
+
+    old_btns = old.get("buttons", {})
+    new_btns = new.get("buttons", {})
+    for key in set(old_btns) | set(new_btns):
+        old_val, new_val = old_btns.get(key), new_btns.get(key)
+        if old_val == new_val:
+            continue
+        if isinstance(old_val, dict) or isinstance(new_val, dict):
+            changed.add(f"buttons.{key}")
+        else:
+            changed.add("buttons")
+    return changed
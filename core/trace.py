@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import deque
+from functools import wraps
+
+# Instrumentation légère : désactivée, span() renvoie un objet partagé qui ne fait rien.
+# Activation : NYRVANA_TRACE=trace.json ou main.py --trace trace.json
+# Le fichier s'ouvre dans chrome://tracing ou https://ui.perfetto.dev
+
+enabled = False
+_output_path = None
+_events = []
+_stats = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+_t0 = time.perf_counter()
+
+# Nombre d'échantillons conservés par nom pour l'overlay
+STATS_WINDOW = 120
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _add_event({
+            "name": self.name, "ph": "X",
+            "ts": (self.start - _t0) * 1e6, "dur": (end - self.start) * 1e6,
+            "pid": _pid, "tid": threading.get_ident(), "args": self.args,
+        })
+        sample(self.name, (end - self.start) * 1000)
+        return False
+
+
+def span(name, **args):
+    """Mesure la durée d'un bloc : with trace.span("load_audio"): ..."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """Décorateur équivalent à span() autour d'une fonction"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instant(name, **args):
+    if enabled:
+        _add_event({
+            "name": name, "ph": "i", "s": "t",
+            "ts": (time.perf_counter() - _t0) * 1e6,
+            "pid": _pid, "tid": threading.get_ident(), "args": args,
+        })
+
+
+def counter(name, **values):
+    if enabled:
+        _add_event({
+            "name": name, "ph": "C",
+            "ts": (time.perf_counter() - _t0) * 1e6,
+            "pid": _pid, "tid": threading.get_ident(), "args": values,
+        })
+
+
+def sample(name, value_ms):
+    """Enregistre une mesure (ms) pour les statistiques de l'overlay"""
+    if not enabled:
+        return
+    with _lock:
+        values = _stats.get(name)
+        if values is None:
+            values = _stats[name] = deque(maxlen=STATS_WINDOW)
+        values.append(value_ms)
+
+
+def stats(name):
+    """Retourne (dernière, moyenne, max) en ms, ou None sans mesure"""
+    with _lock:
+        values = list(_stats.get(name, ()))
+    if not values:
+        return None
+    return values[-1], sum(values) / len(values), max(values)
+
+
+def _add_event(event):
+    with _lock:
+        _events.append(event)
+
+
+def enable(output_path=None):
+    global enabled, _output_path
+    enabled = True
+    if output_path and _output_path is None:
+        atexit.register(export)
+    _output_path = output_path or _output_path
+
+
+def export(path=None):
+    """Écrit les événements au format Chrome trace-event JSON"""
+    path = path or _output_path
+    if not path:
+        return None
+    with _lock:
+        events = list(_events)
+    meta = {"name": "process_name", "ph": "M", "pid": _pid,
+            "args": {"name": os.path.basename(sys.argv[0]) or "python"}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": [meta] + events, "displayTimeUnit": "ms"}, f)
+    print(f"📈 Trace exportée : {path} ({len(events)} événements)")
+    return path
+
+
+if os.environ.get("NYRVANA_TRACE"):
+    enable(os.environ["NYRVANA_TRACE"])
@@ -1,10 +1,13 @@
-import numpy as np
-import librosa
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QPainter, QColor, QBrush, QLinearGradient
+from core.trace import traced
+from core import analysis
 
 class AudioVisualizer(QWidget):
+    painted = pyqtSignal()
+    beats_ready = pyqtSignal(str, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(120)
@@ -15,9 +18,16 @@ class AudioVisualizer(QWidget):
         self.intensity = 5.0
         
         self.spectrogramme = None
-        self.sample_rate = 22050
-        self.hop_length = 512
+        self.sample_rate = analysis.SAMPLE_RATE
+        self.hop_length = analysis.HOP_LENGTH
         self.current_frame = 0
+        self.frozen = False
+        # Pulsation sur les temps : grille de beats en cache, simple recherche par position
+        self.beat_pulse = 0.3
+        self.beats = None
+        self.pulse = 0.0
+        self.track_path = None
+        self.beats_ready.connect(self.on_beats_ready)
 
     def configure(self, config):
         """Récupère les paramètres dynamiques depuis le JSON"""
@@ -32,46 +42,87 @@ class AudioVisualizer(QWidget):
         
         # Intensité du mouvement
         self.intensity = viz_config.get("intensity", 5.0)
+
+        # Force de la pulsation sur les temps (0 : désactivée)
+        self.beat_pulse = viz_config.get("beat_pulse", 0.3)
         
         # On force la mise à jour si l'audio est déjà chargé
         self.update()
 
+    @traced()
     def load_audio(self, file_path):
-        """Analyse le MP3 avec le bon nombre de bandes configuré."""
+        """Analyse le MP3 avec le bon nombre de bandes configuré.
+
+        Le spectrogramme pré-calculé à l'ingestion est relu s'il existe,
+        sinon il est calculé puis mis en cache pour la prochaine lecture.
+        """
+        self.track_path = file_path
+        self.beats = analysis.load_beats(file_path)
+        self.pulse = 0.0
+        y = None
         try:
-            y, sr = librosa.load(file_path, sr=self.sample_rate, mono=True)
-            stft = np.abs(librosa.stft(y, n_fft=2048, hop_length=self.hop_length))
-            
-            # On utilise self.nb_bandes récupéré du JSON
-            mel_basis = librosa.filters.mel(sr=sr, n_fft=2048, n_mels=self.nb_bandes)
-            self.spectrogramme = np.dot(mel_basis, stft)
-            self.spectrogramme = librosa.amplitude_to_db(self.spectrogramme, ref=np.max)
-            
-            # Normalisation (0.0 à 1.0)
-            self.spectrogramme = (self.spectrogramme + 80) / 80 
+            self.spectrogramme = analysis.load_spectrogram(file_path, self.nb_bandes)
+            if self.spectrogramme is None:
+                y, sr = analysis.decode(file_path)
+                # On utilise self.nb_bandes récupéré du JSON, normalisé de 0.0 à 1.0
+                self.spectrogramme = analysis.mel_spectrogram(y, sr, self.nb_bandes)
+                analysis.save_spectrogram(file_path, self.nb_bandes, self.spectrogramme)
+                # Signal décodé de toute façon : début/fin audibles pour les prochaines lectures
+                if "audio_end_ms" not in analysis.load_meta(file_path):
+                    analysis.update_meta(file_path, **analysis.bounds_meta(y, sr))
         except Exception as e:
             print(f"Erreur Equalizer : {e}")
             self.spectrogramme = None
 
+        if self.beats is None and self.beat_pulse > 0:
+            # Piste jamais analysée : suivi des temps en arrière-plan, le changement de piste n'attend pas
+            analysis.track_worker.submit("beats", file_path, self._compute_beats, y)
+
+    def _compute_beats(self, path, signal):
+        try:
+            beats = analysis.compute_beats(signal(), self.sample_rate)
+            analysis.save_beats(path, beats)
+        except Exception as e:
+            print(f"⚠️ Analyse du tempo impossible : {e}")
+            return
+        if analysis.track_worker.is_current("beats", path):
+            self.beats_ready.emit(path, beats)
+
+    def on_beats_ready(self, path, beats):
+        if path == self.track_path:
+            self.beats = beats
+
+    def set_frozen(self, frozen):
+        """Fige le visualiseur (mode économie d'énergie) : plus aucun redessin"""
+        self.frozen = frozen
+        if not frozen:
+            self.update()
+
     def update_visualizer(self, ms):
+        if self.frozen:
+            return
+        self.pulse = self.beats.pulse(ms) if self.beats is not None and self.beat_pulse > 0 else 0.0
         if self.spectrogramme is not None:
             secondes = ms / 1000
             self.current_frame = int((secondes * self.sample_rate) / self.hop_length)
             self.update()
 
+    @traced()
     def paintEvent(self, event):
+        self.painted.emit()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         w, h = self.width(), self.height()
         # Calcul dynamique de la largeur selon le JSON
         bar_w = w / self.nb_bandes
+        boost = 1.0 + self.beat_pulse * self.pulse
 
         if self.spectrogramme is not None and self.current_frame < self.spectrogramme.shape[1]:
             for i in range(self.nb_bandes):
                 # Utilisation de l'intensité du JSON
                 amp = self.spectrogramme[i, self.current_frame]
-                bar_h = max(2, amp * h * (self.intensity / 5.0)) 
+                bar_h = max(2, amp * h * (self.intensity / 5.0) * boost)
                 
                 # Création d'un dégradé vertical pour chaque barre
                 gradient = QLinearGradient(0, h, 0, h - bar_h)
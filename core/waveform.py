@@ -0,0 +1,107 @@
+import numpy as np
+from PyQt6.QtWidgets import QProgressBar, QToolTip
+from PyQt6.QtCore import QLineF, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QPen
+from core import analysis
+from core.trace import traced
+
+
+def format_ms(ms):
+    seconds = int(ms) // 1000
+    return f"{seconds // 60:02}:{seconds % 60:02}"
+
+
+class WaveformBar(QProgressBar):
+    """Barre de progression qui peut dessiner la forme d'onde (pics min/max) de la piste.
+
+    Sans forme d'onde (désactivée ou pas encore calculée), c'est une QProgressBar normale.
+    Les pics viennent de la pyramide en cache ; un redimensionnement choisit un niveau
+    et réduit en quelques opérations numpy, sans jamais relire le signal.
+    """
+    peaks_ready = pyqtSignal(str, object)
+
+    def __init__(self, duration_provider=None, parent=None):
+        super().__init__(parent)
+        self.setRange(0, 1000)
+        self.setTextVisible(False)
+        self.setMouseTracking(True)
+        self.duration_provider = duration_provider
+        self.waveform_enabled = False
+        self.played_color = QColor("#d09dd2")
+        self.remaining_color = QColor("#350b4a")
+        self.pyramid = None
+        self.track_path = None
+        self._columns = None
+        self.peaks_ready.connect(self.on_peaks_ready)
+
+    def configure(self, pb_cfg):
+        self.waveform_enabled = pb_cfg.get("waveform", False)
+        self.played_color = QColor(pb_cfg.get("color", "#d09dd2"))
+        self.remaining_color = QColor(pb_cfg.get("background_color", "#350b4a"))
+        if self.waveform_enabled and self.pyramid is None and self.track_path:
+            self.load_track(self.track_path)
+        self.update()
+
+    def load_track(self, path):
+        self.track_path = path
+        self.pyramid = analysis.load_peaks(path)
+        self._columns = None
+        if self.pyramid is None and self.waveform_enabled:
+            # Piste jamais analysée : calcul en arrière-plan, le changement de piste n'attend pas
+            analysis.track_worker.submit("peaks", path, self._compute_peaks)
+        self.update()
+
+    def _compute_peaks(self, path, signal):
+        try:
+            pyramid = analysis.compute_peaks(signal())
+            analysis.save_peaks(path, pyramid)
+        except Exception as e:
+            print(f"⚠️ Forme d'onde indisponible : {e}")
+            return
+        if analysis.track_worker.is_current("peaks", path):
+            self.peaks_ready.emit(path, pyramid)
+
+    def on_peaks_ready(self, path, pyramid):
+        if path == self.track_path:
+            self.pyramid = pyramid
+            self._columns = None
+            self.update()
+
+    def columns(self):
+        width = self.width()
+        if self._columns is None or self._columns[0] != width:
+            self._columns = (width, *self.pyramid.columns(width))
+        return self._columns[1], self._columns[2]
+
+    @traced("waveform.paint")
+    def paintEvent(self, event):
+        if not self.waveform_enabled or self.pyramid is None:
+            return super().paintEvent(event)
+
+        mins, maxs = self.columns()
+        mid = self.height() / 2
+        played = int(self.width() * self.value() / max(self.maximum(), 1))
+
+        # Une ligne verticale par colonne, du pic bas au pic haut (au moins 1 px)
+        tops = (mid - np.maximum(maxs * mid, 0.5)).tolist()
+        bottoms = (mid - np.minimum(mins * mid, -0.5)).tolist()
+
+        painter = QPainter(self)
+        for color, start, end in ((self.played_color, 0, played),
+                                  (self.remaining_color, played, len(tops))):
+            if end <= start:
+                continue
+            painter.setPen(QPen(color, 1))
+            painter.drawLines([QLineF(x, tops[x], x, bottoms[x]) for x in range(start, end)])
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        if self.duration_provider and self.width() > 0:
+            ratio = min(max(event.position().x() / self.width(), 0.0), 1.0)
+            QToolTip.showText(event.globalPosition().toPoint(),
+                              format_ms(ratio * self.duration_provider()), self)
+        super().mouseMoveEvent(event)
+
+    def resizeEvent(self, event):
+        self._columns = None
+        super().resizeEvent(event)
@@ -1,22 +1,51 @@
 import sys
 import os
 import json
+import time
 import subprocess
 import argparse
+from collections import deque
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QProgressBar, QListWidget, QSlider
+    QPushButton, QLabel, QListWidget, QSlider, QLineEdit, QListWidgetItem,
+    QGraphicsOpacityEffect
 )
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize
-from PyQt6.QtGui import QPixmap, QFont, QMovie
+from PyQt6.QtCore import (
+    Qt, QTimer, QPropertyAnimation, QParallelAnimationGroup, QEasingCurve, QSize,
+    QFileSystemWatcher, QEvent
+)
+from PyQt6.QtGui import QPixmap, QFont, QMovie, QShortcut, QKeySequence
 from core.actions import (
     load_playlist_from_folder, play_music, pause_music, stop_music,
     load_track_by_index, get_current_position_ms, get_current_track_duration_ms,
     set_volume, playlist, get_current_track_name, get_current_index, set_current_index,
-    seek_to_position
+    seek_to_position, add_to_playlist, set_loudness_normalization, set_equalizer, loop_music,
+    get_track_bounds_ms, set_silence_trimming, set_track_trimming, track_ended, set_backend
 )
+from core.audio import BACKENDS, create_backend
 from core.visualizer import AudioVisualizer
-import pygame 
+from core.waveform import WaveformBar
+from core.analysis import artwork_path, load_meta
+from core.search import TrigramIndex, track_text
+from core.similarity import SimilarityIndex
+from core.shuffle import SmartShuffle
+from core.loudness import TARGET_LUFS
+from core.equalizer import EQ_FREQS
+from core.ipc import ControlServer, send_command
+from core import trace
+from core.trace import traced
+from core.styles import (
+    TITLE_BUTTONS, button_style, window_style, gif_label_style, list_style,
+    progress_style, volume_style, diff_config
+)
+
+CONFIG_PATH = "config.json"
+
+# Intervalle du timer de progression en mode normal (ms)
+NORMAL_TICK_MS = 50
+
+# Ordre de lecture : à la suite, ou radio (piste la plus proche acoustiquement)
+PLAYBACK_MODES = ("sequential", "radio", "shuffle")
 
 
 def ms_to_mmss(ms: int) -> str:
@@ -24,7 +53,7 @@ def ms_to_mmss(ms: int) -> str:
     return f"{seconds // 60:02}:{seconds % 60:02}"
 
 
-def load_config(path="config.json") -> dict:
+def load_config(path=CONFIG_PATH) -> dict:
     if not os.path.isfile(path):
         return {}
     with open(path, "r", encoding="utf-8") as f:
@@ -34,6 +63,10 @@ def load_config(path="config.json") -> dict:
 def parse_args():
     parser = argparse.ArgumentParser(description='Lecteur de musique')
     parser.add_argument('--tiled', action='store_true', help='Mode fenêtre tiled (non flottante)')
+    parser.add_argument('--trace', metavar='FICHIER', help='Enregistre une trace de performance (format Chrome)')
+    parser.add_argument('--trace-overlay', action='store_true', help='Affiche les mesures de performance à l\'écran')
+    parser.add_argument('--audio', choices=sorted(BACKENDS), help='Sortie audio (défaut : NYRVANA_AUDIO, sinon pygame)')
+    parser.add_argument('--audio-wav', metavar='FICHIER', help='Avec --audio null : écrit ce qui est joué dans un WAV')
     return parser.parse_args()
 
 
@@ -42,7 +75,14 @@ class AnimatedButton(QPushButton):
         super().__init__(*args, **kwargs)
         self._base_width = None
         self._base_height = None
+
+        self._animation_group = QParallelAnimationGroup(self)
         self._animations = []
+        for prop in (b"maximumWidth", b"maximumHeight", b"minimumWidth", b"minimumHeight"):
+            anim = QPropertyAnimation(self, prop)
+            anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+            self._animation_group.addAnimation(anim)
+            self._animations.append(anim)
         
     def showEvent(self, event):
         super().showEvent(event)
@@ -87,43 +127,115 @@ class AnimatedButton(QPushButton):
         super().mouseReleaseEvent(event)
     
     def animate_size(self, target_w, target_h, duration):
+        # Un seul groupe d'animations par bouton, réutilisé à chaque survol/clic
+        self._animation_group.stop()
         for anim in self._animations:
-            if anim and anim.state() == QPropertyAnimation.State.Running:
-                anim.stop()
-        self._animations.clear()
-        
-        anim_w = QPropertyAnimation(self, b"maximumWidth")
-        anim_w.setDuration(duration)
-        anim_w.setStartValue(self.width())
-        anim_w.setEndValue(target_w)
-        anim_w.setEasingCurve(QEasingCurve.Type.OutCubic)
-        
-        anim_h = QPropertyAnimation(self, b"maximumHeight")
-        anim_h.setDuration(duration)
-        anim_h.setStartValue(self.height())
-        anim_h.setEndValue(target_h)
-        anim_h.setEasingCurve(QEasingCurve.Type.OutCubic)
-        
-        anim_minw = QPropertyAnimation(self, b"minimumWidth")
-        anim_minw.setDuration(duration)
-        anim_minw.setStartValue(self.width())
-        anim_minw.setEndValue(target_w)
-        anim_minw.setEasingCurve(QEasingCurve.Type.OutCubic)
-        
-        anim_minh = QPropertyAnimation(self, b"minimumHeight")
-        anim_minh.setDuration(duration)
-        anim_minh.setStartValue(self.height())
-        anim_minh.setEndValue(target_h)
-        anim_minh.setEasingCurve(QEasingCurve.Type.OutCubic)
-        
-        self._animations = [anim_w, anim_h, anim_minw, anim_minh]
-        
-        for anim in self._animations:
-            anim.start()
+            anim.setDuration(duration)
+            is_width = anim.propertyName() in (b"maximumWidth", b"minimumWidth")
+            anim.setStartValue(self.width() if is_width else self.height())
+            anim.setEndValue(target_w if is_width else target_h)
+        self._animation_group.start()
+
+
+class TraceOverlay(QLabel):
+    """Affiche le temps de dessin, la gigue du timer et la latence de changement de piste"""
+
+    METRICS = (
+        ("paint", "AudioVisualizer.paintEvent"),
+        ("tick", "tick_jitter"),
+        ("switch", "track_switch"),
+    )
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setStyleSheet("color: #00ff00; background-color: rgba(0, 0, 0, 0.6); font-family: monospace; font-size: 9px; padding: 2px;")
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def refresh(self):
+        lines = []
+        for label, name in self.METRICS:
+            values = trace.stats(name)
+            if values is None:
+                lines.append(f"{label:<6} --")
+            else:
+                last, mean, peak = values
+                lines.append(f"{label:<6} {last:6.1f} moy {mean:6.1f} max {peak:6.1f} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(4, self.parent().height() - self.height() - 4)
+        self.raise_()
+
+
+class QuickOpen(QWidget):
+    """Recherche au clavier dans la bibliothèque (Ctrl+P) : Entrée joue la piste choisie"""
+
+    def __init__(self, parent, index, on_select):
+        super().__init__(parent)
+        self.index = index
+        self.on_select = on_select
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 0.85); color: white;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Rechercher une piste...")
+        self.input.textChanged.connect(self.refresh)
+        self.input.installEventFilter(self)
+        layout.addWidget(self.input)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.accept)
+        layout.addWidget(self.results)
+        self.hide()
+
+    def open(self):
+        parent = self.parent()
+        self.setGeometry(10, 40, parent.width() - 20, min(260, parent.height() - 50))
+        self.input.clear()
+        self.refresh("")
+        self.show()
+        self.raise_()
+        self.input.setFocus()
+
+    @traced("quick_open.search")
+    def refresh(self, text):
+        self.results.clear()
+        for path, _score in self.index.search(text, limit=30) if text.strip() else []:
+            item = QListWidgetItem(os.path.basename(path))
+            item.setData(Qt.ItemDataRole.UserRole, path)
+            self.results.addItem(item)
+        self.results.setCurrentRow(0)
+
+    def accept(self, item=None):
+        item = item or self.results.currentItem()
+        self.hide()
+        if item is not None:
+            self.on_select(item.data(Qt.ItemDataRole.UserRole))
+
+    def eventFilter(self, obj, event):
+        # Flèches et Entrée depuis le champ de saisie, Échap pour fermer
+        if obj is self.input and event.type() == QEvent.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if key == Qt.Key.Key_Down else -1
+                row = min(max(self.results.currentRow() + step, 0), self.results.count() - 1)
+                self.results.setCurrentRow(row)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                self.accept()
+                return True
+            if key == Qt.Key.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(obj, event)
 
 
 class MusicApp(QWidget):
-    def __init__(self, tiled_mode=False):
+    def __init__(self, tiled_mode=False, trace_overlay=False):
         super().__init__()
         self.config = load_config()
         self.is_playing = False
@@ -131,17 +243,54 @@ class MusicApp(QWidget):
         self.track_finished = False
         self._drag_pos = None
         self.tiled_mode = tiled_mode
+        self._last_tick = None
+        self.low_power = False
+        self.wakeups = {"timer": 0, "paint": 0, "gif": 0}
+        self._wakeups_since = time.monotonic()
+
+        # Pistes récentes (exclues en mode radio) et historique du shuffle : créés avant
+        # load_music, qui passe par update_track_label
+        self.history = deque(maxlen=20)
+        self._positions = None
+        self.similarity = SimilarityIndex(os.path.join(os.getcwd(), "assets", "music"))
+        self.shuffle = SmartShuffle(os.path.join(os.getcwd(), "assets", "music"))
+        self._shuffle_positions = None
 
         self.setup_window()
         self.setup_ui()
         self.load_music()
 
         self.timer = QTimer()
-        self.timer.setInterval(50)
+        self.timer.setInterval(NORMAL_TICK_MS)
         self.timer.timeout.connect(self.update_progress)
         self.timer.start()
+        self.visualizer.painted.connect(lambda: self.count_wakeup("paint"))
 
         self.on_volume_change(self.volume_slider.value())
+
+        self.watch_config()
+
+        self.trace_overlay = None
+        if trace_overlay:
+            trace.enable()
+            self.trace_overlay = TraceOverlay(self)
+
+        self.playback_mode = "sequential"
+        self.set_playback_mode(self.config.get("playback", {}).get("mode", "sequential"))
+        self.apply_loudness_config()
+        self.apply_equalizer_config()
+        QShortcut(QKeySequence("Ctrl+T"), self, activated=self.toggle_track_trimming)
+        QShortcut(QKeySequence("Ctrl+R"), self, activated=self.toggle_radio)
+        QShortcut(QKeySequence("Ctrl+S"), self, activated=self.toggle_shuffle)
+
+        self.search_index = TrigramIndex()
+        self.quick_open = QuickOpen(self, self.search_index, self.select_path)
+        QShortcut(QKeySequence("Ctrl+P"), self, activated=self.open_quick_open)
+
+        self.control_server = ControlServer(self.handle_command, parent=self)
+        if not self.control_server.listen():
+            print("⚠️ Serveur de contrôle indisponible")
+
         self.show()
 
     def setup_window(self):
@@ -157,7 +306,8 @@ class MusicApp(QWidget):
             
         self.setWindowTitle(cfg.get("title", "MusicPlayer"))
         bg_color = cfg.get("background_color", "#9141ac")
-        self.setStyleSheet(f"background-color: {bg_color};")
+        self._applied_styles = {}
+        self.set_style(self, "window", window_style(bg_color))
 
         if not self.tiled_mode:
             self.setWindowFlag(Qt.WindowType.WindowMinimizeButtonHint, True)
@@ -179,12 +329,12 @@ class MusicApp(QWidget):
         self.music_gif_label.setScaledContents(True)
         self.music_gif_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        border_color = bg_color
-        self.music_gif_label.setStyleSheet(f"""
-            border: 3px solid {border_color};
-            background-color: rgba(0, 0, 0, 0.3);
-        """)
+        self.set_style(self.music_gif_label, "gif_label", gif_label_style(bg_color))
         self.music_gif_label.hide()
+        # Pulsation de la pochette sur les temps (opacité, pas de redimensionnement)
+        self.artwork_opacity = QGraphicsOpacityEffect(self.music_gif_label)
+        self.artwork_opacity.setOpacity(1.0)
+        self.music_gif_label.setGraphicsEffect(self.artwork_opacity)
         
         self.music_gif_movie = None
         self.bg_movie = None
@@ -214,32 +364,13 @@ class MusicApp(QWidget):
         title_bar.setSpacing(5)
         title_bar.addStretch()
 
-        def create_btn_from_config(symbol, callback, btn_name):
-            cfg = self.config.get("buttons", {}).get(btn_name, {})
-            size = cfg.get("size", [30, 30])
-            color = cfg.get("color", "#ffffff")
-            text_color = cfg.get("text_color", "#000000")
-            shape = cfg.get("shape", "")
-            border_radius = 8 if shape == "rounded" else 0
-            image_path = cfg.get("image_path", "")
-
-            btn = AnimatedButton(symbol)
-            btn.setFont(self.app_font)
-            btn.setFixedSize(*size)
-
-            if image_path and os.path.isfile(image_path):
-                btn.setText("")
-                btn.setStyleSheet(f"background-color: {color}; border-radius: {border_radius}px; background-image: url({image_path}); background-repeat: no-repeat; background-position: center; border: none;")
-            else:
-                btn.setStyleSheet(f"background-color: {color}; color: {text_color}; border-radius: {border_radius}px;")
-            btn.clicked.connect(callback)
-            return btn
+        self.buttons = {}
 
-        self.config_button = create_btn_from_config("☼", self.launch_config_ui, "config")
-        self.search_button = create_btn_from_config("♫", self.launch_research_ui, "search")
-        self.reload_button = create_btn_from_config("⤷", self.reload_playlist, "reload")
-        self.btn_minimize = create_btn_from_config("—", self.showMinimized, "minimize")
-        self.btn_close = create_btn_from_config("✕", self.close, "close")
+        self.config_button = self.create_button("config", "☼", self.launch_config_ui)
+        self.search_button = self.create_button("search", "♫", self.launch_research_ui)
+        self.reload_button = self.create_button("reload", "⤷", self.reload_playlist)
+        self.btn_minimize = self.create_button("minimize", "—", self.showMinimized)
+        self.btn_close = self.create_button("close", "✕", self.close)
 
         for btn in [self.config_button, self.search_button, self.reload_button, self.btn_minimize, self.btn_close]:
             title_bar.addWidget(btn)
@@ -252,19 +383,6 @@ class MusicApp(QWidget):
         self.list_widget.setMaximumHeight(80)
         self.list_widget.setMinimumHeight(80)
         
-        pb_cfg = self.config.get("progress_bar", {})
-        progress_bg_color = pb_cfg.get("background_color", "#350b4a")
-        
-        self.list_widget.setStyleSheet(f"""
-            QListWidget::item:selected {{
-                background: {progress_bg_color};
-                color: white;
-            }}
-            QListWidget::item:selected:!active {{
-                background: {progress_bg_color};
-                color: white;
-            }}
-        """)
         main_layout.addWidget(self.list_widget)
 
         # MODE TILED : GIF après la playlist
@@ -293,39 +411,12 @@ class MusicApp(QWidget):
         self.track_label.setStyleSheet("color: white; background: transparent;")
         main_layout.addWidget(self.track_label)
 
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 1000)
-        self.progress_bar.setTextVisible(False)
-        chunk_color = pb_cfg.get("color", "#d09dd2")
-        bg_color = pb_cfg.get("background_color", "#350b4a")
-        radius = pb_cfg.get("radius", 10)
-        height = pb_cfg.get("height", 10)
-
-        self.progress_bar.setFixedHeight(height)
-        self.progress_bar.setStyleSheet(f"QProgressBar {{background-color: {bg_color}; border-radius: {radius}px;}} QProgressBar::chunk {{background-color: {chunk_color}; border-radius: {radius}px;}}");
+        # Barre de progression classique, ou forme d'onde si progress_bar.waveform est activé
+        self.progress_bar = WaveformBar(get_current_track_duration_ms)
+        self.apply_progress_bar_style()
         self.progress_bar.mousePressEvent = self.progress_clicked
         main_layout.addWidget(self.progress_bar)
 
-        self.buttons = {}
-
-        def create_btn(name, symbol, handler):
-            cfg = self.config.get("buttons", {}).get(name, {})
-            size = cfg.get("size", [30, 30])
-            color = cfg.get("color", "#613583")
-            text_color = self.config.get("buttons", {}).get("text_color", "#FFFFFF")
-            border_radius = 8 if cfg.get("shape", "") == "rounded" else 0
-            image_path = cfg.get("image_path", "")
-            btn = AnimatedButton(symbol)
-            btn.setFont(self.app_font)
-            btn.setFixedSize(*size)
-            if image_path and os.path.isfile(image_path):
-                btn.setText("")
-                btn.setStyleSheet(f"background-color: {color}; border-radius: {border_radius}px; background-image: url({image_path}); background-repeat: no-repeat; background-position: center; border: none;")
-            else:
-                btn.setStyleSheet(f"background-color: {color}; color: {text_color}; border-radius: {border_radius}px;")
-            btn.clicked.connect(handler)
-            return btn
-
         time_layout = QHBoxLayout()
         time_layout.addStretch(1)
 
@@ -336,17 +427,16 @@ class MusicApp(QWidget):
         self.time_label.setFixedWidth(260) 
         time_layout.addWidget(self.time_label)
 
-        self.buttons["loop"] = create_btn("loop", "↻", self.on_toggle_loop)
-        self.loop_btn_original_style = self.buttons["loop"].styleSheet()
+        self.create_button("loop", "↻", self.on_toggle_loop)
         time_layout.addStretch(1)
         time_layout.addWidget(self.buttons["loop"])
 
         main_layout.addLayout(time_layout)
 
         controls = QHBoxLayout()
-        self.buttons["rewind"] = create_btn("rewind", "❮❮", self.on_skip_back)
-        self.buttons["play"] = create_btn("play", "➤", self.on_toggle_play_pause)
-        self.buttons["forward"] = create_btn("forward", "❯❯", self.on_skip)
+        self.create_button("rewind", "❮❮", self.on_skip_back)
+        self.create_button("play", "➤", self.on_toggle_play_pause)
+        self.create_button("forward", "❯❯", self.on_skip)
 
         for btn in ["rewind", "play", "forward"]:
             controls.addWidget(self.buttons[btn])
@@ -358,35 +448,10 @@ class MusicApp(QWidget):
         self.volume_label.setStyleSheet("background: transparent;")
 
         self.volume_slider = QSlider(Qt.Orientation.Horizontal)
-
-        vol_cfg = self.config.get("volume_bar", {})
-        height = vol_cfg.get("height", 10)
-        bg_color = vol_cfg.get("background_color", "#62a0ea")
-        slider_color = vol_cfg.get("slider_color", "#ffffff")
-        slider_shape = vol_cfg.get("slider_shape", "rounded")
-        radius = vol_cfg.get("radius", 5)
-
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(70)
         self.volume_slider.valueChanged.connect(self.on_volume_change)
-        self.volume_slider.setFixedHeight(height)
-
-        border_radius = radius if slider_shape == "rounded" else 0
-
-        style = f"""
-            QSlider::groove:horizontal {{
-                border-radius: {border_radius}px;
-                background: {bg_color};
-                height: {height}px;
-            }}
-            QSlider::handle:horizontal {{
-                background: {slider_color};
-                border-radius: {border_radius}px;
-                width: {int(height * 1.5)}px;
-                margin: -{height // 2}px 0;
-            }}
-        """
-        self.volume_slider.setStyleSheet(style)
+        self.apply_volume_bar_style()
 
         volume_layout.addWidget(self.volume_label)
         volume_layout.addWidget(self.volume_slider)
@@ -398,6 +463,87 @@ class MusicApp(QWidget):
         
         self.music_gif_label.raise_()
 
+    def set_style(self, widget, key, style):
+        """Applique une feuille de style seulement si elle a changé"""
+        if self._applied_styles.get(key) == style:
+            return False
+        widget.setStyleSheet(style)
+        self._applied_styles[key] = style
+        return True
+
+    def create_button(self, name, symbol, handler):
+        btn = AnimatedButton(symbol)
+        btn.symbol = symbol
+        btn.setFont(self.app_font)
+        btn.clicked.connect(handler)
+        self.buttons[name] = btn
+        self.apply_button_style(name)
+        return btn
+
+    def apply_button_style(self, name):
+        btn_cfg = self.config.get("buttons", {})
+        cfg = btn_cfg.get(name, {})
+        if name in TITLE_BUTTONS:
+            color = cfg.get("color", "#ffffff")
+            text_color = cfg.get("text_color", "#000000")
+        else:
+            color = cfg.get("color", "#613583")
+            text_color = btn_cfg.get("text_color", "#FFFFFF")
+        border_radius = 8 if cfg.get("shape", "") == "rounded" else 0
+        image_path = cfg.get("image_path", "")
+        if not (image_path and os.path.isfile(image_path)):
+            image_path = ""
+
+        btn = self.buttons[name]
+        size = tuple(cfg.get("size", [30, 30]))
+        if size != (btn.width(), btn.height()) or btn._base_width is None:
+            btn.setFixedSize(*size)
+            btn._base_width = None
+        if image_path:
+            btn.setText("")
+        elif not btn.text():
+            btn.setText("❚❚" if name == "play" and self.is_playing else btn.symbol)
+        self.set_style(btn, f"buttons.{name}", button_style(color, text_color, border_radius, image_path))
+
+    def apply_progress_bar_style(self):
+        pb_cfg = self.config.get("progress_bar", {})
+        bg_color = pb_cfg.get("background_color", "#350b4a")
+        self.progress_bar.configure(pb_cfg)
+        if pb_cfg.get("waveform", False):
+            self.progress_bar.setFixedHeight(pb_cfg.get("waveform_height", 40))
+        else:
+            self.progress_bar.setFixedHeight(pb_cfg.get("height", 10))
+        self.set_style(self.progress_bar, "progress_bar", progress_style(
+            bg_color, pb_cfg.get("color", "#d09dd2"), pb_cfg.get("radius", 10)))
+        # La sélection de la playlist reprend la couleur de fond de la barre
+        self.set_style(self.list_widget, "playlist", list_style(bg_color))
+
+    def apply_volume_bar_style(self):
+        vol_cfg = self.config.get("volume_bar", {})
+        height = vol_cfg.get("height", 10)
+        radius = vol_cfg.get("radius", 5)
+        border_radius = radius if vol_cfg.get("slider_shape", "rounded") == "rounded" else 0
+        self.volume_slider.setFixedHeight(height)
+        self.set_style(self.volume_slider, "volume_bar", volume_style(
+            vol_cfg.get("background_color", "#62a0ea"),
+            vol_cfg.get("slider_color", "#ffffff"),
+            height, border_radius))
+
+    def apply_window_style(self):
+        cfg = self.config.get("window", {})
+        if not self.tiled_mode:
+            self.setFixedSize(cfg.get("width", 270), cfg.get("height", 450))
+        self.setWindowTitle(cfg.get("title", "MusicPlayer"))
+        bg_color = cfg.get("background_color", "#9141ac")
+        self.set_style(self, "window", window_style(bg_color))
+        self.set_style(self.music_gif_label, "gif_label", gif_label_style(bg_color))
+        bg_path = cfg.get("background_image_path", "")
+        if bg_path != self.bg_path:
+            self.bg_path = bg_path
+            if not bg_path:
+                self.bg_label.clear()
+            self.update_background()
+
     def launch_config_ui(self):
         subprocess.Popen([sys.executable, "config_ui.py"])
 
@@ -415,6 +561,7 @@ class MusicApp(QWidget):
         # Recharger la playlist
         music_dir = os.path.join(os.getcwd(), "assets", "music")
         load_playlist_from_folder(music_dir)
+        self._positions = None
         
         # Mettre à jour l'affichage
         self.list_widget.clear()
@@ -446,10 +593,158 @@ class MusicApp(QWidget):
         
         print("✅ Playlist rechargée")
 
+    def add_track(self, path):
+        """Ajoute une piste téléchargée sans recharger toute la playlist"""
+        if not os.path.isfile(path):
+            return False
+        was_empty = not playlist
+        count = len(playlist)
+        idx = add_to_playlist(path)
+        if len(playlist) > count:
+            self._positions = None
+            self.list_widget.addItem(os.path.basename(path))
+        if was_empty:
+            set_current_index(idx)
+            load_track_by_index(idx)
+            self.track_finished = False
+            self.update_track_label()
+            self.visualizer.load_audio(playlist[idx])
+        print(f"➕ Piste ajoutée : {os.path.basename(path)}")
+        return True
+
+    def apply_config(self, config):
+        """Applique une nouvelle configuration en ne touchant que les sections modifiées"""
+        changed = diff_config(self.config, config)
+        self.config = config
+        if not changed:
+            return changed
+
+        if "window" in changed:
+            self.apply_window_style()
+
+        btn_cfg = self.config.get("buttons", {})
+        if "buttons" in changed:
+            self.app_font = QFont(btn_cfg.get("font_family", "Arial"), btn_cfg.get("font_size", 14))
+            for widget in (self.list_widget, self.track_label, self.time_label, self.volume_label):
+                widget.setFont(self.app_font)
+        for name, btn in self.buttons.items():
+            if "buttons" in changed:
+                btn.setFont(self.app_font)
+            if "buttons" in changed or f"buttons.{name}" in changed:
+                self.apply_button_style(name)
+
+        if "progress_bar" in changed:
+            self.apply_progress_bar_style()
+        if "volume_bar" in changed:
+            self.apply_volume_bar_style()
+        if "visualizer" in changed:
+            old_bars = self.visualizer.nb_bandes
+            self.visualizer.configure(self.config)
+            # Le nombre de bandes change l'analyse : on recalcule le spectrogramme
+            if self.visualizer.nb_bandes != old_bars and 0 <= get_current_index() < len(playlist):
+                self.visualizer.load_audio(playlist[get_current_index()])
+
+        if "power" in changed:
+            self.update_power_state()
+        if "playback" in changed:
+            self.set_playback_mode(self.config.get("playback", {}).get("mode", "sequential"))
+            self.apply_loudness_config()
+        if "equalizer" in changed:
+            self.apply_equalizer_config()
+
+        print(f"🎨 Configuration appliquée : {', '.join(sorted(changed))}")
+        return changed
+
+    def watch_config(self):
+        """Surveille config.json et applique les changements à chaud"""
+        self.config_watcher = QFileSystemWatcher(self)
+        self.config_reload_timer = QTimer(self)
+        self.config_reload_timer.setSingleShot(True)
+        self.config_reload_timer.setInterval(200)
+        self.config_reload_timer.timeout.connect(self.on_config_file_changed)
+        self.config_watcher.fileChanged.connect(lambda _path: self.config_reload_timer.start())
+        if os.path.isfile(CONFIG_PATH):
+            self.config_watcher.addPath(os.path.abspath(CONFIG_PATH))
+
+    def on_config_file_changed(self):
+        path = os.path.abspath(CONFIG_PATH)
+        # Un remplacement atomique du fichier le retire de la surveillance
+        if os.path.isfile(path) and path not in self.config_watcher.files():
+            self.config_watcher.addPath(path)
+        try:
+            config = load_config()
+        except (OSError, ValueError):
+            # Fichier en cours d'écriture : le prochain événement le relira
+            return
+        self.apply_config(config)
+
+    def handle_command(self, msg):
+        """Traite une commande reçue par le serveur de contrôle"""
+        cmd = msg.get("cmd")
+        if cmd == "add_track":
+            if not self.add_track(msg.get("path", "")):
+                return {"ok": False, "error": "Fichier introuvable"}
+        elif cmd == "apply_config":
+            self.apply_config(msg.get("config") or load_config())
+        elif cmd == "play":
+            if not self.is_playing:
+                self.on_toggle_play_pause()
+        elif cmd == "pause":
+            if self.is_playing:
+                self.on_toggle_play_pause()
+        elif cmd == "toggle":
+            self.on_toggle_play_pause()
+        elif cmd == "next":
+            if playlist:
+                self.on_skip()
+        elif cmd == "prev":
+            if playlist:
+                self.on_skip_back()
+        elif cmd == "seek":
+            seek_to_position(int(msg.get("ms", 0)))
+            if not self.is_playing:
+                pause_music()
+        elif cmd == "mode":
+            if msg.get("mode") not in PLAYBACK_MODES:
+                return {"ok": False, "error": f"Mode inconnu : {msg.get('mode')}"}
+            self.set_playback_mode(msg["mode"])
+        elif cmd == "trim":
+            # {"enabled": bool} pour tout le lecteur, avec "track": true pour la piste courante
+            if msg.get("track"):
+                self.toggle_track_trimming(bool(msg.get("enabled", True)))
+            else:
+                set_silence_trimming(bool(msg.get("enabled", True)))
+        elif cmd == "show":
+            self.showNormal()
+            self.raise_()
+            self.activateWindow()
+        return {"ok": True, "state": self.get_state()}
+
+    def get_state(self):
+        return {
+            "playing": self.is_playing,
+            "looping": self.is_looping,
+            "track": get_current_track_name(),
+            "index": get_current_index(),
+            "position_ms": get_current_position_ms(),
+            "duration_ms": get_current_track_duration_ms(),
+            "tracks": len(playlist),
+            "low_power": self.low_power,
+            "mode": self.playback_mode,
+            "bounds_ms": list(get_track_bounds_ms()),
+            "wakeups_per_s": self.wakeup_rates(),
+        }
+
+    def closeEvent(self, event):
+        self.control_server.close()
+        self.shuffle.save()
+        super().closeEvent(event)
+
     def load_music(self):
         music_dir = os.path.join(os.getcwd(), "assets", "music")
         os.makedirs(music_dir, exist_ok=True)
         load_playlist_from_folder(music_dir)
+        self._positions = None
         self.list_widget.clear()
         for path in playlist:
             self.list_widget.addItem(os.path.basename(path))
@@ -465,6 +760,11 @@ class MusicApp(QWidget):
 
     def update_track_label(self):
         name = get_current_track_name()
+        if 0 <= get_current_index() < len(playlist):
+            self.progress_bar.load_track(playlist[get_current_index()])
+            if not self.history or self.history[-1] != playlist[get_current_index()]:
+                self.history.append(playlist[get_current_index()])
+                self.shuffle.started(playlist[get_current_index()])
         self.track_label.setText(name or "Aucune musique")
         try:
             idx = playlist.index(os.path.join(os.getcwd(), "assets", "music", name))
@@ -474,17 +774,28 @@ class MusicApp(QWidget):
         
         self.load_background_gif(name)
 
+    @traced("update_progress")
     def update_progress(self):
+        self.count_wakeup("timer")
+        if trace.enabled:
+            now = time.perf_counter()
+            if self._last_tick is not None:
+                trace.sample("tick_jitter", abs((now - self._last_tick) * 1000 - self.timer.interval()))
+            self._last_tick = now
+
         pos = get_current_position_ms()
         dur = get_current_track_duration_ms()
         if dur > 0:
             self.progress_bar.setValue(int((pos / dur) * 1000))
             self.time_label.setText(f"{ms_to_mmss(pos)} / {ms_to_mmss(dur)}")
 
-            if pos >= dur - 500:
+            # Fin effective : fin de la partie audible si la piste est découpée, sinon 500 ms avant la fin
+            start_ms, end_ms = get_track_bounds_ms()
+            end_ms = end_ms if end_ms < dur else dur - 500
+            # La sortie audio peut aussi signaler la fin (durée annoncée trop longue)
+            if pos >= end_ms or (self.is_playing and track_ended()):
                 if self.is_looping:
-                    seek_to_position(0)
-                    pygame.mixer.music.play(loops=-1)
+                    seek_to_position(start_ms, loops=-1)
                     self.track_finished = False
                     self.is_playing = True
                     self.buttons["play"].setText("❚❚")
@@ -492,19 +803,41 @@ class MusicApp(QWidget):
                     if not self.track_finished:
                         self.track_finished = True
                         self.on_skip()
-            elif pos < dur - 1000:
+            elif pos < end_ms - 500:
                 self.track_finished = False
         else:
             self.progress_bar.setValue(0)
             self.time_label.setText("00:00 / 00:00")
 
         self.visualizer.update_visualizer(pos)
+        self.pulse_artwork()
+
+    def pulse_artwork(self):
+        # Sans grille de temps (piste pas encore analysée, ou analyse impossible) : pochette intacte
+        if self.visualizer.beats is None:
+            opacity = 1.0
+        else:
+            # Opacité arrondie au 1/20 : un changement seulement quand la pulsation varie vraiment
+            strength = self.visualizer.beat_pulse
+            opacity = round((1.0 - 0.5 * strength * (1.0 - self.visualizer.pulse)) * 20) / 20
+        if opacity != self.artwork_opacity.opacity():
+            self.artwork_opacity.setOpacity(opacity)
 
     def progress_clicked(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             ratio = event.position().x() / self.progress_bar.width()
             seek_to_position(int(get_current_track_duration_ms() * ratio))
 
+    def open_quick_open(self):
+        # Mise à jour incrémentale : seules les pistes ajoutées ou disparues sont (ré)indexées
+        self.search_index.sync(playlist, lambda path: track_text(path, load_meta(path).get("tags")))
+        self.quick_open.open()
+
+    def select_path(self, path):
+        if path in playlist:
+            self.select_track(self.list_widget.model().index(playlist.index(path), 0))
+
+    @traced("track_switch")
     def select_track(self, index):
         i = index.row()
         if 0 <= i < len(playlist):
@@ -524,14 +857,22 @@ class MusicApp(QWidget):
         else:
             pos = get_current_position_ms()
             dur = get_current_track_duration_ms()
-            if pos >= dur or pos == 0:
-                seek_to_position(0)
-                pygame.mixer.music.play(loops=-1 if self.is_looping else 0)
+            if get_current_index() == -1:
+                # Aucune piste chargée : play/loop charge la première
+                if self.is_looping:
+                    loop_music()
+                else:
+                    play_music()
+            elif pos >= dur or pos == 0:
+                # Le saut recharge et lance la piste (en boucle si besoin) : un seul démarrage
+                seek_to_position(get_track_bounds_ms()[0], loops=-1 if self.is_looping else 0)
             else:
                 play_music()
             self.is_playing = True
             self.buttons["play"].setText("❚❚")
+        self.update_power_state()
 
+    @traced("track_switch")
     def on_skip_back(self):
         i = (get_current_index() - 1) % len(playlist)
         set_current_index(i)
@@ -542,8 +883,73 @@ class MusicApp(QWidget):
         if self.is_playing:
             play_music()
 
+    def set_playback_mode(self, mode):
+        self.playback_mode = mode if mode in PLAYBACK_MODES else "sequential"
+        if self.playback_mode == "radio":
+            # Les pistes sans vecteur sont analysées en arrière-plan, sans bloquer la lecture
+            self.similarity.analyze_missing(list(playlist))
+        print(f"🔀 Mode de lecture : {self.playback_mode}")
+
+    def apply_loudness_config(self):
+        playback_cfg = self.config.get("playback", {})
+        set_loudness_normalization(playback_cfg.get("normalize_loudness", True),
+                                   playback_cfg.get("target_lufs", TARGET_LUFS))
+        set_silence_trimming(playback_cfg.get("trim_silence", True))
+
+    def toggle_track_trimming(self, enabled=None):
+        """Découpe des silences pour la piste courante (inversée si enabled est None)"""
+        if not 0 <= get_current_index() < len(playlist):
+            return
+        path = playlist[get_current_index()]
+        if enabled is None:
+            enabled = load_meta(path).get("trim_silence", True) is False
+        set_track_trimming(path, enabled)
+        print(f"✂️ Silences {'coupés' if enabled else 'conservés'} pour {os.path.basename(path)}")
+
+    def apply_equalizer_config(self):
+        eq_cfg = self.config.get("equalizer", {})
+        set_equalizer(eq_cfg.get("enabled", False), eq_cfg.get("gains", [0] * len(EQ_FREQS)))
+
+    def toggle_radio(self):
+        self.set_playback_mode("sequential" if self.playback_mode == "radio" else "radio")
+
+    def toggle_shuffle(self):
+        self.set_playback_mode("sequential" if self.playback_mode == "shuffle" else "shuffle")
+
+    def playlist_positions(self):
+        """Nom de fichier → index dans la playlist ; remis à None à chaque changement de playlist"""
+        if self._positions is None:
+            self._positions = {os.path.basename(p): i for i, p in enumerate(playlist)}
+        return self._positions
+
+    def next_index(self):
+        current = get_current_index()
+        if self.playback_mode == "radio" and 0 <= current < len(playlist):
+            positions = self.playlist_positions()
+            name = self.similarity.most_similar(playlist[current], positions.__contains__,
+                                                exclude=self.history)
+            if name is not None:
+                return positions[name]
+            self.similarity.analyze_missing(list(playlist))
+        elif self.playback_mode == "shuffle" and playlist:
+            positions = self.playlist_positions()
+            if self._shuffle_positions is not positions:
+                # Arbre reconstruit seulement quand la playlist change ; chaque tirage est en O(log n)
+                self.shuffle.sync(playlist)
+                self._shuffle_positions = positions
+            i = self.shuffle.pick()
+            if i is not None:
+                return i
+        return (current + 1) % len(playlist)
+
+    @traced("track_switch")
     def on_skip(self):
-        i = (get_current_index() + 1) % len(playlist)
+        current = get_current_index()
+        if 0 <= current < len(playlist):
+            # Écoute complète si la piste est allée au bout ou a passé la moitié, sinon skip
+            completed = self.track_finished or get_current_position_ms() * 2 >= get_current_track_duration_ms()
+            self.shuffle.record(playlist[current], skipped=not completed)
+        i = self.next_index()
         set_current_index(i)
         load_track_by_index(i)
         self.track_finished = False
@@ -581,12 +987,76 @@ class MusicApp(QWidget):
     def mouseReleaseEvent(self, event):
         self._drag_pos = None
 
+    def count_wakeup(self, source):
+        self.wakeups[source] += 1
+
+    def wakeup_rates(self):
+        """Réveils par seconde depuis le dernier appel (timer, dessins, images GIF)"""
+        now = time.monotonic()
+        elapsed = max(now - self._wakeups_since, 1e-6)
+        rates = {k: round(v / elapsed, 2) for k, v in self.wakeups.items()}
+        rates["total"] = round(sum(self.wakeups.values()) / elapsed, 2)
+        self.wakeups = dict.fromkeys(self.wakeups, 0)
+        self._wakeups_since = now
+        return rates
+
+    def update_power_state(self):
+        """Choisit le profil d'énergie selon la config et l'état de la fenêtre"""
+        mode = self.config.get("power", {}).get("low_power", "auto")
+        hidden = not self.isVisible() or self.isMinimized()
+        if mode == "always":
+            low = True
+        elif mode == "never":
+            low = False
+        else:
+            low = hidden or not self.is_playing
+        self.set_low_power(low, hidden)
+
+    def set_low_power(self, low, hidden=False):
+        if low:
+            if hidden and not self.is_playing:
+                # Rien ne bouge : plus aucun réveil jusqu'au retour de la fenêtre
+                self.timer.stop()
+            else:
+                # La fin de piste doit toujours être détectée, mais moins souvent
+                self.timer.setInterval(self.config.get("power", {}).get("idle_interval", 500))
+                if not self.timer.isActive():
+                    self.timer.start()
+        else:
+            self.timer.setInterval(NORMAL_TICK_MS)
+            if not self.timer.isActive():
+                self.timer.start()
+
+        if low == self.low_power:
+            return
+        self.low_power = low
+        self.visualizer.set_frozen(low)
+        for movie in (self.music_gif_movie, self.bg_movie):
+            if movie:
+                movie.setPaused(low)
+        trace.instant("low_power", enabled=low)
+        print(f"🔋 Mode économie d'énergie : {'activé' if low else 'désactivé'}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_power_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_power_state()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_power_state()
+
     def resizeEvent(self, event):
         """Appelé quand la fenêtre est redimensionnée (mode tiled)"""
         super().resizeEvent(event)
         self.bg_label.setGeometry(0, 0, self.width(), self.height())
         self.update_background()
 
+    @traced("update_background")
     def update_background(self):
         """Met à jour le fond pour qu'il remplisse toute la fenêtre"""
         if self.bg_path and os.path.isfile(self.bg_path):
@@ -594,12 +1064,17 @@ class MusicApp(QWidget):
             height = self.height()
             
             if self.bg_path.lower().endswith('.gif'):
+                # Un redimensionnement ne relance pas le décodage du GIF
+                if self.bg_movie and self.bg_movie.fileName() == self.bg_path:
+                    self.bg_movie.setScaledSize(QSize(width, height))
+                    return
                 if self.bg_movie:
                     self.bg_movie.stop()
                 self.bg_movie = QMovie(self.bg_path)
                 self.bg_movie.setScaledSize(QSize(width, height))
+                self.bg_movie.frameChanged.connect(lambda _frame: self.count_wakeup("gif"))
                 self.bg_label.setMovie(self.bg_movie)
-                self.bg_movie.start()
+                self.start_movie(self.bg_movie)
             else:
                 # ÉTIRER L'IMAGE pour remplir exactement la taille actuelle
                 pixmap = QPixmap(self.bg_path).scaled(
@@ -610,20 +1085,28 @@ class MusicApp(QWidget):
                 )
                 self.bg_label.setPixmap(pixmap)
 
+    def start_movie(self, movie):
+        movie.start()
+        # En économie d'énergie, seule la première image est affichée
+        if self.low_power:
+            movie.setPaused(True)
+
+    @traced("load_background_gif")
     def load_background_gif(self, track_name):
         if not track_name:
             return
         
-        base_name = os.path.splitext(track_name)[0]
-        gif_path = os.path.join(os.getcwd(), "assets", "music", f"{base_name}.gif")
-        
-        if os.path.isfile(gif_path):
+        # Pochette réduite à l'ingestion si disponible, sinon le GIF d'origine
+        gif_path = artwork_path(os.path.join(os.getcwd(), "assets", "music", track_name))
+
+        if gif_path:
             if self.music_gif_movie:
                 self.music_gif_movie.stop()
             
             self.music_gif_movie = QMovie(gif_path)
+            self.music_gif_movie.frameChanged.connect(lambda _frame: self.count_wakeup("gif"))
             self.music_gif_label.setMovie(self.music_gif_movie)
-            self.music_gif_movie.start()
+            self.start_movie(self.music_gif_movie)
             self.music_gif_label.show()
             self.music_gif_label.raise_()
             
@@ -639,7 +1122,18 @@ class MusicApp(QWidget):
 
 if __name__ == "__main__":
     args = parse_args()
-    pygame.mixer.init()
+    if args.trace:
+        trace.enable(args.trace)
     app = QApplication(sys.argv)
-    window = MusicApp(tiled_mode=args.tiled)
+    # Un lecteur tourne déjà : on le met au premier plan au lieu d'ouvrir un second mixer
+    if send_command("show") is not None:
+        print("ℹ️ Lecteur déjà ouvert, fenêtre existante activée")
+        sys.exit(0)
+    # Le mixer pygame s'initialise à la première commande, après cette vérification
+    if args.audio == "null":
+        # Sans carte son : horloge réelle, la lecture avance normalement dans l'interface
+        set_backend(create_backend("null", realtime=True, wav_path=args.audio_wav))
+    elif args.audio:
+        set_backend(create_backend(args.audio))
+    window = MusicApp(tiled_mode=args.tiled, trace_overlay=args.trace_overlay)
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,15 +1,16 @@
 import sys
 import os
 import json
-import subprocess
-import shutil
+import argparse
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout,
-    QLineEdit, QPushButton, QLabel, QMessageBox
+    QLineEdit, QPushButton, QLabel, QMessageBox, QListWidget, QListWidgetItem
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve, pyqtProperty
+from PyQt6.QtCore import Qt, QObject, pyqtSignal, QPropertyAnimation, QEasingCurve, pyqtProperty
 from PyQt6.QtGui import QMovie
-import yt_dlp
+from core.ipc import send_command
+from core.downloader import DownloadQueue, DOWNLOADING, CONVERTING, DONE
+from core.batch import run_batch
 
 # === Lecture de la configuration ===
 def load_config(path="config.json"):
@@ -76,89 +77,10 @@ class AnimatedButton(QPushButton):
             self.scale_animation.start()
         super().mouseReleaseEvent(event)
 
-# === Thread de téléchargement et conversion ===
-class DownloadThread(QThread):
-    started_signal = pyqtSignal(str)
-    finished_signal = pyqtSignal(str)
-    error_signal = pyqtSignal(str)
-
-    def __init__(self, query: str, output_dir='assets/music'):
-        super().__init__()
-        self.query = query
-        self.output_dir = output_dir
-
-    def run(self):
-        try:
-            os.makedirs(self.output_dir, exist_ok=True)
-            
-            ydl_opts = {
-                'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-                'outtmpl': os.path.join(self.output_dir, '%(title)s.%(ext)s'),
-                'quiet': False,
-                'noplaylist': True,
-                'nocheckcertificate': True,
-                'extractor_args': {'youtube': {'skip': ['dash', 'hls']}},
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-us,en;q=0.5',
-                    'Sec-Fetch-Mode': 'navigate'
-                }
-            }
-
-            self.started_signal.emit("Recherche...")
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f"ytsearch1:{self.query}", download=True)
-                video_info = info['entries'][0] if 'entries' in info else info
-                path_mp4 = ydl.prepare_filename(video_info)
-                base_name = os.path.splitext(os.path.basename(path_mp4))[0]
-
-            if not os.path.exists(path_mp4):
-                self.error_signal.emit("Fichier introuvable")
-                return
-
-            self.started_signal.emit("Conversion...")
-            
-            convert_path = "./core/convert"
-            if not os.path.exists(convert_path):
-                self.error_signal.emit(f"Programme introuvable : {convert_path}")
-                return
-            
-            result = subprocess.run([convert_path, path_mp4], 
-                                  capture_output=True, 
-                                  text=True)
-            
-            if result.returncode != 0:
-                self.error_signal.emit(f"Erreur : {result.stderr}")
-                return
-
-            core_dir = "./core"
-            files_moved = []
-            
-            for ext in ['.mp3', '.gif']:
-                file_name = f"{base_name}{ext}"
-                src = os.path.join(core_dir, file_name)
-                dst = os.path.join(self.output_dir, file_name)
-                
-                if os.path.exists(src):
-                    if os.path.exists(dst):
-                        os.remove(dst)
-                    shutil.move(src, dst)
-                    files_moved.append(file_name)
-
-            if os.path.exists(path_mp4):
-                os.remove(path_mp4)
-
-            if files_moved:
-                self.finished_signal.emit("Terminé")
-            else:
-                self.error_signal.emit("Aucun fichier généré")
-
-        except yt_dlp.utils.DownloadError as e:
-            self.error_signal.emit(f"Erreur : {str(e)}")
-        except Exception as e:
-            self.error_signal.emit(f"Erreur : {str(e)}")
+# === Pont entre la file de téléchargements et l'interface ===
+class QueueBridge(QObject):
+    # Émis depuis les threads de travail, reçu dans le thread de l'interface
+    job_updated = pyqtSignal(object)
 
 # === Interface Principale ===
 class MP3DownloaderApp(QWidget):
@@ -167,12 +89,27 @@ class MP3DownloaderApp(QWidget):
         self.config = load_config()
         self.setWindowTitle("Downloader")
         win_cfg = self.config.get("window", {})
-        self.setFixedSize(win_cfg.get("width", 400), win_cfg.get("height", 180))
+        # La hauteur suit la liste des téléchargements
+        self.setFixedWidth(win_cfg.get("width", 400))
+        self.setMinimumHeight(win_cfg.get("height", 180))
         self.setStyleSheet(f"background-color: {win_cfg.get('background_color', '#434343')}; color: white;")
         
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint)
         self._drag_pos = None
         
+        self.job_items = {}
+        self.bridge = QueueBridge()
+        self.bridge.job_updated.connect(self.on_job_updated)
+        self.queue = DownloadQueue(
+            on_update=self.bridge.job_updated.emit,
+            profile=self.config.get("downloads", {}).get("profile", "audio"),
+            converter=self.config.get("downloads", {}).get("converter", "auto"),
+            ingest=self.config.get("downloads", {}).get("ingest", True),
+            bands=self.config.get("visualizer", {}).get("num_bars", 60),
+            artwork_size=self.config.get("artwork", {}).get("size"),
+            artwork_fps=self.config.get("artwork", {}).get("fps"),
+        )
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -240,6 +177,29 @@ class MP3DownloaderApp(QWidget):
         """)
         layout.addWidget(self.status_label)
 
+        # File des téléchargements (une ligne par recherche)
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMinimumHeight(90)
+        self.jobs_list.setStyleSheet(f"""
+            background: #333;
+            border-radius: 5px;
+            font-size: 11px;
+            font-family: {self.config.get('buttons', {}).get('font_family', 'Arial')};
+        """)
+        layout.addWidget(self.jobs_list)
+
+        self.cancel_button = AnimatedButton("Annuler la sélection", self.config)
+        self.cancel_button.setStyleSheet(f"""
+            padding: 5px;
+            background-color: #5e1e14;
+            color: white;
+            border-radius: 5px;
+            font-size: 11px;
+            font-family: {self.config.get('buttons', {}).get('font_family', 'Arial')};
+        """)
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        layout.addWidget(self.cancel_button)
+
         # GIF de chargement
         gif_path = "assets/gifs/load.gif"
         if os.path.exists(gif_path):
@@ -260,33 +220,52 @@ class MP3DownloaderApp(QWidget):
             QMessageBox.warning(self, "Erreur", "Veuillez entrer un titre ou URL")
             return
 
-        self.search_button.setEnabled(False)
+        # Plusieurs recherches peuvent être mises en file, séparées par ";"
+        for part in query.split(";"):
+            if part.strip():
+                self.queue.submit(part.strip())
+        self.search_input.clear()
+
         if self.loading_label:
             self.loading_label.setVisible(True)
             self.loading_gif.start()
 
-        self.thread = DownloadThread(query)
-        self.thread.started_signal.connect(self.status_label.setText)
-        self.thread.finished_signal.connect(self.on_finished)
-        self.thread.error_signal.connect(self.on_error)
-        self.thread.start()
+    def on_job_updated(self, job):
+        item = self.job_items.get(job.id)
+        if item is None:
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, job.id)
+            self.jobs_list.addItem(item)
+            self.job_items[job.id] = item
 
-    def on_finished(self, message):
-        self.status_label.setText(message)
-        self.search_button.setEnabled(True)
-        if self.loading_label:
-            self.loading_label.setVisible(False)
-            self.loading_gif.stop()
-        QMessageBox.information(self, "Succès", message)
+        text = f"{job.query} — {job.message or 'En attente'}"
+        if job.state in (DOWNLOADING, CONVERTING) and job.progress:
+            text += f" {int(job.progress * 100)}%"
+        item.setText(text)
 
-    def on_error(self, error_msg):
-        self.status_label.setText("Erreur")
-        QMessageBox.critical(self, "Erreur", error_msg)
-        self.search_button.setEnabled(True)
-        if self.loading_label:
+        if job.state == DONE:
+            # Le lecteur ouvert ajoute la piste directement, sans rechargement complet
+            mp3_files = [f for f in job.files if f.endswith(".mp3")]
+            if mp3_files and send_command("add_track", path=mp3_files[0]):
+                item.setText(f"{job.query} — Terminé, ajouté au lecteur")
+
+        active = len(self.queue.active_jobs())
+        if job.state == DONE and job.cache_hit:
+            self.status_label.setText(f"♻️ Cache : « {job.query} » déjà présent")
+        else:
+            self.status_label.setText(f"{active} en cours" if active else "Prêt")
+        if not active and self.loading_label:
             self.loading_label.setVisible(False)
             self.loading_gif.stop()
 
+    def cancel_selected(self):
+        for item in self.jobs_list.selectedItems():
+            self.queue.cancel(item.data(Qt.ItemDataRole.UserRole))
+
+    def closeEvent(self, event):
+        self.queue.shutdown(wait=False, cancel=True)
+        super().closeEvent(event)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self._drag_pos = event.globalPosition()
@@ -300,7 +279,31 @@ class MP3DownloaderApp(QWidget):
     def mouseReleaseEvent(self, event):
         self._drag_pos = None
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Téléchargeur YouTube → MP3 + GIF')
+    parser.add_argument('--batch', metavar='SOURCE',
+                        help='Import sans interface : fichier de requêtes (une par ligne) ou URL de playlist')
+    parser.add_argument('--jobs', type=int, default=2, help='Téléchargements simultanés en mode batch')
+    parser.add_argument('--state', metavar='FICHIER',
+                        help='Fichier de reprise (défaut : <SOURCE>.state.json)')
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.batch:
+        # Aucune fenêtre : pas de QApplication, progression en NDJSON sur stdout
+        config = load_config()
+        downloads = config.get("downloads", {})
+        sys.exit(run_batch(
+            args.batch, jobs=args.jobs, state_path=args.state,
+            profile=downloads.get("profile", "audio"),
+            converter=downloads.get("converter", "auto"),
+            ingest=downloads.get("ingest", True),
+            bands=config.get("visualizer", {}).get("num_bars", 60),
+            artwork_size=config.get("artwork", {}).get("size"),
+            artwork_fps=config.get("artwork", {}).get("fps"),
+        ))
+
     app = QApplication(sys.argv)
     window = MP3DownloaderApp()
     window.show()
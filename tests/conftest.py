@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from core import converter, downloader
+
+
+def wait_for(predicate, timeout=10.0):
+    """Attend qu'une condition devienne vraie (les tâches tournent dans des threads)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class MediaServer:
+    """Serveur HTTP local : sert des fichiers en mémoire, avec Range et débit réglable.
+
+    drops[chemin] liste des positions (octets) où couper la connexion, une par requête.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.delays = {}
+        self.drops = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                data = server.files.get(self.path)
+                if data is None:
+                    self.send_error(404)
+                    return
+                start = 0
+                if self.headers.get("Range"):
+                    start = int(self.headers["Range"].split("=")[1].split("-")[0])
+                server.requests.append((self.path, start))
+                drops = server.drops.get(self.path)
+                end = drops.pop(0) if drops else len(data)
+                self.send_response(206 if start else 200)
+                self.send_header("Content-Length", str(len(data) - start))
+                self.end_headers()
+                try:
+                    # Coupure : Content-Length annonce tout, la connexion se ferme avant
+                    for offset in range(start, end, 4096):
+                        self.wfile.write(data[offset:min(offset + 4096, end)])
+                        time.sleep(server.delays.get(self.path, 0))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeYoutubeDL:
+    """Remplaçant de yt_dlp.YoutubeDL pour DownloadQueue(extractor=...).
+
+    Mêmes options (outtmpl, format, progress_hooks, skip_download) et mêmes
+    résultats que yt-dlp ; les flux sont téléchargés depuis le MediaServer,
+    en reprenant un .part existant comme continuedl.
+    """
+
+    def __init__(self, opts, catalog):
+        self.opts = opts
+        self.catalog = catalog
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, target, download=False):
+        self.catalog.calls.append(("extract_info", target))
+        if target.startswith("ytsearch1:"):
+            query = target.split(":", 1)[1].lower()
+            entries = [self.catalog.info(vid) for vid, title in self.catalog.videos.items()
+                       if title.lower() == query]
+            return {"entries": entries}
+        return self.catalog.info(target.rsplit("v=", 1)[-1])
+
+    def prepare_filename(self, info):
+        values = dict(info)
+        values.setdefault("ext", "mp4")
+        return self.opts["outtmpl"] % values
+
+    def process_ie_result(self, info, download=True):
+        self.catalog.calls.append(("process_ie_result", info["id"]))
+        fmt = self.opts.get("format")
+        if self.opts.get("skip_download"):
+            with open(os.path.splitext(self.prepare_filename(info))[0] + ".jpg", "wb") as f:
+                f.write(b"thumbnail")
+            return dict(info)
+        if fmt == downloader.AUDIO_FORMAT:
+            kind, ext = "audio", "m4a"
+        elif fmt == downloader.CLIP_FORMAT:
+            kind, ext = "clip", "mp4"
+        else:
+            kind, ext = "video", "mp4"
+        path = self.prepare_filename(dict(info, ext=ext))
+        self._fetch(f"/{info['id']}/{kind}", path)
+        return dict(info, ext=ext, requested_downloads=[{"filepath": path}])
+
+    def _fetch(self, resource, path):
+        part = path + ".part"
+        start = os.path.getsize(part) if os.path.exists(part) else 0
+        request = urllib.request.Request(self.catalog.server.url + resource,
+                                         headers={"Range": f"bytes={start}-"} if start else {})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            total = start + int(response.headers["Content-Length"])
+            done = start
+            with open(part, "ab") as f:
+                while True:
+                    chunk = response.read(4096)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    done += len(chunk)
+                    self._hook({"status": "downloading", "filename": path,
+                                "downloaded_bytes": done, "total_bytes": total})
+        if done < total:
+            raise ConnectionError(f"Connexion interrompue à {done}/{total} octets")
+        os.replace(part, path)
+        self._hook({"status": "finished", "filename": path, "downloaded_bytes": done, "total_bytes": total})
+
+    def _hook(self, status):
+        for hook in self.opts.get("progress_hooks", []):
+            hook(status)
+
+
+class Catalog:
+    """Vidéos connues du faux extracteur : ID → titre, flux servis par le MediaServer"""
+
+    def __init__(self, server):
+        self.server = server
+        self.videos = {}
+        self.calls = []
+
+    def add(self, video_id, title, audio=50_000, video=200_000, clip=20_000):
+        self.videos[video_id] = title
+        for kind, size in (("audio", audio), ("video", video), ("clip", clip)):
+            self.server.files[f"/{video_id}/{kind}"] = os.urandom(size)
+
+    def info(self, video_id):
+        return {"id": video_id, "title": self.videos[video_id]}
+
+    def count(self, name):
+        return sum(1 for call, _arg in self.calls if call == name)
+
+    def extractor(self, opts):
+        return FakeYoutubeDL(opts, self)
+
+
+class StubBackend(converter.ConversionBackend):
+    """Conversion instantanée : le MP3 reprend les octets de la source audio.
+
+    gate (threading.Event) bloque la conversion, pour observer une tâche en cours.
+    """
+    name = "stub"
+    gate = None
+    threads = []
+
+    def available(self):
+        return True
+
+    def convert(self, sources, out_dir, base_name, task=None, on_progress=None):
+        StubBackend.threads.append(threading.current_thread().name)
+        while self.gate is not None and not self.gate.wait(0.01):
+            if task is not None:
+                task.check_cancelled()
+        with open(sources.get("audio") or sources["video"], "rb") as f:
+            data = f.read()
+        if on_progress:
+            on_progress(0.5)
+        with open(os.path.join(out_dir, f"{base_name}.mp3"), "wb") as f:
+            f.write(data)
+        with open(os.path.join(out_dir, f"{base_name}.gif"), "wb") as f:
+            f.write(b"GIF89a")
+        if on_progress:
+            on_progress(1.0)
+
+
+@pytest.fixture
+def media_server():
+    server = MediaServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def catalog(media_server):
+    return Catalog(media_server)
+
+
+@pytest.fixture
+def stub_backend(monkeypatch):
+    monkeypatch.setitem(converter.BACKENDS, "stub", StubBackend)
+    monkeypatch.setattr(StubBackend, "gate", None)
+    monkeypatch.setattr(StubBackend, "threads", [])
+    return StubBackend
+
+
+@pytest.fixture
+def make_queue(tmp_path, catalog, stub_backend):
+    """DownloadQueue sur une bibliothèque temporaire, avec le faux extracteur"""
+    queues = []
+
+    def make(library="music", **options):
+        options.setdefault("extractor", catalog.extractor)
+        options.setdefault("converter", "stub")
+        options.setdefault("ingest", False)
+        queue = downloader.DownloadQueue(str(tmp_path / library), **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown(cancel=True)
@@ -0,0 +1,30 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from core.artwork import optimize_library
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg absent")
+
+
+def make_gif(path):
+    subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+                    "-i", "testsrc=duration=2:size=250x250:rate=10", str(path), "-y"], check=True)
+
+
+def test_corrupt_gif_does_not_stop_the_batch(tmp_path):
+    make_gif(tmp_path / "good.gif")
+    (tmp_path / "broken.gif").write_bytes(b"GIF89a not really")
+    (tmp_path / "good.mp3").write_bytes(b"")
+    (tmp_path / "broken.mp3").write_bytes(b"")
+
+    results = {os.path.basename(r["gif"]): r for r in optimize_library(str(tmp_path), measure=False)}
+
+    assert results["broken.gif"]["error"]
+    assert results["broken.gif"]["output"] is None
+    good = results["good.gif"]
+    assert good["error"] is None
+    assert os.path.isfile(good["output"])
+    assert 0 < good["bytes_after"] < good["bytes_before"]
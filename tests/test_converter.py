@@ -0,0 +1,88 @@
+import os
+import shutil
+import stat
+import subprocess
+
+import pytest
+
+from core import converter
+from core.converter import CBinaryBackend, FFmpegBackend, convert_many
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg absent")
+
+
+def make_video(path, seconds=3):
+    """Vidéo de test générée localement : mire + sinus à 440 Hz"""
+    subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error",
+                    "-f", "lavfi", "-i", f"testsrc=duration={seconds}:size=320x240:rate=10",
+                    "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", str(path), "-y"],
+                   check=True)
+    return str(path)
+
+
+@pytest.fixture
+def video(tmp_path):
+    return make_video(tmp_path / "clip.mp4")
+
+
+@needs_ffmpeg
+def test_ffmpeg_backend_writes_mp3_and_gif(video, tmp_path):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    progress = []
+    FFmpegBackend().convert({"video": video}, str(out_dir), "clip", on_progress=progress.append)
+
+    assert (out_dir / "clip.mp3").stat().st_size > 0
+    with open(out_dir / "clip.gif", "rb") as f:
+        assert f.read(6) in (b"GIF87a", b"GIF89a")
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+    if shutil.which("ffprobe"):
+        # Durée connue : la progression passe par des valeurs intermédiaires
+        assert any(0 < ratio < 1 for ratio in progress)
+
+
+@needs_ffmpeg
+def test_convert_many_reports_errors_per_file(video, tmp_path):
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"not a video")
+    out_dir = tmp_path / "library"
+
+    progress = {}
+    results = convert_many([video, str(broken)], str(out_dir), jobs=2,
+                           on_progress=lambda path, ratio: progress.setdefault(path, []).append(ratio))
+
+    assert results[video] is None
+    assert results[str(broken)]
+    assert sorted(os.listdir(out_dir)) == ["clip.gif", "clip.mp3"]
+    assert progress[video][-1] == 1.0
+
+
+FAKE_CONVERT = """#!/bin/sh
+# Imite core/convert : écrit core/<base>.mp3 et core/<base>.gif dans le dossier courant
+base=$(basename "$1" .mp4)
+mkdir -p core
+printf mp3 > "core/$base.mp3"
+sleep 0.2
+printf gif > "core/$base.gif"
+"""
+
+
+def test_c_backend_parallel_jobs_keep_their_files(tmp_path, monkeypatch):
+    script = tmp_path / "convert"
+    script.write_text(FAKE_CONVERT)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setitem(converter.BACKENDS, "c", lambda: CBinaryBackend(str(script)))
+
+    videos = []
+    for i in range(6):
+        path = tmp_path / f"video{i}.mp4"
+        path.write_bytes(b"")
+        videos.append(str(path))
+    out_dir = tmp_path / "library"
+    results = convert_many(videos, str(out_dir), jobs=6, backend="c")
+
+    assert all(error is None for error in results.values()), results
+    # Publication complète, aucun dossier de travail laissé dans la bibliothèque
+    assert sorted(os.listdir(out_dir)) == sorted(f"video{i}{ext}" for i in range(6) for ext in (".gif", ".mp3"))
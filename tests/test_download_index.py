@@ -0,0 +1,105 @@
+import os
+
+from conftest import wait_for
+from core.downloader import DONE
+from core.download_index import DownloadIndex, normalize_query, video_id_from_url
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def download(queue, query):
+    job = queue.submit(query)
+    assert wait_for(lambda: job.finished)
+    assert job.state == DONE, job.message
+    return job
+
+
+def test_normalize_query():
+    assert normalize_query("  Beyoncé — Halo (Live)!! ") == "beyonce halo live"
+    assert video_id_from_url(f"https://youtu.be/{VIDEO_ID}?t=3") == VIDEO_ID
+    assert video_id_from_url(f"https://www.youtube.com/watch?v={VIDEO_ID}&list=x") == VIDEO_ID
+    assert video_id_from_url("halo") is None
+
+
+def test_non_latin_queries_keep_their_own_key(tmp_path):
+    assert normalize_query("Кино - Группа крови") == "кино группа крови"
+    assert normalize_query("米津玄師 Lemon") == "米津玄師 lemon"
+    assert normalize_query("방탄소년단 — 봄날") == "방탄소년단 봄날"
+
+    library = tmp_path / "music"
+    library.mkdir()
+    tracks = {"Кино - Группа крови": "kinoGruppaK", "米津玄師 Lemon": "yonezuLemon", "방탄소년단 - 봄날": "btsSpringDy"}
+    index = DownloadIndex(str(library))
+    for query, video_id in tracks.items():
+        (library / f"{video_id}.mp3").write_bytes(b"mp3")
+        index.record(query, video_id, query, [str(library / f"{video_id}.mp3")])
+
+    for query, video_id in tracks.items():
+        assert index.lookup_query(query.upper())["video_id"] == video_id
+    # Une autre chanson, ou un fragment latin, ne retombe pas sur une entrée existante
+    assert index.lookup_query("Сплин - Выхода нет") is None
+    assert index.lookup_query("lemon") is None
+    assert index.lookup_query("봄날") is None
+    # Une requête vide après normalisation n'est ni enregistrée ni trouvée
+    index.record("?!", "emptyQuery1", "", [])
+    assert "" not in index.data["queries"]
+    assert index.lookup_query("…") is None
+
+
+def test_query_hit_skips_the_extractor(make_queue, catalog):
+    catalog.add(VIDEO_ID, "Halo")
+    queue = make_queue()
+    first = download(queue, "Halo")
+    assert first.cache_hit is None
+    calls = len(catalog.calls)
+
+    second = download(queue, "  HALO ")
+    assert second.cache_hit == "requête"
+    assert second.files == first.files
+    assert len(catalog.calls) == calls
+
+
+def test_url_video_id_hit_skips_the_extractor(make_queue, catalog):
+    catalog.add(VIDEO_ID, "Halo")
+    queue = make_queue()
+    first = download(queue, "halo")
+    calls = len(catalog.calls)
+
+    job = download(queue, f"https://www.youtube.com/watch?v={VIDEO_ID}")
+    assert job.cache_hit == "requête"
+    assert job.files == first.files
+    assert len(catalog.calls) == calls
+
+
+def test_same_video_under_a_new_query_is_not_downloaded_again(make_queue, catalog):
+    catalog.add(VIDEO_ID, "Halo")
+    queue = make_queue()
+    download(queue, "halo")
+    assert catalog.count("process_ie_result") > 0
+    downloads = catalog.count("process_ie_result")
+
+    # La recherche résout la même vidéo : une seule résolution, aucun téléchargement
+    catalog.videos[VIDEO_ID] = "Halo (official video)"
+    job = download(queue, "halo (official video)")
+    assert job.cache_hit == "vidéo"
+    assert catalog.count("process_ie_result") == downloads
+    assert catalog.count("extract_info") == 2
+
+    # La nouvelle requête est maintenant servie directement par l'index
+    assert DownloadIndex(queue.output_dir).lookup_query("halo official video")["video_id"] == VIDEO_ID
+
+
+def test_deleted_mp3_is_a_miss(make_queue, catalog):
+    catalog.add(VIDEO_ID, "Halo")
+    queue = make_queue()
+    first = download(queue, "halo")
+    mp3 = next(f for f in first.files if f.endswith(".mp3"))
+    os.remove(mp3)
+    assert queue.index.lookup_query("halo") is None
+    assert queue.index.lookup_video(VIDEO_ID) is None
+
+    downloads = catalog.count("process_ie_result")
+    job = download(queue, "halo")
+    assert job.cache_hit is None
+    assert catalog.count("process_ie_result") > downloads
+    assert os.path.isfile(mp3)
@@ -0,0 +1,185 @@
+import os
+import threading
+
+from conftest import wait_for
+from core import downloader
+from core.downloader import QUEUED, DOWNLOADING, CONVERTING, DONE, CANCELLED
+
+
+def test_jobs_are_queued_and_published(make_queue, catalog):
+    for i in range(4):
+        catalog.add(f"video{i:06d}", f"Track {i}")
+    queue = make_queue(fetch_workers=1)
+    states = []
+    queue.on_update = lambda job: states.append((job.id, job.state))
+
+    jobs = [queue.submit(f"track {i}") for i in range(4)]
+    # Chaque tâche passe d'abord par la file d'attente
+    first_states = {}
+    for job_id, state in states:
+        first_states.setdefault(job_id, state)
+    assert first_states == {job.id: QUEUED for job in jobs}
+    assert wait_for(lambda: all(job.finished for job in jobs))
+
+    for i, job in enumerate(jobs):
+        assert job.state == DONE, job.message
+        assert [os.path.basename(f) for f in job.files] == [f"Track {i}.gif", f"Track {i}.mp3"]
+        assert all(os.path.isfile(f) for f in job.files)
+    # Rien ne reste dans le dossier des téléchargements partiels
+    assert not any(files for _root, _dirs, files in os.walk(queue.staging_dir))
+
+
+def test_fetch_and_convert_pools_overlap(make_queue, catalog, stub_backend):
+    catalog.add("video000001", "First")
+    catalog.add("video000002", "Second")
+    stub_backend.gate = threading.Event()
+    queue = make_queue(fetch_workers=1, convert_workers=1)
+
+    first = queue.submit("first")
+    assert wait_for(lambda: stub_backend.threads)
+    # La conversion de la première piste bloque ; le slot réseau sert déjà à la suivante
+    second = queue.submit("second")
+    assert wait_for(lambda: second.state == CONVERTING)
+    assert first.state == CONVERTING
+
+    stub_backend.gate.set()
+    assert wait_for(lambda: first.finished and second.finished)
+    assert first.state == second.state == DONE
+    assert all(name.startswith("convert") for name in stub_backend.threads)
+
+
+def test_progress_is_reported_per_job(make_queue, catalog):
+    catalog.add("video000001", "First", audio=100_000)
+    catalog.add("video000002", "Second", audio=100_000)
+    queue = make_queue(fetch_workers=2)
+    progress = {}
+
+    def on_update(job):
+        if job.state == DOWNLOADING and job.message == "Téléchargement":
+            progress.setdefault(job.id, []).append(job.progress)
+
+    queue.on_update = on_update
+    jobs = [queue.submit("first"), queue.submit("second")]
+    assert wait_for(lambda: all(job.finished for job in jobs))
+
+    for job in jobs:
+        assert job.state == DONE
+        assert job.progress == 1.0
+        values = progress[job.id]
+        # Première phase (audio) : progression croissante jusqu'à 1
+        audio = values[:values.index(1.0) + 1]
+        assert audio == sorted(audio) and len(audio) > 1
+
+
+def test_cancel_running_download(make_queue, catalog, media_server):
+    catalog.add("video000001", "Slow", audio=400_000)
+    media_server.delays["/video000001/audio"] = 0.01
+    queue = make_queue()
+
+    job = queue.submit("slow")
+    assert wait_for(lambda: job.state == DOWNLOADING and job.progress > 0)
+    assert queue.cancel(job.id)
+    assert wait_for(lambda: job.finished)
+    assert job.state == CANCELLED
+    assert not os.path.exists(os.path.join(queue.output_dir, "Slow.mp3"))
+    assert not queue.cancel(job.id)
+
+
+def test_cancel_running_conversion(make_queue, catalog, stub_backend):
+    catalog.add("video000001", "Track")
+    stub_backend.gate = threading.Event()
+    queue = make_queue()
+
+    job = queue.submit("track")
+    assert wait_for(lambda: stub_backend.threads)
+    job.cancel()
+    assert wait_for(lambda: job.finished)
+    assert job.state == CANCELLED
+    assert not os.path.exists(os.path.join(queue.output_dir, "Track.mp3"))
+    # Sources et dossier de travail supprimés
+    assert not [name for name in os.listdir(queue.output_dir) if name.startswith(".convert-")]
+    assert not any(files for _root, _dirs, files in os.walk(queue.staging_dir))
+
+
+def test_search_without_result_fails(make_queue):
+    queue = make_queue()
+    job = queue.submit("nothing matches")
+    assert wait_for(lambda: job.finished)
+    assert job.state == downloader.ERROR
+
+
+def expected_audio_bytes(audio, clip):
+    # Sans yt-dlp, pas de découpe d'extrait : la pochette vient de la miniature
+    try:
+        import yt_dlp  # noqa: F401
+    except ImportError:
+        return audio
+    return audio + clip
+
+
+def test_byte_accounting_per_profile(make_queue, catalog, media_server):
+    catalog.add("video000001", "Track", audio=60_000, video=300_000, clip=25_000)
+    results = {}
+    for profile in downloader.PROFILES:
+        # Une bibliothèque par profil : le second téléchargement ne sort pas du cache
+        queue = make_queue(library=profile, profile=profile)
+        media_server.requests.clear()
+        job = queue.submit("track")
+        assert wait_for(lambda: job.finished)
+        assert job.state == DONE, job.message
+
+        served = sum(len(media_server.files[path]) - start for path, start in media_server.requests)
+        assert job.bytes_downloaded == served
+        assert 0 < job.wall_time < 10
+        results[profile] = job.bytes_downloaded
+
+    assert results["audio"] == expected_audio_bytes(60_000, 25_000)
+    assert results["full"] == 300_000
+
+
+def test_byte_accounting_after_dropped_connections(make_queue, catalog, media_server, monkeypatch):
+    monkeypatch.setattr(downloader, "BACKOFF_BASE", 0.01)
+    catalog.add("video000001", "Track", audio=100_000, clip=25_000)
+    media_server.drops["/video000001/audio"] = [20_480, 61_440]
+    job = make_queue().submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.state == DONE, job.message
+    # Chaque octet n'est reçu qu'une fois, même en trois requêtes
+    assert job.bytes_downloaded == expected_audio_bytes(100_000, 25_000)
+
+    # Session suivante : le .part laissé sur le disque n'est pas compté comme reçu
+    media_server.drops["/video000001/audio"] = [40_960] * (downloader.MAX_RETRIES + 1)
+    failed = make_queue(library="other").submit("track")
+    assert wait_for(lambda: failed.finished)
+    assert failed.bytes_downloaded == 40_960
+    resumed = make_queue(library="other").submit("track")
+    assert wait_for(lambda: resumed.finished)
+    assert resumed.state == DONE, resumed.message
+    assert resumed.bytes_downloaded == expected_audio_bytes(100_000 - 40_960, 25_000)
+
+
+def test_cache_hit_records_wall_time(make_queue, catalog):
+    catalog.add("video000001", "Track")
+    queue = make_queue()
+    first = queue.submit("track")
+    assert wait_for(lambda: first.finished)
+
+    job = queue.submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.cache_hit == "requête"
+    assert job.bytes_downloaded == 0
+    assert 0 <= job.wall_time < first.wall_time
+
+
+def test_cancel_during_ingest(make_queue, catalog, monkeypatch):
+    catalog.add("video000001", "Track")
+    queue = make_queue(ingest=True)
+
+    def ingest(path, task=None, **options):
+        task.cancel()
+        task.check_cancelled()
+
+    monkeypatch.setattr(downloader.analysis, "ingest", ingest)
+    job = queue.submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.state == CANCELLED
@@ -0,0 +1,40 @@
+import socket
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from core.ipc import ControlServer, server_alive
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def test_second_instance_keeps_the_live_socket(app, tmp_path):
+    name = str(tmp_path / "player.sock")
+    first = ControlServer(lambda msg: {"ok": True}, name=name)
+    assert first.listen()
+
+    # Le premier lecteur n'a pas encore traité d'événement (démarrage en cours)
+    second = ControlServer(lambda msg: {"ok": True}, name=name)
+    assert not second.listen()
+    assert first.server.isListening()
+    assert server_alive(name)
+    assert first.server.waitForNewConnection(1000)
+    first.close()
+
+
+def test_stale_socket_is_replaced(app, tmp_path):
+    name = str(tmp_path / "player.sock")
+    # Socket laissé par un crash : le fichier existe, personne n'écoute
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(name)
+    stale.close()
+    assert not server_alive(name)
+
+    server = ControlServer(lambda msg: {"ok": True}, name=name)
+    assert server.listen()
+    assert server_alive(name)
+    server.close()
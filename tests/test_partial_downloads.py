@@ -0,0 +1,79 @@
+import os
+
+from conftest import wait_for
+from core import downloader
+from core.downloader import DONE, ERROR
+
+
+def staged_files(queue):
+    return [os.path.join(root, name) for root, _dirs, files in os.walk(queue.staging_dir) for name in files]
+
+
+def test_dropped_connections_resume_the_part_file(make_queue, catalog, media_server, monkeypatch):
+    monkeypatch.setattr(downloader, "BACKOFF_BASE", 0.01)
+    catalog.add("video000001", "Track", audio=100_000)
+    media_server.drops["/video000001/audio"] = [20_480, 61_440]
+    queue = make_queue()
+
+    job = queue.submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.state == DONE, job.message
+
+    # Trois requêtes : la première depuis 0, les suivantes reprennent là où la connexion a coupé
+    assert [start for path, start in media_server.requests if path == "/video000001/audio"] == [0, 20_480, 61_440]
+    with open(os.path.join(queue.output_dir, "Track.mp3"), "rb") as f:
+        assert f.read() == media_server.files["/video000001/audio"]
+    assert staged_files(queue) == []
+
+
+def test_part_file_survives_for_the_next_session(make_queue, catalog, media_server, monkeypatch):
+    monkeypatch.setattr(downloader, "BACKOFF_BASE", 0.01)
+    catalog.add("video000001", "Track", audio=100_000)
+    media_server.drops["/video000001/audio"] = [40_960] * (downloader.MAX_RETRIES + 1)
+    job = make_queue().submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.state == ERROR
+
+    # Une nouvelle file (autre session) reprend le .part laissé dans le dossier de la vidéo
+    queue = make_queue()
+    assert [os.path.basename(p) for p in staged_files(queue)] == ["Track.m4a.part"]
+    media_server.requests.clear()
+    job = queue.submit("track")
+    assert wait_for(lambda: job.finished)
+    assert job.state == DONE, job.message
+    assert media_server.requests[0] == ("/video000001/audio", 40_960)
+    with open(os.path.join(queue.output_dir, "Track.mp3"), "rb") as f:
+        assert f.read() == media_server.files["/video000001/audio"]
+
+
+def test_same_video_in_two_jobs_is_downloaded_once(make_queue, catalog, media_server):
+    catalog.add("video000001", "Track", audio=200_000)
+    media_server.delays["/video000001/audio"] = 0.002
+    queue = make_queue(fetch_workers=2)
+
+    first = queue.submit("track")
+    # Autre requête, même vidéo (résolue par l'URL), pendant le premier téléchargement
+    second = queue.submit("https://example.com/watch?v=video000001")
+    assert wait_for(lambda: first.finished and second.finished)
+
+    assert first.state == second.state == DONE, (first.message, second.message)
+    assert second.cache_hit == "vidéo"
+    assert second.files == first.files
+    assert [start for path, start in media_server.requests if path == "/video000001/audio"] == [0]
+    assert staged_files(queue) == []
+
+
+def test_gc_partials_removes_old_files_and_dirs(tmp_path):
+    staging = tmp_path / downloader.STAGING_DIR
+    old_dir, new_dir = staging / "old", staging / "new"
+    old_dir.mkdir(parents=True)
+    new_dir.mkdir()
+    (old_dir / "a.m4a.part").write_bytes(b"x")
+    (new_dir / "b.m4a.part").write_bytes(b"x")
+    past = os.path.getmtime(old_dir) - downloader.PARTIAL_MAX_AGE - 10
+    os.utime(old_dir / "a.m4a.part", (past, past))
+
+    assert downloader.gc_partials(str(staging)) == 1
+    os.utime(old_dir, (past, past))
+    downloader.gc_partials(str(staging))
+    assert sorted(os.listdir(staging)) == ["new"]
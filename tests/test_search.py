@@ -0,0 +1,30 @@
+from core.search import TrigramIndex, track_text
+
+
+def make_index():
+    index = TrigramIndex()
+    tracks = {
+        "music/Halo.mp3": {"title": "Halo", "artist": "Beyoncé"},
+        "music/Группа крови.mp3": {"title": "Группа крови", "artist": "Кино"},
+        "music/Lemon.mp3": {"title": "Lemon", "artist": "米津玄師"},
+        "music/봄날.mp3": {"title": "봄날", "artist": "방탄소년단"},
+    }
+    for path, tags in tracks.items():
+        index.add(path, track_text(path, tags))
+    return index
+
+
+def test_track_text_keeps_non_latin_scripts():
+    assert track_text("music/Группа крови.mp3", {"artist": "Кино"}) == "группа крови кино"
+    assert track_text("music/Lemon.mp3", {"artist": "米津玄師"}) == "lemon 米津玄師"
+
+
+def test_non_latin_tracks_are_found():
+    index = make_index()
+    assert index.search("кино")[0][0] == "music/Группа крови.mp3"
+    assert index.search("ГРУППА")[0][0] == "music/Группа крови.mp3"
+    assert index.search("米津玄師")[0][0] == "music/Lemon.mp3"
+    assert index.search("봄날")[0][0] == "music/봄날.mp3"
+    assert index.search("beyonce")[0][0] == "music/Halo.mp3"
+    # Une requête non latine ne ramène pas une piste latine par défaut
+    assert [path for path, _score in index.search("Сплин")] == []
@@ -0,0 +1,53 @@
+import threading
+
+from conftest import wait_for
+from core import analysis
+
+
+def test_superseded_tracks_are_never_decoded(monkeypatch):
+    decoded = []
+    gate = threading.Event()
+
+    def decode(path):
+        decoded.append(path)
+        gate.wait(5)
+        return [path], analysis.SAMPLE_RATE
+
+    monkeypatch.setattr(analysis, "decode", decode)
+    worker = analysis.TrackWorker()
+    applied = []
+
+    def job(path, signal):
+        y = signal()
+        if worker.is_current("beats", path):
+            applied.append((path, y))
+
+    # Saut rapide de piste en piste pendant que la première se décode
+    worker.submit("beats", "track0.mp3", job)
+    assert wait_for(lambda: decoded)
+    for i in range(1, 10):
+        worker.submit("beats", f"track{i}.mp3", job)
+    gate.set()
+
+    assert wait_for(lambda: applied)
+    assert decoded == ["track0.mp3", "track9.mp3"]
+    # Le résultat de la piste dépassée n'est pas appliqué
+    assert applied == [("track9.mp3", ["track9.mp3"])]
+
+
+def test_jobs_of_the_same_track_share_one_decode(monkeypatch):
+    decoded = []
+    monkeypatch.setattr(analysis, "decode", lambda path: (decoded.append(path) or [path], analysis.SAMPLE_RATE))
+    worker = analysis.TrackWorker()
+    results = {}
+
+    worker.submit("peaks", "track.mp3", lambda path, signal: results.setdefault("peaks", signal()))
+    worker.submit("beats", "track.mp3", lambda path, signal: results.setdefault("beats", signal()))
+    assert wait_for(lambda: len(results) == 2)
+    assert decoded == ["track.mp3"]
+
+    # Signal déjà décodé par l'appelant : aucun décodage dans le worker
+    worker.submit("beats", "other.mp3", lambda path, signal: results.setdefault("other", signal()), y=["given"])
+    assert wait_for(lambda: "other" in results)
+    assert results["other"] == ["given"]
+    assert decoded == ["track.mp3"]